@@ -188,4 +188,17 @@ CREATE TABLE slots_teachers(
     FOREIGN KEY (teacher_id) REFERENCES teachers(id),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+CREATE TABLE edt_slot(
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    slot_id INT NOT NULL,
+    FOREIGN KEY (slot_id) REFERENCES slots(id),
+    day_of_week VARCHAR(20) NOT NULL,
+    start_hour TIME NOT NULL,
+    room_id INT,
+    FOREIGN KEY (room_id) REFERENCES rooms(id),
+    is_draft BOOLEAN NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
\ No newline at end of file
@@ -0,0 +1,129 @@
+# ==============================================================================
+# GÉNÉRATION PAR LOT : plusieurs semaines (intervalle ou année) dans un pool de processus
+# ==============================================================================
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional
+
+from connect_database import apres_fork, get_db_config
+from data_provider_id import DataProviderID
+from solution_visualizer import extraire_affectations
+from solver_profiles import PROFILS_SOLVEUR
+from time_table_model import TimetableModel, ENCODAGES, ENCODAGE_BOOLEEN
+
+# Statut du bilan d'une semaine dont la génération a levé une exception
+STATUT_ERREUR = "ERREUR"
+
+# État propre à chaque processus du pool : une connexion et les données de référence, créées une seule fois
+_fournisseur: Optional[DataProviderID] = None
+_statique: Optional[Dict[str, Any]] = None
+
+
+def _initialiser_processus(db_config: Dict[str, Any], statique: Dict[str, Any], dossier_cache: Optional[str] = None):
+    global _fournisseur, _statique
+    apres_fork()
+    _fournisseur = DataProviderID(db_config, dossier_cache=dossier_cache)
+    _statique = statique
+
+
+def _generer_semaine(week_id: int, encodage: str, profil: str, surcharges: dict) -> Dict[str, Any]:
+    """Charge, construit et résout une semaine dans un processus du pool ; l'écriture reste au processus principal."""
+    debut = time.perf_counter()
+    data = _fournisseur.load_and_prepare_data(week_id, statique=_statique)
+    scheduler = TimetableModel(data, encodage=encodage)
+    scheduler.build_model()
+    debut_resolution = time.perf_counter()
+    solution = scheduler.solve(profil=profil, **surcharges)
+    affectations = extraire_affectations(solution['solver'], solution['vars'], data) if solution['vars'] else None
+    return {"week_id": week_id, "statut": solution['solver'].StatusName(solution['status']),
+            "nb_cours": len(data['cours']), "affectations": affectations,
+            "secondes_resolution": time.perf_counter() - debut_resolution,
+            "secondes": time.perf_counter() - debut}
+
+
+def generer_semaines(week_ids: List[int], db_config: Optional[Dict[str, Any]] = None, encodage: str = ENCODAGE_BOOLEEN,
+                     profil: str = "defaut", max_processus: Optional[int] = None,
+                     workers_par_semaine: Optional[int] = None, dossier_cache: Optional[str] = None,
+                     **surcharges) -> List[Dict[str, Any]]:
+    """
+    Génère les semaines week_ids en parallèle :
+    - les données de référence (salles, profs, hiérarchie...) sont chargées une seule fois puis
+      transmises à chaque processus, qui ouvre sa propre connexion à la base ;
+    - chaque semaine dispose d'un budget borné de workers CP-SAT (par défaut : cœurs / processus) ;
+    - chaque emploi du temps est inséré dans edt_slot dès que sa semaine est terminée ;
+    - avec dossier_cache, chaque semaine est relue depuis son snapshot si ses tables sources n'ont pas changé.
+    Renvoie le bilan par semaine (statut, nombre de cours, temps de résolution), dans l'ordre des semaines.
+    db_config : connexion MySQL, get_db_config() (environnement / .env) par défaut.
+    """
+    db_config = db_config or get_db_config()
+    fournisseur = DataProviderID(db_config)
+    print(f"Génération par lot : {len(week_ids)} semaine(s)")
+    statique = fournisseur.load_static_data()
+    nb_coeurs = os.cpu_count() or 1
+    max_processus = max(1, min(max_processus or nb_coeurs, len(week_ids) or 1))
+    surcharges["num_workers"] = workers_par_semaine or max(1, nb_coeurs // max_processus)
+    print(f"   -> {max_processus} processus, {surcharges['num_workers']} worker(s) CP-SAT par semaine")
+
+    bilan = []
+    with ProcessPoolExecutor(max_workers=max_processus, initializer=_initialiser_processus,
+                             initargs=(db_config, statique, dossier_cache)) as pool:
+        futurs = {pool.submit(_generer_semaine, week_id, encodage, profil, surcharges): week_id for week_id in week_ids}
+        for futur in as_completed(futurs):
+            # Une semaine en échec (base, exception dans le processus...) n'interrompt pas le lot
+            try:
+                resultat = futur.result()
+                affectations = resultat.pop("affectations")
+                if affectations is not None:
+                    fournisseur.convert_affectations_to_insert(affectations)
+            except Exception as e:
+                resultat = {"week_id": futurs[futur], "statut": STATUT_ERREUR, "nb_cours": 0,
+                            "secondes_resolution": 0.0, "secondes": 0.0, "erreur": f"{type(e).__name__}: {e}"}
+                print(f"   -> Semaine {resultat['week_id']} : échec ({resultat['erreur']})")
+                bilan.append(resultat)
+                continue
+            print(f"   -> Semaine {resultat['week_id']} : {resultat['statut']} "
+                  f"({resultat['nb_cours']} cours, résolution {resultat['secondes_resolution']:.1f} s)")
+            bilan.append(resultat)
+    return sorted(bilan, key=lambda r: week_ids.index(r["week_id"]))
+
+
+def afficher_bilan(bilan: List[Dict[str, Any]]):
+    print("\n=== Bilan de la génération par lot ===")
+    print(f"{'Semaine':>8} {'Statut':<12} {'Cours':>6} {'Résolution (s)':>15} {'Total (s)':>10}")
+    for r in bilan:
+        print(f"{r['week_id']:>8} {r['statut']:<12} {r['nb_cours']:>6} {r['secondes_resolution']:>15.1f} {r['secondes']:>10.1f}")
+    resolues = sum(r['statut'] in ("OPTIMAL", "FEASIBLE") for r in bilan)
+    print(f"   -> {resolues}/{len(bilan)} semaine(s) résolue(s)")
+    for r in bilan:
+        if r['statut'] == STATUT_ERREUR:
+            print(f"   -> Semaine {r['week_id']} en erreur : {r['erreur']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génère les emplois du temps de plusieurs semaines en parallèle")
+    parser.add_argument("--semaines", type=int, nargs=2, metavar=("PREMIERE", "DERNIERE"),
+                        help="Intervalle d'identifiants de semaines (inclus)")
+    parser.add_argument("--annee", type=int, help="Toutes les semaines de l'année (years.id)")
+    parser.add_argument("--encodage", choices=ENCODAGES, default=ENCODAGE_BOOLEEN)
+    parser.add_argument("--profil", choices=list(PROFILS_SOLVEUR), default="defaut",
+                        help="Profil de résolution nommé (voir solver_profiles.py)")
+    parser.add_argument("--processus", type=int, help="Nombre de semaines résolues en parallèle (défaut : nombre de cœurs)")
+    parser.add_argument("--workers", type=int, help="Workers CP-SAT par semaine (défaut : cœurs / processus)")
+    parser.add_argument("--temps-max", type=float, help="Limite de temps par semaine en secondes")
+    parser.add_argument("--cache", metavar="DOSSIER", help="Dossier des snapshots de semaines (week_snapshot.py)")
+    argvs = parser.parse_args()
+    if argvs.semaines is None and argvs.annee is None:
+        parser.error("--semaines ou --annee est requis")
+
+    start_time = time.perf_counter()
+    premiere, derniere = argvs.semaines or (None, None)
+    db_config = get_db_config()
+    semaines = DataProviderID(db_config).list_week_ids(argvs.annee, premiere, derniere)
+    resultats = generer_semaines(semaines, db_config, encodage=argvs.encodage, profil=argvs.profil,
+                                 max_processus=argvs.processus, workers_par_semaine=argvs.workers,
+                                 dossier_cache=argvs.cache,
+                                 max_time_in_seconds=argvs.temps_max)
+    afficher_bilan(resultats)
+    print(f"Programme exécuté en : {time.perf_counter() - start_time: .5f} secondes")
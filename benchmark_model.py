@@ -0,0 +1,198 @@
+# ==============================================================================
+# BENCHMARK DE CONSTRUCTION DU MODÈLE (données synthétiques, sans base de données)
+# ==============================================================================
+import argparse
+import json
+import os
+import pickle
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, Any, Optional
+
+from solution_listeners import EcouteurSolution
+from time_table_model import TimetableModel, ENCODAGES, ENCODAGE_BOOLEEN
+
+
+PROMOTIONS = {
+    "BUT1": {"G1": ["A", "B"], "G2": ["A", "B"], "G3": ["A", "B"]},
+    "BUT2": {"G4": ["A", "B"], "G5": ["A", "B"]},
+    "BUT3": {"G7": ["A", "B"], "G8": ["A"]},
+}
+TAILLES_PROMOTIONS = {"BUT1": 80, "BUT2": 60, "BUT3": 50}
+CAPACITES_SALLES = [60, 30, 16, 30, 30, 32, 28, 16, 16, 28, 28, 36, 28, 30, 30, 120]
+
+
+def generer_semaine_synthetique(nb_cours: int = 500, graine: int = 0, jours: int = 5,
+                                creneaux_par_jour: int = 23, nb_profs: int = 60, copies_max: int = 1) -> Dict[str, Any]:
+    """
+    Construit un dictionnaire de données au format de DataProviderID.load_and_prepare_data
+    (mêmes clés, mêmes identifiants de cours TYPE_matiere_groupe_sXXXX) pour une semaine fictive.
+    copies_max > 1 répète chaque séance jusqu'à copies_max fois à l'identique (seul le slot id change),
+    comme les TD/TP hebdomadaires d'une vraie semaine.
+    """
+    rnd = random.Random(graine)
+    salles = {i + 1: cap for i, cap in enumerate(CAPACITES_SALLES)}
+    profs = [f"Prof {i}" for i in range(nb_profs)]
+    matieres = [f"R{i}.0{j} Matiere" for i in range(1, 6) for j in range(1, 9)]
+
+    cours, duree_cours, taille_groupes, map_groupe_cours = [], {}, {}, {}
+    slot_id = 1000
+    while len(cours) < nb_cours:
+        promo = rnd.choice(list(PROMOTIONS))
+        matiere = f"{rnd.choice(matieres)} {promo}"
+        typ = rnd.choice(["CM", "TD", "TD", "TP", "TP", "TP"])
+        if typ == "CM":
+            groupe = promo
+            groupes = [promo] + [g for gg, subs in PROMOTIONS[promo].items() for g in [gg] + [gg + s for s in subs]]
+            taille = TAILLES_PROMOTIONS[promo]
+        elif typ == "TD":
+            groupe = rnd.choice(list(PROMOTIONS[promo]))
+            groupes, taille = [groupe], 28
+        else:
+            gg = rnd.choice(list(PROMOTIONS[promo]))
+            groupe = gg + rnd.choice(PROMOTIONS[promo][gg])
+            groupes, taille = [groupe], 14
+        profs_autorises, duree = rnd.sample(range(nb_profs), rnd.choice([1, 1, 2])), rnd.choice([2, 3, 4])
+        copies = rnd.randint(1, copies_max) if copies_max > 1 else 1
+        for _ in range(min(copies, nb_cours - len(cours))):
+            cid = f"{typ}_{matiere}_{groupe}_s{slot_id}"
+            slot_id += 1
+            cours.append({"id": cid, "groups": groupes, "allowed_prof_indices": list(profs_autorises)})
+            duree_cours[cid] = duree
+            for g in groupes:
+                map_groupe_cours.setdefault(g, []).append(cid)
+        taille_groupes[groupe] = taille
+
+    prof_to_teacher_id = {p: i + 1 for i, p in enumerate(profs)}
+    # Un prof sur cinq n'est disponible que le matin ou l'après-midi selon le jour
+    disponibilites_profs = {i + 1: {j: ([(0, 8)] if j % 2 else [(11, creneaux_par_jour)]) for j in range(jours)}
+                            for i in range(0, nb_profs, 5)}
+    slots = [(j, s) for j in range(jours) for s in range(creneaux_par_jour)]
+    return {
+        "jours": jours, "creneaux_par_jour": creneaux_par_jour, "slots": slots, "nb_slots": len(slots),
+        "fenetre_midi": list(range(8, 11)),
+        "cours": cours, "duree_cours": duree_cours, "taille_groupes": taille_groupes,
+        "map_groupe_cours": map_groupe_cours,
+        "hierarchie_groupes": {promo: {g: [g + s for s in subs] for g, subs in groupes.items()}
+                               for promo, groupes in PROMOTIONS.items()},
+        "salles": salles, "capacites": list(salles.values()), "profs": profs,
+        "profs_par_slot": {},
+        "all_groups": list(map_groupe_cours.keys()),
+        "disponibilites_profs": disponibilites_profs,
+        "disponibilites_salles": {16: {0: [(11, creneaux_par_jour)], 1: [(0, 8)], 2: [(0, 8)], 4: [(11, creneaux_par_jour)]}},
+        "disponibilites_groupes": {},
+        "obligations_slots": {},
+        "prof_to_teacher_id": prof_to_teacher_id,
+        "liste_amphi_c": [],
+        "group_to_dispo_key": {},
+    }
+
+
+def mesurer_construction(data: Dict[str, Any], encodage: str = ENCODAGE_BOOLEEN) -> Dict[str, Any]:
+    debut = time.perf_counter()
+    scheduler = TimetableModel(data, encodage=encodage)
+    scheduler.build_model()
+    duree = time.perf_counter() - debut
+    proto = scheduler.model.Proto()
+    return {"encodage": encodage, "secondes": duree,
+            "variables": len(proto.variables), "contraintes": len(proto.constraints)}
+
+
+# Exécuté dans l'arbre extrait de la révision de référence : son TimetableModel(data) n'a pas d'encodage
+_SCRIPT_REFERENCE = """
+import json, pickle, sys, time
+from time_table_model import TimetableModel
+with open(sys.argv[1], 'rb') as f:
+    data = pickle.load(f)
+debut = time.perf_counter()
+scheduler = TimetableModel(data)
+scheduler.build_model()
+duree = time.perf_counter() - debut
+proto = scheduler.model.Proto()
+print(json.dumps({"secondes": duree, "variables": len(proto.variables), "contraintes": len(proto.constraints)}))
+"""
+
+
+def revision_initiale() -> str:
+    """Premier commit du dépôt : le modèle d'origine, avant les optimisations mesurées ici."""
+    return subprocess.run(["git", "rev-list", "--max-parents=0", "HEAD"], capture_output=True, text=True,
+                          check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.split()[0]
+
+
+def mesurer_reference(data: Dict[str, Any], revision: Optional[str] = None) -> Dict[str, Any]:
+    """
+    mesurer_construction avec le TimetableModel d'une révision git (par défaut le premier commit), extraite
+    par git archive dans un dossier temporaire et lancée dans un processus à part : ses modules ne se
+    mêlent pas à ceux de l'arbre courant. Les données lui sont passées par un fichier temporaire.
+    """
+    revision = revision or revision_initiale()
+    racine = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as dossier:
+        archive = subprocess.run(["git", "archive", revision], capture_output=True, check=True, cwd=racine).stdout
+        subprocess.run(["tar", "-x", "-C", dossier], input=archive, check=True)
+        chemin = os.path.join(dossier, "donnees.pkl")
+        with open(chemin, "wb") as f:
+            pickle.dump(data, f)
+        sortie = subprocess.run([sys.executable, "-c", _SCRIPT_REFERENCE, chemin], capture_output=True, text=True,
+                                check=True, cwd=dossier).stdout
+    return {"encodage": f"réf. {revision[:7]}", **json.loads(sortie.strip().splitlines()[-1])}
+
+
+class _ArretPremiereSolution(EcouteurSolution):
+    def __init__(self):
+        self.secondes = None
+
+    def publier(self, evenement):
+        self.secondes = evenement['secondes']
+        return True
+
+
+def mesurer_premiere_solution(data: Dict[str, Any], encodage: str = ENCODAGE_BOOLEEN, casser_symetries: bool = True,
+                              temps_max: float = 120, graine: int = 0) -> Dict[str, Any]:
+    """Temps jusqu'à la première solution (1 worker, graine fixe), avec ou sans ordre des cours interchangeables."""
+    scheduler = TimetableModel(data, encodage=encodage)
+    scheduler.casser_symetries = casser_symetries
+    scheduler.build_model()
+    premiere = scheduler.ajouter_ecouteur(_ArretPremiereSolution())
+    solution = scheduler.solve(profil="ci", num_workers=1, max_deterministic_time=None,
+                               max_time_in_seconds=temps_max, random_seed=graine)
+    return {"encodage": encodage, "symetries": casser_symetries,
+            "statut": solution['solver'].StatusName(solution['status']), "secondes": premiere.secondes}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mesure le temps de construction du modèle sur une semaine synthétique")
+    parser.add_argument("--cours", type=int, default=500, help="Nombre de cours de la semaine synthétique")
+    parser.add_argument("--graine", type=int, default=0, help="Graine du générateur aléatoire")
+    parser.add_argument("--encodage", choices=ENCODAGES, action="append",
+                        help="Encodage(s) à mesurer (par défaut : tous)")
+    parser.add_argument("--copies", type=int, default=1,
+                        help="Répète chaque séance jusqu'à N fois à l'identique (cours interchangeables)")
+    parser.add_argument("--reference", nargs="?", const="", default=None, metavar="REVISION",
+                        help="Mesure aussi la construction avec le modèle d'une révision git "
+                             "(sans valeur : le premier commit, modèle d'origine) pour comparer")
+    parser.add_argument("--premiere-solution", action="store_true",
+                        help="Mesure aussi le temps jusqu'à la première solution, avec et sans cassage de symétries")
+    argvs = parser.parse_args()
+
+    model_data = generer_semaine_synthetique(argvs.cours, argvs.graine, copies_max=argvs.copies)
+    resultats = [mesurer_construction(model_data, encodage) for encodage in (argvs.encodage or ENCODAGES)]
+    if argvs.reference is not None:
+        resultats.insert(0, mesurer_reference(model_data, argvs.reference or None))
+    premieres = [mesurer_premiere_solution(model_data, encodage, casser_symetries)
+                 for encodage in (argvs.encodage or ENCODAGES) for casser_symetries in (False, True)
+                 ] if argvs.premiere_solution else []
+
+    print(f"\n=== Construction du modèle : {argvs.cours} cours, {model_data['nb_slots']} créneaux ===")
+    for r in resultats:
+        acceleration = f"   x{resultats[0]['secondes'] / r['secondes']:.1f}" if argvs.reference is not None else ""
+        print(f"   -> {r['encodage']:<12} {r['secondes']:8.2f} s   "
+              f"{r['variables']:>9} variables   {r['contraintes']:>9} contraintes{acceleration}")
+    if premieres:
+        print("\n=== Temps jusqu'à la première solution ===")
+        for r in premieres:
+            secondes = f"{r['secondes']:8.2f} s" if r['secondes'] is not None else "       -  "
+            print(f"   -> {r['encodage']:<12} symétries {'cassées' if r['symetries'] else 'libres ':<8} {secondes}   {r['statut']}")
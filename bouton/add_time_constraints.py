@@ -8,9 +8,10 @@ Par exemple: pause déjeuner obligatoire 12h-13h30
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Script lancé directement (python bouton/...) : la racine du dépôt, où est connect_database, dans le chemin
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from constraint_manager import ConstraintManager, ConstraintPriority
-import mysql.connector
 
 def add_no_course_slot(manager: ConstraintManager, start_time: str, end_time: str, reason: str, week_id=None, force_permanent=False):
     """
@@ -42,29 +43,21 @@ def add_no_course_slot(manager: ConstraintManager, start_time: str, end_time: st
         print(f"\nAjout de créneau bloqué ({start_time}-{end_time}) pour {len(groups)} groupes...")
         print(f"   Raison: {reason}")
         
-        added_count = 0
-        
         # Pour chaque jour de la semaine
         days = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi"]
         
-        for group in groups:
-            group_id = group['id']
-            group_name = group['name']
-            
-            for day in days:
-                try:
-                    constraint_id = manager.add_group_unavailability(
-                        group_id=group_id,
-                        day=day,
-                        start_time=start_time,
-                        end_time=end_time,
-                        reason=reason,
-                        priority=ConstraintPriority.HARD,
-                        week_id=actual_week_id
-                    )
-                    added_count += 1
-                except Exception as e:
-                    print(f"Erreur pour {group_name} {day}: {e}")
+        # Toutes les lignes groupe × jour en une seule insertion (une connexion, un commit)
+        try:
+            added_count = manager.add_group_unavailabilities_bulk(
+                [(group['id'], day, start_time, end_time) for group in groups for day in days],
+                reason=reason,
+                priority=ConstraintPriority.HARD,
+                week_id=actual_week_id,
+                force_permanent=actual_week_id is None
+            )
+        except Exception as e:
+            print(f"Erreur, aucune contrainte ajoutée: {e}")
+            return
         
         print(f"\n{added_count} contraintes ajoutées ({week_label})")
         print(f"   Groupes concernés: {', '.join([g['name'] for g in groups])}")
@@ -5,20 +5,19 @@ API de gestion des contraintes - Exemples d'utilisation
 Démontre toutes les fonctionnalités du gestionnaire de contraintes
 """
 
+import os
+import sys
+# Script lancé directement (python bouton/...) : la racine du dépôt, où est connect_database, dans le chemin
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from constraint_manager import ConstraintManager, ConstraintPriority, ConstraintType
-import mysql.connector
+from connect_database import get_db_connection
 DEFAULT_YEAR_ID = None
 DEFAULT_WEEK_ID = None
 
 def choose_year():
     """Permet de choisir une année (years.id)"""
-    conn = mysql.connector.connect(
-        host='127.0.0.1',
-        port=33066,
-        database='edt_app',
-        user='edt_user',
-        password='userpassword'
-    )
+    conn = get_db_connection()
     cur = conn.cursor(dictionary=True)
     try:
         cur.execute("SELECT id, name FROM years ORDER BY name DESC")
@@ -43,13 +42,7 @@ def choose_year():
 
 def choose_week(year_id: int | None = None):
     """Permet de choisir une semaine (weeks.id), éventuellement filtrée par année"""
-    conn = mysql.connector.connect(
-        host='127.0.0.1',
-        port=33066,
-        database='edt_app',
-        user='edt_user',
-        password='userpassword'
-    )
+    conn = get_db_connection()
     cur = conn.cursor(dictionary=True)
     try:
         if year_id:
@@ -78,13 +71,7 @@ def choose_week(year_id: int | None = None):
 
 def get_available_entities():
     """Récupère les entités disponibles (enseignants, salles, groupes)"""
-    conn = mysql.connector.connect(
-        host='127.0.0.1',
-        port=33066,
-        database='edt_app',
-        user='edt_user',
-        password='userpassword'
-    )
+    conn = get_db_connection()
     cursor = conn.cursor(dictionary=True)
     
     try:
@@ -208,9 +195,7 @@ def display_constraints_by_year(year_id: int):
     print("="*60)
 
     # Récupérer les semaines de l'année
-    conn = mysql.connector.connect(
-        host='127.0.0.1', port=33066, database='edt_app', user='edt_user', password='userpassword'
-    )
+    conn = get_db_connection()
     cur = conn.cursor(dictionary=True)
     try:
         cur.execute("SELECT id, week_number, start_date, end_date FROM weeks WHERE year_id = %s ORDER BY week_number", (year_id,))
@@ -234,14 +219,6 @@ def display_constraints_by_year(year_id: int):
 def interactive_menu():
     """Menu interactif pour gérer les contraintes"""
     manager = ConstraintManager()
-    # Tentative automatique de création de la colonne is_exam si nécessaire.
-    # Ceci utilise la logique déjà présente dans ConstraintManager et n'ajoute
-    # aucun fichier externe. Les erreurs sont affichées mais n'empêchent pas
-    # l'ouverture du menu.
-    try:
-        manager.ensure_is_exam_column()
-    except Exception as e:
-        print(f"Avertissement: la migration is_exam a échoué (ignorée): {e}")
     # Sélectionner une année et une semaine et les définir par défaut pour les ajouts
     global DEFAULT_YEAR_ID, DEFAULT_WEEK_ID
     if not DEFAULT_YEAR_ID:
@@ -5,6 +5,8 @@ Module d'intégration des contraintes avec OR-Tools CP-SAT Solver
 Permet d'ajouter les contraintes métier à l'algorithme de génération d'emploi du temps
 """
 
+import os
+import sys
 from typing import Dict, List, Optional, Set, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -16,6 +18,9 @@ except ImportError:
     print("OR-Tools non installé. Installez-le avec: pip install ortools")
     cp_model = None
 
+# Script lancé directement (python bouton/...) : la racine du dépôt, où est connect_database, dans le chemin
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from constraint_validator import ConstraintValidator
 
 
@@ -3,13 +3,18 @@
 """
 Module de gestion des contraintes pour l'emploi du temps
 Backend pour l'ajout, modification et suppression de contraintes
+
+Connexion : connect_database.py (racine du dépôt), paramètres lus dans l'environnement / .env.
+Les scripts de ce dossier (add_time_constraints, constraint_api, ...) ajoutent eux-mêmes la racine
+au chemin : python bouton/constraint_api.py suffit.
 """
 
-import mysql.connector
 from datetime import datetime, time
 from typing import List, Dict, Optional, Tuple
 from enum import Enum
 
+from connect_database import get_db_config, get_db_connection
+
 class ConstraintType(Enum):
     """Types de contraintes possibles"""
     TEACHER_UNAVAILABLE = "teacher_unavailable"
@@ -30,20 +35,14 @@ class ConstraintPriority(Enum):
 class ConstraintManager:
     """Gestionnaire de contraintes pour l'emploi du temps"""
     
-    def __init__(self, host='127.0.0.1', port=33066, database='edt_app', 
-                 user='edt_user', password='userpassword'):
-        """Initialise le gestionnaire de contraintes"""
-        self.connection_params = {
-            'host': host,
-            'port': port,
-            'database': database,
-            'user': user,
-            'password': password
-        }
-        # Pour éviter de vérifier/migrer en boucle
-        self._week_columns_checked = False
-        # Vérifie séparément la colonne is_exam (ne pas bloquer les migrations week_id)
-        self._is_exam_checked = False
+    def __init__(self, host=None, port=None, database=None, user=None, password=None):
+        """Initialise le gestionnaire de contraintes (paramètres absents : get_db_config())"""
+        self.connection_params = get_db_config()
+        for cle, valeur in (('host', host), ('port', port), ('database', database),
+                            ('user', user), ('password', password)):
+            if valeur is not None:
+                self.connection_params[cle] = valeur
+        # Le schéma (week_id, is_exam...) est mis à jour au déploiement : python migrations.py
         # Semaine par défaut
         self.default_week_id: Optional[int] = None
 
@@ -52,100 +51,9 @@ class ConstraintManager:
         self.default_week_id = week_id
     
     def _get_connection(self):
-        """Crée une connexion à la base de données"""
-        return mysql.connector.connect(**self.connection_params)
-
-    # ==================== MIGRATIONS SCHEMA ====================
-    def _column_exists(self, cursor, table_name: str, column_name: str):
-        """Vérifie si une colonne existe dans la table donnée"""
-        cursor.execute(
-            """
-            SELECT COUNT(*) AS cnt
-            FROM INFORMATION_SCHEMA.COLUMNS
-            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
-            """,
-            (table_name, column_name)
-        )
-        row = cursor.fetchone()
-        return (row[0] if isinstance(row, tuple) else row.get('cnt', 0)) > 0
-
-    def _ensure_week_id_column_for(self, cursor, table_name: str, fk_name: str):
-        """Ajoute la colonne week_id + index + contrainte FK si absents"""
-        if not self._column_exists(cursor, table_name, 'week_id'):
-            cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN week_id INT NULL")
-            # Index pour les requêtes par semaine
-            try:
-                cursor.execute(f"CREATE INDEX idx_{table_name}_week_id ON {table_name}(week_id)")
-            except Exception:
-                pass
-            # Contrainte FK
-            try:
-                cursor.execute(
-                    f"ALTER TABLE {table_name} ADD CONSTRAINT {fk_name} FOREIGN KEY (week_id) REFERENCES weeks(id)"
-                )
-            except Exception:
-                # Contrainte déjà existante ou autre: on ignore
-                pass
-
-    def _ensure_week_columns_once(self, conn=None):
-        """S'assure une fois que les colonnes week_id existent sur toutes les tables de contraintes"""
-        if self._week_columns_checked:
-            return
-        close_after = False
-        if conn is None:
-            conn = self._get_connection()
-            close_after = True
-        cur = conn.cursor()
-        try:
-            self._ensure_week_id_column_for(cur, 'teacher_constraints', 'fk_teacher_constraints_week_id')
-            self._ensure_week_id_column_for(cur, 'room_constraints', 'fk_room_constraints_week_id')
-            self._ensure_week_id_column_for(cur, 'group_constraints', 'fk_group_constraints_week_id')
-            # noter que l'ajout de is_exam est géré séparément via _ensure_is_exam_column
-            conn.commit()
-            self._week_columns_checked = True
-        except Exception:
-            conn.rollback()
-            # on ne bloque pas si la migration échoue, mais on laisse l'exception monter si besoin
-            raise
-        finally:
-            cur.close()
-            if close_after:
-                conn.close()
+        """Connexion prise dans le pool partagé (connect_database.py) ; close() la rend au pool"""
+        return get_db_connection(self.connection_params)
 
-    def _ensure_is_exam_column(self, conn=None):
-        """S'assure que la colonne `is_exam` existe sur `slots`.
-        """
-        if self._is_exam_checked:
-            return
-        close_after = False
-        if conn is None:
-            conn = self._get_connection()
-            close_after = True
-        cur = conn.cursor()
-        try:
-            if not self._column_exists(cur, 'slots', 'is_exam'):
-                try:
-                    cur.execute("ALTER TABLE slots ADD COLUMN is_exam BOOLEAN DEFAULT 0")
-                    conn.commit()
-                except Exception as e:
-                    # Ne pas lever ici : on veut ignorer l'erreur mais laisser la possibilité
-                    # de retenter plus tard (ne pas positionner _is_exam_checked à True).
-                    conn.rollback()
-                    print(f"Avertissement: impossible d'ajouter la colonne is_exam: {e}")
-                    return
-            # si on arrive ici, la colonne existe (ou a été créée)
-            self._is_exam_checked = True
-        finally:
-            cur.close()
-            if close_after:
-                conn.close()
-
-    def ensure_is_exam_column(self):
-        """Public wrapper: assure that `slots.is_exam` existe.
-        """
-        # appelle la méthode interne; si une exception survient elle remontera
-        self._ensure_is_exam_column()
-    
     # ==================== CONTRAINTES ENSEIGNANTS ====================
     
     def add_teacher_unavailability(self, teacher_id: int, day: str, start_time: str, end_time: str, reason: str = None,  priority: ConstraintPriority = ConstraintPriority.HARD, week_id: Optional[int] = None, force_permanent: bool = False):
@@ -156,8 +64,6 @@ class ConstraintManager:
         cursor = conn.cursor()
         
         try:
-            # S'assurer que le schéma contient bien week_id (migration si nécessaire)
-            self._ensure_week_columns_once(conn)
             # Vérifier que l'enseignant existe
             cursor.execute("SELECT id FROM teachers WHERE id = %s", (teacher_id,))
             if not cursor.fetchone():
@@ -242,8 +148,6 @@ class ConstraintManager:
         cursor = conn.cursor()
         
         try:
-            # Migration éventuelle
-            self._ensure_week_columns_once(conn)
             # Vérifier que la salle existe
             cursor.execute("SELECT id FROM rooms WHERE id = %s", (room_id,))
             if not cursor.fetchone():
@@ -322,8 +226,6 @@ class ConstraintManager:
         cursor = conn.cursor()
         
         try:
-            # Migration éventuelle
-            self._ensure_week_columns_once(conn)
             cursor.execute("SELECT id FROM `groups` WHERE id = %s", (group_id,))
             if not cursor.fetchone():
                 raise ValueError(f"Groupe {group_id} non trouvé")
@@ -393,6 +295,74 @@ class ConstraintManager:
             cursor.close()
             conn.close()
     
+    # ==================== INSERTIONS GROUPÉES ====================
+
+    def _add_unavailabilities_bulk(self, table_name: str, entity_column: str, entity_table: str, label: str,
+                                   constraint_type: ConstraintType, unavailabilities: List[Tuple[int, str, str, str]],
+                                   reason: str = None, priority: ConstraintPriority = ConstraintPriority.HARD,
+                                   week_id: Optional[int] = None, force_permanent: bool = False) -> int:
+        """
+        Insère plusieurs indisponibilités (entity_id, jour, début, fin) sur une seule connexion :
+        une requête IN (...) pour vérifier les entités, un executemany, un seul commit.
+        Tout ou rien : une entité inconnue annule l'ensemble. Renvoie le nombre de contraintes insérées.
+        """
+        if not unavailabilities:
+            return 0
+        conn = self._get_connection()
+        cursor = conn.cursor()
+
+        try:
+            ids = sorted({u[0] for u in unavailabilities})
+            cursor.execute(f"SELECT id FROM {entity_table} WHERE id IN ({', '.join(['%s'] * len(ids))})", tuple(ids))
+            missing = set(ids) - {row[0] for row in cursor.fetchall()}
+            if missing:
+                raise ValueError(f"{label} non trouvé(s) : {sorted(missing)}")
+
+            # Même règle de semaine que les insertions unitaires
+            if force_permanent:
+                ins_week_id = None
+            else:
+                ins_week_id = week_id if week_id is not None else self.default_week_id
+            query = f"""
+                INSERT INTO {table_name}
+                ({entity_column}, constraint_type, day_of_week, start_time, end_time,
+                 reason, priority, week_id, created_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW())
+            """
+            cursor.executemany(query, [
+                (entity_id, constraint_type.value, day, start_time, end_time, reason, priority.value, ins_week_id)
+                for entity_id, day, start_time, end_time in unavailabilities
+            ])
+            conn.commit()
+            print(f" {len(unavailabilities)} contrainte(s) {label.lower()} créée(s)")
+            return len(unavailabilities)
+
+        except Exception as e:
+            conn.rollback()
+            print(f" Erreur lors de l'insertion groupée: {e}")
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+    def add_teacher_unavailabilities_bulk(self, unavailabilities: List[Tuple[int, str, str, str]], reason: str = None, priority: ConstraintPriority = ConstraintPriority.HARD, week_id: Optional[int] = None, force_permanent: bool = False) -> int:
+        """Version groupée de add_teacher_unavailability : liste de (teacher_id, jour, début, fin)"""
+        return self._add_unavailabilities_bulk('teacher_constraints', 'teacher_id', 'teachers', 'Enseignant',
+                                               ConstraintType.TEACHER_UNAVAILABLE, unavailabilities,
+                                               reason, priority, week_id, force_permanent)
+
+    def add_room_unavailabilities_bulk(self, unavailabilities: List[Tuple[int, str, str, str]], reason: str = None, priority: ConstraintPriority = ConstraintPriority.HARD, week_id: Optional[int] = None, force_permanent: bool = False) -> int:
+        """Version groupée de add_room_unavailability : liste de (room_id, jour, début, fin)"""
+        return self._add_unavailabilities_bulk('room_constraints', 'room_id', 'rooms', 'Salle',
+                                               ConstraintType.ROOM_UNAVAILABLE, unavailabilities,
+                                               reason, priority, week_id, force_permanent)
+
+    def add_group_unavailabilities_bulk(self, unavailabilities: List[Tuple[int, str, str, str]], reason: str = None, priority: ConstraintPriority = ConstraintPriority.HARD, week_id: Optional[int] = None, force_permanent: bool = False) -> int:
+        """Version groupée de add_group_unavailability : liste de (group_id, jour, début, fin)"""
+        return self._add_unavailabilities_bulk('group_constraints', 'group_id', '`groups`', 'Groupe',
+                                               ConstraintType.GROUP_UNAVAILABLE, unavailabilities,
+                                               reason, priority, week_id, force_permanent)
+
     # ==================== GESTION DES CONTRAINTES ====================
     
     def delete_constraint(self, constraint_type: str, constraint_id: int):
@@ -509,17 +479,13 @@ class ConstraintManager:
 
     # ==================== SLOTS EXAM FLAG ====================
     def set_slot_exam(self, slot_id: int, is_exam: bool = True):
-        """Marque/démarque un slot comme examen en ajoutant/modifiant la colonne `is_exam` sur la table `slots`.
+        """Marque/démarque un slot comme examen (colonne `is_exam` de la table `slots`, migration 2).
 
         Retourne True si la ligne a été modifiée, False sinon.
         """
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
-            # s'assurer que les colonnes nécessaires existent
-            self._ensure_week_columns_once(conn)
-            # s'assurer que la colonne is_exam existe (tentative de migration si nécessaire)
-            self._ensure_is_exam_column(conn)
             # Mettre à jour la colonne is_exam
             cursor.execute("UPDATE slots SET is_exam = %s WHERE id = %s", (1 if is_exam else 0, slot_id))
             conn.commit()
@@ -691,13 +657,7 @@ class ConstraintManager:
 
 def create_constraint_tables():
     """Crée les tables nécessaires pour stocker les contraintes"""
-    conn = mysql.connector.connect(
-        host='127.0.0.1',
-        port=33066,
-        database='edt_app',
-        user='edt_user',
-        password='userpassword'
-    )
+    conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
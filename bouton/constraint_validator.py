@@ -5,8 +5,14 @@ Module de validation des contraintes pour la génération d'emploi du temps
 Intègre les contraintes définies dans le système avec l'algorithme de génération
 """
 
+import os
+import sys
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, time
+
+# Script lancé directement (python bouton/...) : la racine du dépôt, où est connect_database, dans le chemin
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from constraint_manager import ConstraintManager, ConstraintType, ConstraintPriority
 
 
@@ -1,10 +1,23 @@
 import mysql.connector
+import mysql.connector.pooling
 import os
+import threading
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
 
 load_dotenv()
 
+# Taille des pools (moteur SQLAlchemy et pool mysql-connector), partagés par tous les modules du processus
+POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+POOL_MAX_OVERFLOW = int(os.getenv('DB_POOL_MAX_OVERFLOW', 10))
+POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 3600))  # secondes, avant le wait_timeout de MySQL
+
+# Registre : un moteur / un pool par configuration de connexion
+_engines = {}
+_pools = {}
+_verrou = threading.Lock()
+
+
 def get_db_config():
     """Retourne le dictionnaire de configuration (utile pour tes classes Test)"""
     return {
@@ -15,17 +28,63 @@ def get_db_config():
         'password': os.getenv('DB_PASSWORD')
     }
 
-def get_db_connection():
-    """Connexion directe via mysql-connector (ton code original)"""
-    config = get_db_config()
-    return mysql.connector.connect(**config)
 
-def get_engine():
-    """Crée l'engine SQLAlchemy nécessaire pour pd.read_sql()"""
-    config = get_db_config()
-    return create_engine(
-        f"mysql+mysqlconnector://{config['user']}:{config['password']}@"
-        f"{config['host']}:{config['port']}/{config['database']}"
-    )
+def _cle(config):
+    return tuple(config.get(k) for k in ('host', 'port', 'database', 'user', 'password'))
+
+
+def get_db_connection(config=None):
+    """
+    Connexion mysql-connector prise dans le pool partagé de cette configuration (get_db_config() par défaut).
+    close() la rend au pool au lieu de fermer la socket. Pool plein : connexion directe, fermée normalement.
+    """
+    config = config or get_db_config()
+    cle = _cle(config)
+    with _verrou:
+        pool = _pools.get(cle)
+        if pool is None:
+            pool = mysql.connector.pooling.MySQLConnectionPool(
+                pool_name=f"edt_{len(_pools)}",
+                pool_size=min(POOL_SIZE, mysql.connector.pooling.CNX_POOL_MAXSIZE),
+                pool_reset_session=True, **config)
+            _pools[cle] = pool
+    try:
+        return pool.get_connection()
+    except mysql.connector.errors.PoolError:
+        print(f"   -> Pool de connexions plein ({pool.pool_size}), connexion directe")
+        return mysql.connector.connect(**config)
+
+
+def get_engine(config=None):
+    """Moteur SQLAlchemy (QueuePool) partagé de cette configuration, nécessaire pour pd.read_sql()"""
+    config = config or get_db_config()
+    cle = _cle(config)
+    with _verrou:
+        engine = _engines.get(cle)
+        if engine is None:
+            engine = create_engine(
+                f"mysql+mysqlconnector://{config['user']}:{config['password']}@"
+                f"{config['host']}:{config['port']}/{config['database']}",
+                pool_size=POOL_SIZE, max_overflow=POOL_MAX_OVERFLOW,
+                pool_recycle=POOL_RECYCLE, pool_pre_ping=True,
+            )
+            _engines[cle] = engine
+    return engine
+
+
+def apres_fork():
+    """
+    À appeler dans un processus fils (pool de processus) : oublie les connexions héritées du parent sans
+    les fermer, elles restent les siennes ; le fils ouvre les siennes à la demande.
+    """
+    with _verrou:
+        for engine in _engines.values():
+            engine.dispose(close=False)
+        _pools.clear()
+
 
-engine = get_engine()
\ No newline at end of file
+def __getattr__(nom):
+    """connect_database.engine est créé au premier accès, plus à l'import (mode hors ligne sans serveur)."""
+    if nom == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {nom!r}")
@@ -1,7 +1,8 @@
 from typing import Dict, Any, Tuple
 
 import pandas as pd
-from sqlalchemy import create_engine
+
+from connect_database import get_engine
 
 
 # ==============================================================================
@@ -15,10 +16,7 @@ class DataProvider:
 
     def __init__(self, db_config: Dict[str, Any]):
         self.db_config = db_config
-        self.engine = create_engine(
-            f"mysql+mysqlconnector://{db_config['user']}:{db_config['password']}@"
-            f"{db_config['host']}:{db_config['port']}/{db_config['database']}"
-        )
+        self.engine = get_engine(db_config)  # moteur partagé (connect_database.py)
 
     def load_and_prepare_data(self) -> Dict[str, Any]:
         """
@@ -1,10 +1,48 @@
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Tuple, Optional, List
 
 import pandas as pd
-from sqlalchemy import create_engine
+from sqlalchemy import text
 
 from function import get_availabilityProf_From_Unavailable, get_availabilityRoom_From_Unavailable, \
     get_availabilityGroup_From_Unavailable, convert_days_int_to_string, get_availabilitySlot_From_Unavailable
+from group_hierarchy import HIERARCHIE_PAR_DEFAUT
+from data_sources import SourceDonnees, SourceMySQL
+from problem_bundle import ProblemBundle
+from warm_start import heure_vers_offset, signature_slot
+from week_snapshot import empreinte, ecrire_snapshot, lire_snapshot
+
+# Tables lues par load_and_prepare_data : celles qui ont updated_at sont résumées par (COUNT, MAX(updated_at)),
+# les tables de contraintes (sans updated_at) par (COUNT, BIT_XOR des CRC32 de leurs lignes)
+TABLES_HORODATEES = ("slots_teachers", "teachers", "users", "rooms", "teachings", "teachings_rooms", "weeks",
+                     "promotions", "`groups`", "subgroups")
+TABLES_CONTRAINTES = {"teacher_constraints": "teacher_id", "room_constraints": "room_id",
+                      "group_constraints": "group_id", "slot_constraints": "slot_id"}
+COLONNES_CONTRAINTES = ["day_of_week", "start_time", "end_time", "priority", "week_id"]
+
+
+def requete_contraintes() -> str:
+    """
+    Contraintes actives de la semaine %(week_id)s pour les quatre tables, en une requête : chaque ligne
+    porte sa table d'origine (source) et son entité (entite_id). Une ligne propre à la semaine remplace
+    les lignes permanentes (week_id NULL) de la même entité et du même jour : RANK() sur (entité, jour),
+    ordonné par week_id IS NULL, ne garde que le premier rang (toutes les lignes de la semaine s'il y en a,
+    sinon toutes les lignes permanentes). Index associés : migration 4 (migrations.py).
+    """
+    colonnes = ", ".join(COLONNES_CONTRAINTES)
+    requetes = [f"SELECT '{table}' AS source, {entite} AS entite_id, {colonnes}, "
+                f"RANK() OVER (PARTITION BY {entite}, day_of_week ORDER BY week_id IS NULL) AS rang "
+                f"FROM {table} WHERE active = 1 AND (week_id = %(week_id)s OR week_id IS NULL)"
+                for table, entite in TABLES_CONTRAINTES.items()]
+    return (f"SELECT source, entite_id, {colonnes} FROM ({' UNION ALL '.join(requetes)}) contraintes "
+            f"WHERE rang = 1")
+
+
+def separer_contraintes(df_contraintes: pd.DataFrame) -> List[pd.DataFrame]:
+    """Résultat de requete_contraintes → un DataFrame par table (ordre de TABLES_CONTRAINTES), colonne d'entité d'origine."""
+    par_source = dict(tuple(df_contraintes.groupby('source', sort=False)))
+    vide = df_contraintes.iloc[:0]
+    return [par_source.get(table, vide).drop(columns='source').rename(columns={'entite_id': entite})
+            .reset_index(drop=True) for table, entite in TABLES_CONTRAINTES.items()]
 
 
 # ==============================================================================
@@ -16,18 +54,88 @@ class DataProviderID:
     données nécessaires pour le modèle d'optimisation.
     """
 
-    def __init__(self, db_config: Dict[str, Any]):
+    def __init__(self, db_config: Optional[Dict[str, Any]] = None, dossier_cache: Optional[str] = None,
+                 source: Optional[SourceDonnees] = None):
         self.db_config = db_config
-        self.engine = create_engine(
-            f"mysql+mysqlconnector://{db_config['user']}:{db_config['password']}@"
-            f"{db_config['host']}:{db_config['port']}/{db_config['database']}"
-        )
+        # Dossier des snapshots de semaines (week_snapshot.py) ; None = toujours relire la base
+        self.dossier_cache = dossier_cache
+        # D'où viennent les données (data_sources.py) : MySQL par défaut, sinon snapshot ou SQLite en mémoire
+        self.source = source if source is not None else SourceMySQL(db_config)
+        self.engine = self.source.engine  # None pour une source en lecture seule
+        self._noms_salles = []  # get_list_room() d'une source sans base : noms enregistrés avec la semaine
+        self._hierarchies = {}  # load_group_hierarchy : {year_id: hiérarchie}, une requête par année
+
+    def load_static_data(self) -> Dict[str, Any]:
+        """
+        Données de référence communes à toutes les semaines (salles, professeurs, affectations
+        prof/slot, salles imposées) : à charger une seule fois quand on génère plusieurs semaines
+        (batch_scheduler.py). La hiérarchie des groupes dépend de l'année : voir load_group_hierarchy.
+        """
+        df_salles = self.source.lire("SELECT id as name, seat_capacity FROM rooms WHERE id NOT IN (17, 18)")
+        df_profs_with_id = self.source.lire(
+            """SELECT t.id                                   AS teacher_id,
+                      CONCAT(u.first_name, ' ', u.last_name) AS prof_name
+               FROM teachers t
+                        JOIN users u ON t.user_id = u.id""")
+        query_prof_slot = """
+            SELECT s.id AS slot_id, CONCAT(u.first_name, ' ', u.last_name) AS prof_name
+            FROM slots_teachers st
+            JOIN slots s ON st.slot_id = s.id
+            JOIN teachers t ON st.teacher_id = t.id
+            JOIN users u ON t.user_id = u.id
+        """
+        df_prof_slot = self.source.lire(query_prof_slot)
+        # Salles imposées par enseignement et type de cours (table teachings_rooms)
+        df_salles_enseignements = self.source.lire("SELECT teaching_id, type_id, room_id FROM teachings_rooms")
+        return {
+            "salles": df_salles.set_index('name')['seat_capacity'].to_dict(),
+            "profs": df_profs_with_id['prof_name'].tolist(),
+            "prof_to_teacher_id": dict(zip(df_profs_with_id['prof_name'], df_profs_with_id['teacher_id'])),
+            "profs_par_slot": df_prof_slot.groupby('slot_id')['prof_name'].apply(list).to_dict(),
+            "salles_par_enseignement": df_salles_enseignements.groupby(['teaching_id', 'type_id'])['room_id'].apply(list).to_dict(),
+        }
 
-    def load_and_prepare_data(self,week_id:int) -> Dict[str, Any]:
+    def list_week_ids(self, year_id: Optional[int] = None, premiere: Optional[int] = None,
+                      derniere: Optional[int] = None) -> List[int]:
+        """Identifiants des semaines (table weeks) d'une année et/ou d'un intervalle d'id, dans l'ordre."""
+        conditions, params = [], {}
+        if year_id is not None:
+            conditions.append("year_id = %(year_id)s")
+            params["year_id"] = year_id
+        if premiere is not None:
+            conditions.append("id >= %(premiere)s")
+            params["premiere"] = premiere
+        if derniere is not None:
+            conditions.append("id <= %(derniere)s")
+            params["derniere"] = derniere
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        df_semaines = self.source.lire(f"SELECT id FROM weeks {where} ORDER BY start_date, id", params=params)
+        return df_semaines['id'].tolist()
+
+    def load_and_prepare_data(self, week_id: int, statique: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Charge toutes les données depuis la BDD avec Pandas et les prépare
         dans un format utilisable par le modèle.
+        statique : résultat de load_static_data() déjà chargé (sinon rechargé ici).
+        Avec un dossier_cache, la semaine est relue depuis son snapshot tant que l'empreinte des tables
+        sources n'a pas changé, et le snapshot est (ré)écrit sinon.
         """
+        donnees = self.source.semaine_preparee(week_id)
+        if donnees is not None:
+            self._noms_salles = donnees.get('noms_salles', [])
+            print(f"1. Données de la semaine {week_id} lues depuis la source {self.source.nom}")
+            print(f"   -> {len(donnees['cours'])} cours à planifier.")
+            return donnees
+        hachage = None
+        if self.dossier_cache is not None:
+            hachage = self.empreinte_sources(week_id)
+            donnees = lire_snapshot(self.dossier_cache, week_id, hachage)
+            if donnees is not None:
+                print(f"1. Données de la semaine {week_id} relues depuis le cache ({self.dossier_cache})")
+                print(f"   -> {len(donnees['cours'])} cours à planifier.")
+                return donnees
+        if statique is None:
+            statique = self.load_static_data()
         list_amphi_c=[{0: [(11, 23)]},{1: [(0, 7)]},{2: [(0, 7)]},{3: []},{4: [(11, 23)]}] #
         #Il faudrait que l'application puisse gérer le fait d'importer une liste des jours d'amphi, pour le
         #moment on met les infos en dur afin de faire les tests
@@ -37,19 +145,8 @@ class DataProviderID:
         slots = [(d, s) for d in range(jours) for s in range(creneaux_par_jour)]
         fenetre_midi = list(range(8, 11))
 
-        df_salles = pd.read_sql("SELECT id as name, seat_capacity FROM rooms WHERE id NOT IN (17, 18)", self.engine)
-        #df_profs = pd.read_sql(
-        #    "SELECT CONCAT(u.first_name, ' ', u.last_name) AS prof_name FROM teachers t JOIN users u ON t.user_id = u.id",
-        #    self.engine)
-        df_profs_with_id = pd.read_sql(
-            """SELECT t.id                                   AS teacher_id,
-                      CONCAT(u.first_name, ' ', u.last_name) AS prof_name
-               FROM teachers t
-                        JOIN users u ON t.user_id = u.id""",
-            self.engine
-        )
-        prof_to_teacher_id = dict(zip(df_profs_with_id['prof_name'], df_profs_with_id['teacher_id']))
-        profs = df_profs_with_id['prof_name'].tolist()  # Cette liste est maintenant cohérente
+        prof_to_teacher_id = statique['prof_to_teacher_id']
+        profs = list(statique['profs'])  # copie : _build_course_structures y ajoute les profs fictifs None_k de la semaine
         query_slots = """
                       SELECT s.id, \
                              s.duration, \
@@ -61,7 +158,8 @@ class DataProviderID:
                              gr.student_amount    AS group_size, \
                              sub.student_amount   AS subgroup_size, \
                              s.type_id, \
-                             s.promotion_id
+                             s.promotion_id, \
+                             s.teaching_id
                       FROM slots s
                                LEFT JOIN teachings t ON s.teaching_id = t.id
                                LEFT JOIN promotions p ON s.promotion_id = p.id
@@ -72,104 +170,27 @@ class DataProviderID:
                                LEFT JOIN subgroups sub ON s.subgroup_id = sub.id  
                       WHERE week_id= %s
                       """
-        df_planning = pd.read_sql(query_slots, self.engine, params=(week_id,), index_col='id')
-        query_prof_slot = """
-            SELECT s.id AS slot_id, CONCAT(u.first_name, ' ', u.last_name) AS prof_name
-            FROM slots_teachers st
-            JOIN slots s ON st.slot_id = s.id
-            JOIN teachers t ON st.teacher_id = t.id
-            JOIN users u ON t.user_id = u.id
-        """
-        # AJOUTE CECI (corrigé et fonctionnel)
-        query_dispos = """
-                       SELECT tc.teacher_id, tc.day_of_week, tc.start_time, tc.end_time, tc.priority, tc.week_id
-                       FROM teacher_constraints tc
-                       WHERE tc.active = 1
-                         AND (tc.week_id = %(week_id)s OR tc.week_id IS NULL)
-                         AND (
-                           tc.week_id = %(week_id)s
-                               OR (tc.week_id IS NULL
-                               AND NOT EXISTS (SELECT 1 \
-                                               FROM teacher_constraints tc2 \
-                                               WHERE tc2.teacher_id = tc.teacher_id \
-                                                 AND tc2.day_of_week = tc.day_of_week \
-                                                 AND tc2.week_id = %(week_id)s \
-                                                 AND tc2.active = 1)
-                               )
-                           ) \
-                       """
-        df_dispos = pd.read_sql(query_dispos, self.engine, params={"week_id": week_id})
+        df_planning = self.source.lire(query_slots, params=(week_id,), index_col='id')
+        # Contraintes des quatre tables en un seul aller-retour (voir requete_contraintes)
+        df_contraintes = self.source.lire(requete_contraintes(), params={"week_id": week_id})
+        df_dispos, df_dispos_salles, df_dispos_groupes, df_dispos_slots = separer_contraintes(df_contraintes)
         disponibilites_profs=get_availabilityProf_From_Unavailable(df_dispos,creneaux_par_jour)
-        query_dispos = """
-                       SELECT rc.room_id, rc.day_of_week, rc.start_time, rc.end_time, rc.priority, rc.week_id
-                       FROM room_constraints rc
-                       WHERE rc.active = 1
-                         AND (rc.week_id = %(week_id)s OR rc.week_id IS NULL)
-                         AND (
-                           rc.week_id = %(week_id)s
-                               OR (rc.week_id IS NULL
-                               AND NOT EXISTS (SELECT 1 \
-                                               FROM room_constraints rc2 \
-                                               WHERE rc2.room_id = rc.room_id \
-                                                 AND rc2.day_of_week = rc.day_of_week \
-                                                 AND rc2.week_id = %(week_id)s \
-                                                 AND rc2.active = 1)
-                               )
-                           ) \
-                       """
-        df_dispos_salles = pd.read_sql(query_dispos, self.engine, params={"week_id": week_id})
         disponibilites_salles=get_availabilityRoom_From_Unavailable(df_dispos_salles,creneaux_par_jour)
-
-        query_dispos = """
-                       SELECT gc.group_id, gc.day_of_week, gc.start_time, gc.end_time, gc.priority, gc.week_id
-                       FROM group_constraints gc
-                       WHERE gc.active = 1
-                         AND (gc.week_id = %(week_id)s OR gc.week_id IS NULL)
-                         AND (
-                           gc.week_id = %(week_id)s
-                               OR (gc.week_id IS NULL
-                               AND NOT EXISTS (SELECT 1 \
-                                               FROM group_constraints gc2 \
-                                               WHERE gc2.group_id = gc.group_id \
-                                                 AND gc2.day_of_week = gc.day_of_week \
-                                                 AND gc2.week_id = %(week_id)s \
-                                                 AND gc2.active = 1)
-                               )
-                           ) \
-                       """
-        df_dispos_groupes = pd.read_sql(query_dispos, self.engine, params={"week_id": week_id})
-        disponibilites_groupes=get_availabilityGroup_From_Unavailable(df_dispos_groupes,20)
-
-        query_dispos = """
-                       SELECT sc.slot_id, sc.day_of_week, sc.start_time, sc.end_time, sc.priority, sc.week_id
-                       FROM slot_constraints sc
-                       WHERE sc.active = 1
-                         AND (sc.week_id = %(week_id)s OR sc.week_id IS NULL)
-                         AND (
-                           sc.week_id = %(week_id)s
-                               OR (sc.week_id IS NULL
-                               AND NOT EXISTS (SELECT 1 \
-                                               FROM slot_constraints sc2 \
-                                               WHERE sc2.slot_id = sc.slot_id \
-                                                 AND sc2.day_of_week = sc.day_of_week \
-                                                 AND sc2.week_id = %(week_id)s \
-                                                 AND sc2.active = 1)
-                               )
-                           ) \
-                       """
-        df_dispos_slots = pd.read_sql(query_dispos, self.engine, params={"week_id": week_id})
-        disponibilites_slots=get_availabilitySlot_From_Unavailable(df_dispos_slots,20)
+        disponibilites_groupes=get_availabilityGroup_From_Unavailable(df_dispos_groupes,creneaux_par_jour)
+        disponibilites_slots=get_availabilitySlot_From_Unavailable(df_dispos_slots,creneaux_par_jour)
         # DEBUG
-        df_prof_slot = pd.read_sql(query_prof_slot, self.engine)
-        profs_par_slot = df_prof_slot.groupby('slot_id')['prof_name'].apply(list).to_dict()
+        profs_par_slot = statique['profs_par_slot']
         print("profs par slot : ",profs_par_slot)
         #profs = df_profs['prof_name'].tolist()
 
+        salles_par_enseignement = statique['salles_par_enseignement']
+        salles = dict(statique['salles'])
+        hierarchie_groupes = self.load_group_hierarchy(week_id)
+
         #cours, duree_cours, taille_groupes, map_groupe_cours = self._build_course_structures(df_planning,profs_par_slot, profs)
         cours, duree_cours, taille_groupes, map_groupe_cours = self._build_course_structures(
-            df_planning, profs_par_slot, profs
+            df_planning, profs_par_slot, profs, salles_par_enseignement, list(salles.keys()), hierarchie_groupes
         )
-        salles = df_salles.set_index('name')['seat_capacity'].to_dict()
 
         print(f"   -> {len(cours)} cours à planifier.")
         print(f"   -> {len(salles)} salles et {len(profs)} professeurs disponibles.")
@@ -192,11 +213,12 @@ class DataProviderID:
             'G3A': 3, 'G3B': 3,
             # ... Ajoutez les autres sous-groupes ici ...
         }
-        return {
+        donnees = {
             "jours": jours, "creneaux_par_jour": creneaux_par_jour, "slots": slots, "nb_slots": len(slots),
             "fenetre_midi": fenetre_midi,
             "cours": cours, "duree_cours": duree_cours, "taille_groupes": taille_groupes,
             "map_groupe_cours": map_groupe_cours,
+            "hierarchie_groupes": hierarchie_groupes,
             "salles": salles, "capacites": list(salles.values()), "profs": profs,
             "profs_par_slot": profs_par_slot,
             "all_groups": list(map_groupe_cours.keys()),
@@ -206,13 +228,110 @@ class DataProviderID:
             "obligations_slots": disponibilites_slots,
             "prof_to_teacher_id": prof_to_teacher_id,
             "liste_amphi_c": list_amphi_c,
-            "group_to_dispo_key": group_to_dispo_key  # 🚨 Utilisation du mapping complet        }
+            "group_to_dispo_key": group_to_dispo_key,  # 🚨 Utilisation du mapping complet        }
+            "noms_salles": self.get_list_room(),  # pour les graphiques, y compris relus hors ligne
         }
+        # Même contenu indexé par entiers (objets typés, adjacences CSR, disponibilités en bitmaps)
+        donnees["probleme"] = ProblemBundle(donnees)
+        if hachage is not None:
+            ecrire_snapshot(self.dossier_cache, week_id, donnees, hachage)
+            print(f"   -> Snapshot de la semaine {week_id} écrit dans {self.dossier_cache}")
+        return donnees
+
+    def empreinte_sources(self, week_id: int) -> str:
+        """
+        Empreinte des tables sources de la semaine, en une seule requête : elle change dès qu'une ligne
+        est ajoutée, supprimée ou modifiée (updated_at, ou contenu pour les tables de contraintes).
+        """
+        requetes = ["SELECT 'slots' AS source, COUNT(*) AS nb, MAX(updated_at) AS marque FROM slots "
+                    "WHERE week_id = %(week_id)s"]
+        requetes += [f"SELECT '{table}', COUNT(*), MAX(updated_at) FROM {table}" for table in TABLES_HORODATEES]
+        requetes += [f"SELECT '{table}', COUNT(*), BIT_XOR(CRC32(CONCAT_WS('|', id, {entite}, day_of_week, "
+                     f"start_time, end_time, priority, week_id, active))) FROM {table}"
+                     for table, entite in TABLES_CONTRAINTES.items()]
+        df_empreinte = self.source.lire(" UNION ALL ".join(requetes), params={"week_id": week_id})
+        return empreinte(week_id, df_empreinte.itertuples(index=False, name=None))
+
+    def load_group_hierarchy(self, week_id: int) -> Dict[str, Dict[str, list]]:
+        """
+        Arbre promotion → groupe → sous-groupe de l'année de la semaine week_id, au format
+        {promotion: {groupe: [sous-groupes]}}. Les noms (BUT1, G1...) se répètent d'une année à l'autre :
+        seules les promotions de cette année et les slots de ses semaines sont lus.
+        Les sous-groupes n'ont pas de groupe parent en base : le lien vient des couples
+        (group_id, subgroup_id) utilisés par les slots, et le sous-groupe est nommé groupe + sous-groupe (G1A).
+        """
+        df_annee = self.source.lire("SELECT year_id FROM weeks WHERE id = %s", params=(week_id,))
+        if df_annee.empty:
+            raise ValueError(f"Semaine {week_id} introuvable dans la table weeks")
+        year_id = int(df_annee['year_id'].iloc[0])
+        if year_id in self._hierarchies:
+            return self._hierarchies[year_id]
+        df_groupes = self.source.lire(
+            """SELECT p.name AS promotion_name, g.name AS group_name
+               FROM `groups` g
+                        JOIN promotions p ON g.promotion_id = p.id
+               WHERE p.year_id = %s""", params=(year_id,))
+        df_sous_groupes = self.source.lire(
+            """SELECT DISTINCT g.name AS group_name, sg.name AS subgroup_name
+               FROM slots s
+                        JOIN weeks w ON s.week_id = w.id
+                        JOIN `groups` g ON s.group_id = g.id
+                        JOIN subgroups sg ON s.subgroup_id = sg.id
+               WHERE w.year_id = %s""", params=(year_id,))
+        sous_groupes = df_sous_groupes.groupby('group_name')['subgroup_name'].apply(sorted).to_dict()
+        hierarchie = {}
+        for row in df_groupes.itertuples(index=False):
+            hierarchie.setdefault(row.promotion_name, {})[row.group_name] = [
+                f"{row.group_name}{sg}" for sg in sous_groupes.get(row.group_name, [])]
+        print(f"   -> Hiérarchie des groupes (année {year_id}) : {len(hierarchie)} promotions, "
+              f"{sum(len(g) for g in hierarchie.values())} groupes")
+        self._hierarchies[year_id] = hierarchie
+        return hierarchie
+
+    def load_previous_assignment(self, week_id: int) -> pd.DataFrame:
+        """
+        Dernier emploi du temps enregistré dans edt_slot pour les slots de la semaine week_id :
+        une ligne par slot (slot_id, room_id, jour, offset, signature) ; si plusieurs exécutions
+        ont été enregistrées, la plus récente l'emporte.
+        """
+        # Les brouillons publiés pendant une résolution (is_draft = 1) ne servent pas de point de départ
+        query = f"""
+                SELECT es.id         AS edt_id, \
+                       es.slot_id, \
+                       es.day_of_week, \
+                       es.start_hour, \
+                       es.room_id, \
+                       TYPES.acronym AS type_acronym, \
+                       t.title       AS teaching_title, \
+                       p.name        AS promotion_name, \
+                       g.name        AS group_name, \
+                       sg.name       AS subgroup_name
+                FROM edt_slot es
+                         JOIN slots s ON es.slot_id = s.id
+                         LEFT JOIN teachings t ON s.teaching_id = t.id
+                         LEFT JOIN promotions p ON s.promotion_id = p.id
+                         LEFT JOIN `groups` g ON s.group_id = g.id
+                         LEFT JOIN subgroups sg ON s.subgroup_id = sg.id
+                         LEFT JOIN slot_types TYPES ON s.type_id = TYPES.id
+                WHERE s.week_id = %s
+                  AND es.is_draft = 0
+                ORDER BY es.id \
+                """
+        df = self.source.lire(query, params=(week_id,))
+        df = df.drop_duplicates('slot_id', keep='last')
+        df['jour'] = [self.convert_daystring_to_int(j) for j in df['day_of_week']]
+        df['offset'] = [heure_vers_offset(h) for h in df['start_hour']]
+        df['signature'] = [signature_slot(r.type_acronym, r.teaching_title, r.promotion_name,
+                                          r.group_name, r.subgroup_name) for r in df.itertuples(index=False)]
+        print(f"   -> {len(df)} cours déjà placés trouvés dans edt_slot pour la semaine {week_id}")
+        return df[['slot_id', 'room_id', 'jour', 'offset', 'signature']]
 
     def get_list_room(self):
+        if self.engine is None:
+            return list(self._noms_salles)
         list_room=[]
         query_dispos = """SELECT name FROM rooms """
-        df_salles = pd.read_sql(query_dispos, self.engine)
+        df_salles = self.source.lire(query_dispos)
         for i in df_salles['name']:
             list_room.append(i)
         return list_room
@@ -252,12 +371,14 @@ class DataProviderID:
         h, m, _ = map(int, str(time_str).split(':'))
         return (h - 8) * 2 + (m // 30)
 
-    def _build_course_structures(self, df: pd.DataFrame,profs_par_slot: dict, profs: list) -> Tuple:
+    def _build_course_structures(self, df: pd.DataFrame,profs_par_slot: dict, profs: list,
+                                 salles_par_enseignement: dict = None, salle_ids: list = None,
+                                 hierarchie_groupes: dict = None) -> Tuple:
 
         cours, duree_cours, taille_groupes, map_groupe_cours = [], {}, {}, {}
-        group_map = {"BUT1": ["G1", "G2", "G3", "G1A", "G2A", "G3A", "G1B", "G2B", "G3B"],
-                     "BUT2": ["G4", "G5", "G4A", "G5A", "G4B", "G5B"],
-                     "BUT3": ["G7", "G8", "G7A", "G7B", "G8A"]}  # à adapter si plus de groupes
+        # Promotion → tous ses groupes et sous-groupes, tirés de la hiérarchie chargée en base
+        group_map = {promotion: [g for groupe, sous_groupes in groupes.items() for g in [groupe] + sous_groupes]
+                     for promotion, groupes in (hierarchie_groupes or HIERARCHIE_PAR_DEFAUT).items()}
         cpt_no_profs = 0
         for idx, row in df.iterrows():
             duration_slots = int(row['duration'] * 2)
@@ -269,7 +390,6 @@ class DataProviderID:
 
                 # Le CM concerne TOUS les sous-groupes de cette promotion
                 affected_groups = [group_name]  # BUT1 lui-même
-                group_map = {"BUT1": ["G1", "G2", "G3","G1A", "G2A", "G3A","G1B", "G2B", "G3B"],"BUT2": ["G4", "G5","G4A", "G5A","G4B", "G5B"],"BUT3": ["G7", "G8","G7A", "G7B", "G8A"]}  # à adapter si plus de groupes
                 if group_name in group_map:
                     affected_groups.extend(group_map[group_name])
 
@@ -288,9 +408,6 @@ class DataProviderID:
                 group_name = row['group_name']
                 if group_name== None:
                     group_name = row['promotion_name']
-                    group_map = {"BUT1": ["G1", "G2", "G3", "G1A", "G2A", "G3A", "G1B", "G2B", "G3B"],
-                                 "BUT2": ["G4", "G5", "G4A", "G5A", "G4B", "G5B"],
-                                 "BUT3": ["G7", "G8", "G7A", "G7B", "G8A"]}  # à adapter si plus de groupes
                 affected_groups = [group_name]  # BUT1 lui-même
                 group_size = row['group_size']
                 if group_name in group_map:
@@ -313,11 +430,20 @@ class DataProviderID:
                 indices_profs = [index]#list(range(len(profs)))
                 print("indices profs",indices_profs)
                 cpt_no_profs+=1
-            cours.append({
+            nouveau_cours = {
                 "id": cid,
                 "groups": affected_groups,
                 "allowed_prof_indices": indices_profs
-            })
+            }
+            # Salles autorisées par teachings_rooms (aucune ligne → toutes les salles restent candidates)
+            salles_autorisees = (salles_par_enseignement or {}).get((row['teaching_id'], row['type_id']), [])
+            if salles_autorisees and salle_ids:
+                indices_salles = [i for i, room_id in enumerate(salle_ids) if room_id in salles_autorisees]
+                if indices_salles:
+                    nouveau_cours["allowed_room_indices"] = indices_salles
+                else:
+                    print(f"Warning: Aucune salle de teachings_rooms disponible pour {cid}")
+            cours.append(nouveau_cours)
             duree_cours[cid] = duration_slots
             taille_groupes[group_name] = int(group_size) if pd.notna(group_size) else 0
             # On l'ajoute dans TOUS les groupes qu'il concerne
@@ -327,24 +453,54 @@ class DataProviderID:
                 map_groupe_cours[g].append(cid)
         return cours, duree_cours, taille_groupes, map_groupe_cours
 
-    def convert_courses_dict_to_list_insert(self,courses_dict_list):
-        cours_input = []
-
-        for c in courses_dict_list:
-            name = c['name']
-            day_name = convert_days_int_to_string(c['day'])
-            tuple_cours = (
-                c['start_hour'],
-                name.split('_')[-1][1:],  # type
-                c['room'],
-                day_name,
-            )
-            cours_input.append(tuple_cours)
-        df_insert = pd.DataFrame(cours_input, columns=['start_hour', 'slot_id', 'room_id','day_of_week'])
+    def _lignes_edt_slot(self, affectations) -> pd.DataFrame:
+        # Table d'affectations de SolutionVisualizer : une ligne par cours placé
+        return pd.DataFrame({
+            'start_hour': affectations['heure_debut'],
+            'slot_id': [cid.split('_')[-1][1:] for cid in affectations['cours']],
+            'room_id': affectations['salle'],
+            'day_of_week': [convert_days_int_to_string(j) for j in affectations['jour']],
+        })
+
+    def convert_affectations_to_insert(self, affectations):
+        df_insert = self._lignes_edt_slot(affectations)
+        cours_input = list(df_insert.itertuples(index=False, name=None))
+        if self.engine is None:
+            print(f"   -> Source {self.source.nom} en lecture seule : {len(df_insert)} cours non enregistrés dans edt_slot")
+            return cours_input
         table="edt_slot"
+        # La version définitive remplace les brouillons publiés pendant la résolution
+        with self.engine.begin() as conn:
+            self._supprimer_brouillons(conn, df_insert['slot_id'])
         self.insert_data_with_pandas(df_insert, table)
         return cours_input
 
+    def upsert_draft_affectations(self, affectations) -> int:
+        """
+        Remplace le brouillon (is_draft = 1) des slots de la table d'affectations par la solution
+        courante, en une transaction ; les lignes définitives (is_draft = 0) ne sont pas touchées.
+        """
+        if affectations.empty or self.engine is None:
+            return 0
+        df_insert = self._lignes_edt_slot(affectations).assign(is_draft=1)
+        try:
+            with self.engine.begin() as conn:
+                self._supprimer_brouillons(conn, df_insert['slot_id'])
+                df_insert.to_sql(name="edt_slot", con=conn, if_exists='append', index=False)
+            print(f"   -> Brouillon enregistré : {len(df_insert)} cours dans edt_slot")
+            return len(df_insert)
+        except Exception as e:
+            print(f"❌ Erreur lors de l'enregistrement du brouillon : {e}")
+            return 0
+
+    def _supprimer_brouillons(self, conn, slot_ids):
+        ids = sorted({int(i) for i in slot_ids})
+        if not ids:
+            return
+        parametres = {f"s{i}": slot_id for i, slot_id in enumerate(ids)}
+        conn.execute(text(f"DELETE FROM edt_slot WHERE is_draft = 1 AND slot_id IN ({', '.join(':' + k for k in parametres)})"),
+                     parametres)
+
     def insert_data_with_pandas(self, df_to_insert, table_name):
         try:
             # Insertion dans la base de données
@@ -0,0 +1,209 @@
+# ==============================================================================
+# SOURCES DE DONNÉES : d'où DataProviderID lit une semaine (MySQL, snapshot, SQLite)
+# ==============================================================================
+import os
+import re
+import sqlite3
+import zlib
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Optional
+
+import pandas as pd
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+
+from connect_database import get_engine
+from migrations import appliquer_migrations
+from week_snapshot import lire_snapshot, lire_npz
+
+DOSSIER_SQL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Database")
+SCRIPTS_SQL = ("Creation_tables.sql", "Creation_donnees.sql")
+
+# Tables de contraintes absentes de Creation_tables.sql (créées par ConstraintManager côté MySQL)
+ENTITES_CONTRAINTES = {"teacher_constraints": "teacher_id", "room_constraints": "room_id",
+                       "group_constraints": "group_id", "slot_constraints": "slot_id"}
+
+
+class SourceDonnees(ABC):
+    """
+    Ce que DataProviderID attend d'une source :
+    - lire(requete, params) : exécute une requête SELECT (syntaxe MySQL, paramètres %s / %(nom)s) ;
+    - semaine_preparee(week_id) : les données déjà préparées d'une semaine, ou None pour les calculer
+      à partir des requêtes ;
+    - engine : moteur SQLAlchemy pour les écritures (edt_slot), None pour une source en lecture seule.
+    """
+    nom = "?"
+    engine = None
+
+    @abstractmethod
+    def lire(self, requete: str, params=None, **options) -> pd.DataFrame:
+        ...
+
+    def semaine_preparee(self, week_id: int) -> Optional[Dict[str, Any]]:
+        return None
+
+
+class SourceMySQL(SourceDonnees):
+    nom = "mysql"
+
+    def __init__(self, db_config: Dict[str, Any]):
+        self.db_config = db_config
+        # Moteur partagé par configuration (connect_database.py) : QueuePool, plus de connexion par instance
+        self.engine = get_engine(db_config)
+
+    def lire(self, requete, params=None, **options):
+        return pd.read_sql(requete, self.engine, params=params, **options)
+
+
+class SourceSQLite(SourceMySQL):
+    """
+    Base SQLite en mémoire créée à partir de Database/Creation_tables.sql et Creation_donnees.sql
+    (DDL MySQL adapté à la volée), avec les quelques fonctions MySQL utilisées par les requêtes
+    (CONCAT, CONCAT_WS, CRC32, BIT_XOR). Les requêtes de DataProviderID s'exécutent telles quelles.
+    """
+    nom = "sqlite"
+
+    def __init__(self, dossier_sql: str = DOSSIER_SQL, scripts=SCRIPTS_SQL):
+        self.db_config = None
+        # Une seule connexion partagée : la base en mémoire vit aussi longtemps que le moteur
+        self.engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+        event.listen(self.engine, "connect", _fonctions_mysql)
+        connexion = self.engine.raw_connection()
+        try:
+            ignorees = 0
+            for script in scripts:
+                with open(os.path.join(dossier_sql, script), encoding="utf-8") as f:
+                    ignorees += _executer_script(connexion.driver_connection, f.read())
+            for table, entite in ENTITES_CONTRAINTES.items():
+                connexion.driver_connection.execute(_ddl_contraintes(table, entite))
+            connexion.driver_connection.commit()
+        finally:
+            connexion.close()
+        # Même schéma qu'une base MySQL déployée (index des contraintes, colonnes ajoutées depuis)
+        appliquer_migrations(self.engine, silencieux=True)
+        print(f"   -> Base SQLite en mémoire créée depuis {', '.join(scripts)}"
+              + (f" ({ignorees} instruction(s) ignorée(s))" if ignorees else ""))
+
+    def lire(self, requete, params=None, **options):
+        # Paramètres au format du pilote sqlite3 : %(nom)s → :nom, %s → ?
+        requete = re.sub(r"%\((\w+)\)s", r":\1", requete).replace("%s", "?")
+        return pd.read_sql(requete, self.engine, params=params, **options)
+
+
+class SourceSnapshot(SourceDonnees):
+    """
+    Semaine déjà préparée, lue sans base de données : un fichier .npz (week_snapshot.exporter_npz)
+    ou un dossier de cache de snapshots (DataProviderID(dossier_cache=...)).
+    """
+    nom = "snapshot"
+
+    def __init__(self, chemin: str):
+        if not os.path.exists(chemin):
+            raise FileNotFoundError(f"Snapshot introuvable : {chemin}")
+        self.chemin = chemin
+
+    def lire(self, requete, params=None, **options):
+        raise RuntimeError(f"La source snapshot ({self.chemin}) n'a pas de base de données à interroger")
+
+    def semaine_preparee(self, week_id):
+        if os.path.isdir(self.chemin):
+            donnees = lire_snapshot(self.chemin, week_id)
+            if donnees is None:
+                raise ValueError(f"Aucun snapshot de la semaine {week_id} dans {self.chemin}")
+            return donnees
+        donnees, manifeste = lire_npz(self.chemin)
+        if manifeste["week_id"] != week_id:
+            raise ValueError(f"{self.chemin} contient la semaine {manifeste['week_id']}, pas la semaine {week_id}")
+        return donnees
+
+
+def source_depuis_argument(valeur: str, db_config: Optional[Dict[str, Any]] = None) -> SourceDonnees:
+    """--source : 'mysql' (défaut), 'sqlite' (base en mémoire), ou le chemin d'un .npz / dossier de snapshots."""
+    if valeur == "mysql":
+        return SourceMySQL(db_config)
+    if valeur == "sqlite":
+        return SourceSQLite()
+    return SourceSnapshot(valeur)
+
+
+# ------------------------------------------------------------------
+# Adaptation SQLite
+# ------------------------------------------------------------------
+class _BitXor:
+    def __init__(self):
+        self.valeur = 0
+
+    def step(self, v):
+        if v is not None:
+            self.valeur ^= int(v)
+
+    def finalize(self):
+        return self.valeur
+
+
+def _fonctions_mysql(connexion: sqlite3.Connection, _):
+    connexion.create_function("CONCAT", -1, lambda *v: None if None in v else "".join(map(str, v)))
+    connexion.create_function("CONCAT_WS", -1,
+                              lambda sep, *v: sep.join(str(x) for x in v if x is not None))
+    connexion.create_function("CRC32", 1, lambda v: None if v is None else zlib.crc32(str(v).encode("utf-8")))
+    connexion.create_aggregate("BIT_XOR", 1, _BitXor)
+
+
+def _creation_table_sqlite(instruction: str) -> str:
+    """CREATE TABLE MySQL → SQLite : types, AUTO_INCREMENT, ON UPDATE, et contraintes de table placées en fin."""
+    instruction = re.sub(r"\bINT\s+PRIMARY\s+KEY\s+AUTO_INCREMENT\b", "INTEGER PRIMARY KEY AUTOINCREMENT",
+                         instruction, flags=re.I)
+    instruction = re.sub(r"\s+ON\s+UPDATE\s+CURRENT_TIMESTAMP", "", instruction, flags=re.I)
+    instruction = re.sub(r"\bENUM\s*\([^)]*\)", "TEXT", instruction, flags=re.I)
+    entete, corps = instruction.split("(", 1)
+    corps = corps[:corps.rindex(")")]
+    elements, profondeur, courant = [], 0, ""
+    for caractere in corps:
+        profondeur += {"(": 1, ")": -1}.get(caractere, 0)
+        if caractere == "," and profondeur == 0:
+            elements.append(courant.strip())
+            courant = ""
+        else:
+            courant += caractere
+    elements.append(courant.strip())
+    contrainte = re.compile(r"^(FOREIGN\s+KEY|PRIMARY\s+KEY\s*\(|UNIQUE\s*\(|CONSTRAINT)\b", re.I)
+    colonnes = [e for e in elements if e and not contrainte.match(e)]
+    contraintes = [e for e in elements if e and contrainte.match(e)]
+    return f"{entete}({', '.join(colonnes + contraintes)})"
+
+
+def _executer_script(connexion: sqlite3.Connection, script: str) -> int:
+    """Exécute un script MySQL instruction par instruction ; renvoie le nombre d'instructions refusées."""
+    script = "\n".join(l for l in script.splitlines() if not l.strip().startswith("--"))
+    # Coupure sur les ';' mais aussi avant chaque INSERT/CREATE (un ';' manque dans Creation_donnees.sql)
+    instructions = re.split(r";\s*(?:\n|$)|\n(?=\s*(?:INSERT\s+INTO|CREATE\s+TABLE)\b)", script, flags=re.I)
+    ignorees = 0
+    for instruction in (i.strip().rstrip(";") for i in instructions):
+        if not instruction:
+            continue
+        if re.match(r"CREATE\s+TABLE", instruction, flags=re.I):
+            instruction = _creation_table_sqlite(instruction)
+        try:
+            connexion.execute(instruction)
+        except sqlite3.Error as e:
+            ignorees += 1
+            print(f"      → Instruction ignorée ({e}) : {instruction[:60]}...")
+    return ignorees
+
+
+def _ddl_contraintes(table: str, entite: str) -> str:
+    # Mêmes colonnes que create_constraint_tables (bouton/constraint_manager.py)
+    return f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            {entite} INT NOT NULL,
+            constraint_type VARCHAR(50) NOT NULL DEFAULT 'unavailable',
+            day_of_week VARCHAR(20),
+            start_time TIME,
+            end_time TIME,
+            reason TEXT,
+            priority VARCHAR(20) DEFAULT 'hard',
+            week_id INT NULL,
+            active BOOLEAN DEFAULT 1,
+            created_at DATETIME
+        )"""
@@ -0,0 +1,197 @@
+# ==============================================================================
+# DÉCOMPOSITION PAR PROMOTION : sous-problèmes résolus en parallèle puis réparés
+# ==============================================================================
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional
+
+import pandas as pd
+
+from group_hierarchy import GroupHierarchy
+from solution_visualizer import extraire_affectations, COLONNES_AFFECTATIONS
+from time_table_model import TimetableModel, ENCODAGE_BOOLEEN
+
+# Statuts du plus mauvais au meilleur : le statut global est le plus mauvais des sous-problèmes
+ORDRE_STATUTS = ["MODEL_INVALID", "INFEASIBLE", "UNKNOWN", "FEASIBLE", "OPTIMAL"]
+
+
+class PartitionTimetableModel(TimetableModel):
+    """
+    TimetableModel sur une partie des cours, dont les profs et salles sont déjà occupés par
+    les autres parties : reservations = {'prof': {p_idx: [(slot, duree)]}, 'salle': {r_idx: [...]}}.
+    Les créneaux réservés entrent comme intervalles fixes dans les NoOverlap de chaque ressource.
+    """
+
+    def __init__(self, data: Dict[str, Any], encodage: str = ENCODAGE_BOOLEEN, reservations: Optional[dict] = None):
+        super().__init__(data, encodage)
+        self.reservations = reservations or {}
+
+    def _intervalles_reserves(self, famille: str) -> dict:
+        return {idx: [self.model.NewFixedSizeIntervalVar(slot, duree, f"reserve_{famille}_{idx}_{slot}")
+                      for slot, duree in occupations]
+                for idx, occupations in self.reservations.get(famille, {}).items()}
+
+
+def partitionner_par_promotion(data: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    Cours de chaque promotion ({promotion: [cid]}), d'après la racine de la hiérarchie de leurs groupes
+    (map_groupe_cours). Un cours partagé entre plusieurs promotions fusionne leurs parties.
+    """
+    hierarchie = GroupHierarchy.depuis_donnees(data)
+    racine = {}  # union-find sur les promotions
+
+    def trouver(p):
+        while racine.setdefault(p, p) != p:
+            p = racine[p]
+        return p
+
+    promotions_du_cours = {}
+    for groupe, cours_ids in data['map_groupe_cours'].items():
+        promotion = hierarchie.ancetres(groupe)[-1]
+        for cid in cours_ids:
+            promotions_du_cours.setdefault(cid, set()).add(promotion)
+    for promotions in promotions_du_cours.values():
+        premiere, *autres = sorted(promotions)
+        for p in autres:
+            racine[trouver(p)] = trouver(premiere)
+
+    parties = {}
+    for c in data['cours']:
+        promotions = promotions_du_cours.get(c['id']) or {"_sans_groupe"}
+        parties.setdefault(trouver(min(promotions)), []).append(c['id'])
+    return parties
+
+
+def sous_donnees(data: Dict[str, Any], cours_ids: List[str]) -> Dict[str, Any]:
+    """Copie superficielle des données restreinte à une partie des cours (profs et salles gardent leurs indices)."""
+    garder = set(cours_ids)
+    map_groupe_cours = {g: [cid for cid in ids if cid in garder] for g, ids in data['map_groupe_cours'].items()}
+    map_groupe_cours = {g: ids for g, ids in map_groupe_cours.items() if ids}
+    return {**data,
+            "cours": [c for c in data['cours'] if c['id'] in garder],
+            "duree_cours": {cid: data['duree_cours'][cid] for cid in cours_ids},
+            "map_groupe_cours": map_groupe_cours,
+            "all_groups": list(map_groupe_cours.keys()),
+            "probleme": None}  # reconstruit par le modèle sur les seuls cours de la partie
+
+
+def reservations_depuis(affectations: pd.DataFrame) -> dict:
+    """Occupations (slot, duree) de chaque prof et salle d'une table d'affectations."""
+    reservations = {'prof': {}, 'salle': {}}
+    for a in affectations.itertuples(index=False):
+        if a.prof_idx >= 0:
+            reservations['prof'].setdefault(int(a.prof_idx), []).append((int(a.slot), int(a.duree)))
+        reservations['salle'].setdefault(int(a.salle_idx), []).append((int(a.slot), int(a.duree)))
+    return reservations
+
+
+def _resoudre_partition(nom: str, data: Dict[str, Any], encodage: str, profil: str, surcharges: dict,
+                        reservations: Optional[dict] = None, indices: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
+    """Construit et résout un sous-problème (exécuté dans un processus du pool ou dans le processus principal)."""
+    debut = time.perf_counter()
+    scheduler = PartitionTimetableModel(data, encodage=encodage, reservations=reservations)
+    scheduler.build_model()
+    if indices is not None and not indices.empty:
+        scheduler.ajouter_indices(indices)
+    solution = scheduler.solve(profil=profil, **surcharges)
+    affectations = (extraire_affectations(solution['solver'], solution['vars'], data) if solution['vars']
+                    else pd.DataFrame(columns=COLONNES_AFFECTATIONS))
+    return {"nom": nom, "statut": solution['solver'].StatusName(solution['status']),
+            "affectations": affectations, "secondes": time.perf_counter() - debut,
+            "nb_cours": len(data['cours'])}
+
+
+def verifier_fusion(affectations: pd.DataFrame, data: Dict[str, Any]) -> List[tuple]:
+    """
+    Vérifie la solution fusionnée : cours non placés et chevauchements de profs, de salles et
+    d'étudiants (feuilles de la hiérarchie). Renvoie une liste de (nature, ressource, cours_a, cours_b).
+    """
+    conflits = [("non_place", None, c['id'], None) for c in data['cours']
+                if c['id'] not in set(affectations["cours"])]
+    fin = affectations["slot"] + affectations["duree"]
+    table = affectations.assign(fin=fin).sort_values("slot")
+
+    def chevauchements(nature, ressource, lignes):
+        cours_en_cours, fin_max = None, -1
+        for a in lignes.itertuples(index=False):
+            if a.slot < fin_max:
+                conflits.append((nature, ressource, cours_en_cours, a.cours))
+            if a.fin > fin_max:
+                cours_en_cours, fin_max = a.cours, a.fin
+
+    for nature, colonne in (("prof", "prof_idx"), ("salle", "salle_idx")):
+        for idx, lignes in table[table[colonne] >= 0].groupby(colonne):
+            chevauchements(nature, idx, lignes)
+    hierarchie = GroupHierarchy.depuis_donnees(data)
+    for feuille, cours_ids in hierarchie.cours_par_feuille(data['map_groupe_cours']).items():
+        chevauchements("etudiant", feuille, table[table["cours"].isin(cours_ids)])
+    return conflits
+
+
+def resoudre_par_promotion(data: Dict[str, Any], encodage: str = ENCODAGE_BOOLEEN, profil: str = "defaut",
+                           max_processus: Optional[int] = None, max_reparations: int = 3,
+                           **surcharges) -> Dict[str, Any]:
+    """
+    Résout la semaine promotion par promotion :
+    1. une partie par promotion (partitionner_par_promotion), résolues en parallèle dans un
+       ProcessPoolExecutor, les cœurs étant répartis entre les processus ;
+    2. réparation itérative : tant que des parties se disputent un prof ou une salle, la plus grosse
+       est gardée et les autres sont re-résolues une à une, les créneaux des parties déjà validées
+       étant réservés et leur solution précédente servant d'indice (AddHint) ;
+    3. vérification de la solution fusionnée (verifier_fusion).
+    Les surcharges sont celles de solve() (num_workers, max_time_in_seconds, ...).
+    """
+    debut = time.perf_counter()
+    parties = partitionner_par_promotion(data)
+    donnees = {nom: sous_donnees(data, cours_ids) for nom, cours_ids in parties.items()}
+    nb_coeurs = surcharges.pop("num_workers", None) or os.cpu_count() or 1
+    max_processus = max(1, min(max_processus or len(parties), len(parties), nb_coeurs))
+    par_processus = {**surcharges, "num_workers": max(1, nb_coeurs // max_processus)}
+    print(f"Décomposition : {len(parties)} partie(s) "
+          f"({', '.join(f'{nom}={len(ids)}' for nom, ids in parties.items())}), {max_processus} processus")
+
+    with ProcessPoolExecutor(max_workers=max_processus) as pool:
+        futurs = [pool.submit(_resoudre_partition, nom, donnees[nom], encodage, profil, par_processus)
+                  for nom in parties]
+        resultats = {r["nom"]: r for r in (f.result() for f in futurs)}
+    for r in resultats.values():
+        print(f"   -> {r['nom']} : {r['statut']} ({r['nb_cours']} cours, {r['secondes']:.1f} s)")
+
+    def fusion():
+        tables = [r["affectations"] for r in resultats.values() if not r["affectations"].empty]
+        return pd.concat(tables, ignore_index=True) if tables else pd.DataFrame(columns=COLONNES_AFFECTATIONS)
+
+    partie_du_cours = {cid: nom for nom, ids in parties.items() for cid in ids}
+    affectations = fusion()
+    conflits = verifier_fusion(affectations, data)
+    reparations = 0
+    while reparations < max_reparations:
+        en_conflit = {partie_du_cours[x] for nature, _, a, b in conflits
+                      if nature in ("prof", "salle") and partie_du_cours[a] != partie_du_cours[b] for x in (a, b)}
+        if not en_conflit:
+            break
+        reparations += 1
+        # Fixation séquentielle : la plus grosse partie en conflit est gardée, les autres sont re-résolues
+        # une à une en réservant les créneaux des parties déjà validées
+        a_reparer = sorted(en_conflit, key=lambda nom: -len(parties[nom]))[1:]
+        print(f"   -> Réparation {reparations} : {len(conflits)} conflit(s), re-résolution de {', '.join(a_reparer)}")
+        for i, nom in enumerate(a_reparer):
+            validees = fusion()
+            validees = validees[~validees["cours"].map(partie_du_cours).isin(a_reparer[i:])]
+            resultats[nom] = _resoudre_partition(nom, donnees[nom], encodage, profil, {**surcharges, "num_workers": nb_coeurs},
+                                                 reservations_depuis(validees), resultats[nom]["affectations"])
+            print(f"      → {nom} : {resultats[nom]['statut']} ({resultats[nom]['secondes']:.1f} s)")
+        affectations = fusion()
+        conflits = verifier_fusion(affectations, data)
+
+    statut = min((r["statut"] for r in resultats.values()), key=ORDRE_STATUTS.index)
+    if conflits:
+        statut = "INFEASIBLE"
+    elif reparations and statut == "OPTIMAL":
+        statut = "FEASIBLE"  # optimum de chaque partie, pas forcément de la semaine entière
+    print(f"   -> Solution fusionnée : {statut}, {len(affectations)}/{len(data['cours'])} cours placés, "
+          f"{len(conflits)} conflit(s), {time.perf_counter() - debut:.1f} s")
+    return {"statut": statut, "affectations": affectations, "conflits": conflits,
+            "parties": {nom: {k: v for k, v in r.items() if k != "affectations"} for nom, r in resultats.items()},
+            "reparations": reparations}
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def diagnose_feasibility(d):
     jours = d['jours']
     cpd = d['creneaux_par_jour']
@@ -85,4 +88,94 @@ def diagnose_feasibility(d):
     print("- contrainte de salles disponibles simultanément (nombre de grandes salles pour BUT3)")
     print("- contraintes de profs (s'il y a des restrictions implicites)")
     print("- intégrité des linking constraints (start -> occupe) : assure-toi qu'elles correspondent exactement aux indices de slots")
-    return problems
\ No newline at end of file
+    return problems
+
+
+# ==============================================================================
+# PRÉRÉSOLUTION STATIQUE : réduction des domaines avant la construction du modèle
+# ==============================================================================
+def presolve(d, index_departs, salles_candidates, profs_autorises):
+    """
+    Réduit les domaines du modèle à partir des données seules, jusqu'à point fixe :
+    - départs : ceux de LegalStartIndex (journée, midi, groupes, horaires obligatoires), moins ceux
+      où aucun prof candidat ou aucune salle candidate n'est disponible pendant tout le cours ;
+    - salles : candidates de capacité suffisante (salles_candidates), moins celles jamais disponibles
+      sur les départs restants ;
+    - profs : allowed_prof_indices (profs_autorises), moins ceux jamais disponibles sur les départs restants.
+    Les masques de départs de index_departs sont mis à jour sur place.
+
+    salles_candidates / profs_autorises : {cid: [indices]} avant réduction.
+    Renvoie {'salles': {cid: [r]}, 'profs': {cid: [p]}, 'forces': {...}, 'sans_domaine': [...], 'familles': {...}}.
+    """
+    salle_ids = list(d['salles'].keys())
+    nb_slots = d['nb_slots']
+
+    familles = {famille: {'initial': 0, 'avant': 0, 'apres': 0} for famille in ('departs', 'salles', 'profs')}
+    resultat = {'salles': {}, 'profs': {}, 'sans_domaine': [],
+                'forces': {'departs': [], 'salles': [], 'profs': []}, 'familles': familles}
+
+    for c in d['cours']:
+        cid = c['id']
+        duree = d['duree_cours'][cid]
+        departs = index_departs.departs_legaux[cid]
+        salles = list(salles_candidates[cid])
+        profs = list(profs_autorises[cid])
+        familles['departs']['initial'] += nb_slots
+        familles['salles']['initial'] += len(salle_ids)
+        familles['profs']['initial'] += len(d['profs'])
+        familles['departs']['avant'] += int(departs.sum())
+        familles['salles']['avant'] += len(salles)
+        familles['profs']['avant'] += len(profs)
+
+        # Ressource sans plage déclarée : disponible partout (masque None)
+        masques_salles = {r: index_departs.masque_ressource('salle', r, duree) for r in salles}
+        masques_profs = {p: index_departs.masque_ressource('prof', p, duree) for p in profs}
+        while True:
+            # Un départ reste légal s'il existe au moins un prof et une salle disponibles pour tout le cours
+            reduit = departs.copy()
+            for masques in (masques_salles, masques_profs):
+                if masques and all(m is not None for m in masques.values()):
+                    reduit &= np.logical_or.reduce([masques[i] for i in masques])
+            salles_restantes = [r for r in masques_salles if masques_salles[r] is None or (masques_salles[r] & reduit).any()]
+            profs_restants = [p for p in masques_profs if masques_profs[p] is None or (masques_profs[p] & reduit).any()]
+            # Un cours sans prof autorisé n'en reçoit aucun : pas de domaine de profs à vider
+            if not reduit.any() or not salles_restantes or (masques_profs and not profs_restants):
+                # Domaine vide : le cours est infaisable, on garde les domaines précédents pour le diagnostic
+                resultat['sans_domaine'].append(cid)
+                break
+            stable = (reduit == departs).all() and len(salles_restantes) == len(masques_salles) \
+                and len(profs_restants) == len(masques_profs)
+            departs = reduit
+            masques_salles = {r: masques_salles[r] for r in salles_restantes}
+            masques_profs = {p: masques_profs[p] for p in profs_restants}
+            if stable:
+                break
+
+        index_departs.departs_legaux[cid] = departs
+        resultat['salles'][cid] = list(masques_salles)
+        resultat['profs'][cid] = list(masques_profs)
+        familles['departs']['apres'] += int(departs.sum())
+        familles['salles']['apres'] += len(masques_salles)
+        familles['profs']['apres'] += len(masques_profs)
+        if departs.sum() == 1:
+            resultat['forces']['departs'].append(cid)
+        if len(masques_salles) == 1:
+            resultat['forces']['salles'].append(cid)
+        if len(masques_profs) == 1:
+            resultat['forces']['profs'].append(cid)
+
+    afficher_presolve(resultat)
+    return resultat
+
+
+def afficher_presolve(resultat):
+    print("   -> Prérésolution statique (valeurs de domaine : sans filtre → avant → après disponibilités) :")
+    for famille, n in resultat['familles'].items():
+        ratio = 1 - n['apres'] / n['initial'] if n['initial'] else 0
+        print(f"      → {famille:<8} {n['initial']:>8} → {n['avant']:>8} → {n['apres']:>8}  ({ratio:.1%} retirés)")
+    forces = resultat['forces']
+    print(f"      → Affectations forcées : {len(forces['departs'])} départs, "
+          f"{len(forces['salles'])} salles, {len(forces['profs'])} profs")
+    if resultat['sans_domaine']:
+        print(f"      → {len(resultat['sans_domaine'])} cours sans aucun départ/salle/prof possible : "
+              f"{', '.join(resultat['sans_domaine'][:10])}")
@@ -1,8 +1,9 @@
-from sqlalchemy import create_engine
 from typing import Dict, Any, Tuple
 
+import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine
+
+from connect_database import get_engine
 
 #TODO Faire une refacto des fonctions afin qu'il y ait moins de duplication et que ce soit plus compréhensible et renommage.
 def get_end_time(row) -> str:
@@ -31,91 +32,107 @@ def _time_to_slot(time_str: str) -> int:
         return 0
     h, m, _ = map(int, str(time_str).split(':'))
     return (h - 8) * 2 + (m // 30)
-def get_availabilityProf_From_Unavailable(df_dispos,creneaux_par_jour):
-    disponibilites_profs = {}
-    indisponibilites_profs = {}
-    indisponibilites_profs=recuperation_indisponibilites(df_dispos, indisponibilites_profs)
-
-    disponibilites_profs=recuperation_disponibilites_profs(creneaux_par_jour, disponibilites_profs, indisponibilites_profs)
-    return disponibilites_profs
-
-
-def recuperation_disponibilites_profs(creneaux_par_jour, disponibilites_profs: dict[Any, Any],
-                                      indisponibilites_profs: dict[Any, Any])-> dict[Any, Any]:
-    liste_jour=['Lundi','Mardi','Mercredi','Jeudi','Vendredi']
-    for i in indisponibilites_profs:
-        for day in liste_jour:
-            if day in indisponibilites_profs[i]:
-                h_min = 0
-                h_max = creneaux_par_jour
-                for k in indisponibilites_profs[i][day]:
-                    if k[0] == '':
-                        continue
-                    else:
-                        if h_min < k[1] < creneaux_par_jour:
-                            h_min = k[1]
-                            disponibilites_profs.setdefault(i, {}).setdefault(liste_jour.index(day), []).append((h_min + 1, h_max))
-                            continue
-                        if h_max > k[0]:
-                            h_max = k[0]
-                            disponibilites_profs.setdefault(i, {}).setdefault(liste_jour.index(day), []).append((h_min, h_max - 1))
-            else:
-                disponibilites_profs.setdefault(i, {}).setdefault(liste_jour.index(day), []).append((0, creneaux_par_jour))
-    return disponibilites_profs
-
-
-def recuperation_indisponibilites(df_dispos, indisponibilites_profs: dict[Any, Any])-> dict[Any, Any]:
-    for _, row in df_dispos.iterrows():
-        teacher_id = row['teacher_id']
-        day_id = (row['day_of_week'])  # 0 = lundi, 4 = vendredi
-        debut_str = get_start_time(row)
-        fin_str = get_end_time(row)
-        if debut_str != "":
-            debut_slot = _time_to_slot(debut_str)
-            fin_slot = _time_to_slot(fin_str)
-        else:
-            debut_slot = ""
-            fin_slot = ""
-        indisponibilites_profs.setdefault(teacher_id, {}).setdefault(day_id, []).append((debut_slot, fin_slot))
-    return indisponibilites_profs
-
-
-def get_availabilityRoom_From_Unavailable(df_dispos,creneaux_par_jour):
-    disponibilites_salles = {}
-    indisponibilites_salles = {}
-    indisponibilites_salles=recuperation_indisponibilites_rooms(df_dispos, indisponibilites_salles)
-
-    disponibilites_salles=recuperation_disponibilites_rooms(creneaux_par_jour, disponibilites_salles, indisponibilites_salles)
-    print("indisponibilites_salles : ",indisponibilites_salles)
-    print("disponibilites_salles : ",disponibilites_salles)
-    #disponibilites_salles= {16: {0: [(9, 23)], 1: [(0, 9)], 2: [(0, 9)], 4: [(9, 20)]}}
-
-    return disponibilites_salles
-
-
-def recuperation_disponibilites_rooms(creneaux_par_jour, disponibilites_salles: dict[Any, Any],
-                                      indisponibilites_salles: dict[Any, Any])-> dict[Any, Any]:
-    liste_jour=['Lundi','Mardi','Mercredi','Jeudi','Vendredi']
-    for i in indisponibilites_salles:
-        for day in liste_jour:
-            if day in indisponibilites_salles[i]:
-                print("day : ", day)
-                h_min = 0
-                h_max = creneaux_par_jour
-                for k in indisponibilites_salles[i][day]:
-                    if k[0] == '':
-                        continue
-                    else:
-                        if h_min < k[1] < creneaux_par_jour:
-                            h_min = k[1]
-                            disponibilites_salles.setdefault(i, {}).setdefault(liste_jour.index(day), []).append((h_min + 1, h_max))
-                            continue
-                        if h_max > k[0]:
-                            h_max = k[0]
-                            disponibilites_salles.setdefault(i, {}).setdefault(liste_jour.index(day), []).append((h_min, h_max - 1))
-            else:
-                disponibilites_salles.setdefault(i, {}).setdefault(liste_jour.index(day), []).append((0, creneaux_par_jour))
-    return disponibilites_salles
+JOURS_SEMAINE = ['Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi']
+
+
+# ------------------------------------------------------------------
+# Disponibilités : moteur vectorisé (indisponibilités en base → bitmaps → plages disponibles)
+# ------------------------------------------------------------------
+def _creneaux_depuis_heures(heures: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Colonne d'heures (TIME lu en timedelta, ou 'HH:MM:SS') → (index de créneau, vide) : 8h = 0, pas de 30 min,
+    négatif avant 8h ; vide marque les horaires NULL (index 0).
+    """
+    if pd.api.types.is_timedelta64_dtype(heures):
+        minutes = (heures / pd.Timedelta(minutes=1)).to_numpy()
+    else:
+        # Peu de valeurs distinctes : seules celles-ci sont analysées (sentinelle NaN pour les vides, code -1)
+        codes, valeurs = pd.factorize(heures)
+        textes = pd.Series(valeurs, dtype=object).astype(str).str[-8:]
+        minutes = np.append(pd.to_timedelta(textes, errors='coerce') / pd.Timedelta(minutes=1), np.nan)[codes]
+    vide = np.isnan(minutes)
+    return np.where(vide, 0, (minutes - 8 * 60) // 30).astype(np.int64), vide
+
+
+def _jours_en_index(jours: pd.Series) -> np.ndarray:
+    """Colonne day_of_week ('Lundi'... ou 0..4) → index du jour ; -1 si inconnu."""
+    codes, valeurs = pd.factorize(jours)
+    noms = {nom: i for i, nom in enumerate(JOURS_SEMAINE)}
+    index = [noms.get(v, v if isinstance(v, (int, np.integer)) else -1) for v in valeurs]
+    return np.append(np.array(index, dtype=np.int64), -1)[codes]
+
+
+def indisponibilites_en_bitmaps(df_dispos: pd.DataFrame, colonne: str, creneaux_par_jour: int, nb_jours: int = 5):
+    """
+    Lignes d'indisponibilité (colonne, day_of_week, start_time, end_time) → (entites, indisponible), où
+    indisponible[e, j, t] est vrai si le créneau t du jour j de l'entité entites[e] est couvert par une
+    ligne [début, fin[. Une ligne sans horaire bloque toute la journée.
+    Tout est fait par opérations sur colonnes : tableau de différences (+1 au début, -1 à la fin)
+    puis somme cumulée sur les créneaux.
+    """
+    entites, code = np.unique(df_dispos[colonne].to_numpy(), return_inverse=True)
+    jour = _jours_en_index(df_dispos['day_of_week'])
+    debut, debut_vide = _creneaux_depuis_heures(df_dispos['start_time'])
+    fin, fin_vide = _creneaux_depuis_heures(df_dispos['end_time'])
+    valide = (jour >= 0) & (jour < nb_jours)
+    # Seul un horaire NULL bloque la journée ; une heure hors de la grille (avant 8h...) est ramenée au bord
+    journee = valide & (debut_vide | fin_vide)
+    horaire = valide & ~journee
+    debut, fin = np.clip(debut, 0, creneaux_par_jour), np.clip(fin, 0, creneaux_par_jour)
+
+    forme = (len(entites), nb_jours, creneaux_par_jour + 1)
+    case = (code[horaire] * nb_jours + jour[horaire]) * forme[2]
+    taille = int(np.prod(forme))
+    delta = (np.bincount(case + debut[horaire], minlength=taille)
+             - np.bincount(case + fin[horaire], minlength=taille)).reshape(forme)
+    indisponible = np.cumsum(delta, axis=2)[:, :, :creneaux_par_jour] > 0
+    indisponible[code[journee], jour[journee]] = True
+    return entites, indisponible
+
+
+def plages_disponibles(entites: np.ndarray, indisponible: np.ndarray) -> dict[Any, dict[int, list]]:
+    """
+    Complément des bitmaps : {entite: {jour: [(debut, fin)]}} des plages libres maximales.
+    Un jour sans aucune indisponibilité donne (0, creneaux_par_jour) ; un jour entièrement bloqué est absent.
+    """
+    nb_entites, nb_jours, creneaux_par_jour = indisponible.shape
+    libre = np.zeros((nb_entites, nb_jours, creneaux_par_jour + 2), dtype=np.int8)
+    libre[:, :, 1:-1] = ~indisponible
+    bords = np.diff(libre, axis=2)  # +1 : une plage commence au créneau k, -1 : elle finit avant k
+    e, j, debuts = np.nonzero(bords == 1)
+    fins = np.nonzero(bords == -1)[2]
+    disponibilites = {entite: {} for entite in entites.tolist()}
+    cles = entites.tolist()
+    for e_i, j_i, d, f in zip(e.tolist(), j.tolist(), debuts.tolist(), fins.tolist()):
+        disponibilites[cles[e_i]].setdefault(j_i, []).append((d, f))
+    return disponibilites
+
+
+def get_availabilityProf_From_Unavailable(df_dispos, creneaux_par_jour):
+    return plages_disponibles(*indisponibilites_en_bitmaps(df_dispos, 'teacher_id', creneaux_par_jour))
+
+
+def get_availabilityRoom_From_Unavailable(df_dispos, creneaux_par_jour):
+    return plages_disponibles(*indisponibilites_en_bitmaps(df_dispos, 'room_id', creneaux_par_jour))
+
+
+def get_availabilityGroup_From_Unavailable(df_dispos, creneaux_par_jour):
+    return plages_disponibles(*indisponibilites_en_bitmaps(df_dispos, 'group_id', creneaux_par_jour))
+
+
+def get_availabilitySlot_From_Unavailable(df_dispos, creneaux_par_jour):
+    """Horaires obligatoires des slots, tels quels : {slot_id: {jour: [(debut, fin)]}} (lignes sans horaire ignorées)."""
+    jour = _jours_en_index(df_dispos['day_of_week'])
+    debut, debut_vide = _creneaux_depuis_heures(df_dispos['start_time'])
+    fin, fin_vide = _creneaux_depuis_heures(df_dispos['end_time'])
+    garder = (jour >= 0) & ~debut_vide & ~fin_vide & (debut >= 0) & (fin >= 0)
+    obligations = {}
+    for slot_id, j, d, f in zip(df_dispos['slot_id'].to_numpy()[garder].tolist(), jour[garder].tolist(),
+                                debut[garder].tolist(), fin[garder].tolist()):
+        obligations.setdefault(slot_id, {}).setdefault(j, []).append((d, f))
+    return obligations
+
+
 def recup_cours(cid:str):
     id_cour= cid.split("_")
     type_cour= id_cour[0]
@@ -127,124 +144,11 @@ def recup_id_slot_from_str_to_int(cid:str):
     id_slot = id_cour[-1]
     return int(id_slot[1:])
 
-def recuperation_indisponibilites_rooms(df_dispos, indisponibilites_profs: dict[Any, Any])-> dict[Any, Any]:
-    for _, row in df_dispos.iterrows():
-        room_id = row['room_id']
-        day_id = (row['day_of_week'])  # 0 = lundi, 4 = vendredi
-        debut_str = get_start_time(row)
-        fin_str = get_end_time(row)
-        if debut_str != "":
-            debut_slot = _time_to_slot(debut_str)
-            fin_slot = _time_to_slot(fin_str)
-        else:
-            debut_slot = ""
-            fin_slot = ""
-        indisponibilites_profs.setdefault(room_id, {}).setdefault(day_id, []).append((debut_slot, fin_slot))
-    return indisponibilites_profs
-
-
-def get_availabilityGroup_From_Unavailable(df_dispos,creneaux_par_jour):
-    disponibilites_groupes = {}
-    indisponibilites_groupes = {}
-    indisponibilites_groupes=recuperation_indisponibilites_group(df_dispos, indisponibilites_groupes)
-
-    disponibilites_groupes=recuperation_disponibilites_group(creneaux_par_jour, disponibilites_groupes, indisponibilites_groupes)
-    return disponibilites_groupes
-
-
-def recuperation_disponibilites_group(creneaux_par_jour, disponibilites_groupes: dict[Any, Any],
-                                      indisponibilites_groupes: dict[Any, Any])-> dict[Any, Any]:
-    liste_jour=['Lundi','Mardi','Mercredi','Jeudi','Vendredi']
-    for i in indisponibilites_groupes:
-        for day in liste_jour:
-            if day in indisponibilites_groupes[i]:
-                h_min = 0
-                h_max = creneaux_par_jour
-                for k in indisponibilites_groupes[i][day]:
-                    if k[0] == '':
-                        continue
-                    else:
-                        if h_min < k[1] < creneaux_par_jour:
-                            h_min = k[1]
-                            disponibilites_groupes.setdefault(i, {}).setdefault(liste_jour.index(day), []).append((h_min + 1, h_max))
-                            continue
-                        if h_max > k[0]:
-                            h_max = k[0]
-                            disponibilites_groupes.setdefault(i, {}).setdefault(liste_jour.index(day), []).append((h_min, h_max - 1))
-            else:
-                disponibilites_groupes.setdefault(i, {}).setdefault(liste_jour.index(day), []).append((0, creneaux_par_jour))
-    return disponibilites_groupes
-
-
-def recuperation_indisponibilites_group(df_dispos, indisponibilites_groupes: dict[Any, Any])-> dict[Any, Any]:
-    for _, row in df_dispos.iterrows():
-        group_id = row['group_id']
-        day_id = (row['day_of_week'])  # 0 = lundi, 4 = vendredi
-        debut_str = get_start_time(row)
-        fin_str = get_end_time(row)
-        if debut_str != "":
-            debut_slot = _time_to_slot(debut_str)
-            fin_slot = _time_to_slot(fin_str)
-        else:
-            debut_slot = ""
-            fin_slot = ""
-        indisponibilites_groupes.setdefault(group_id, {}).setdefault(day_id, []).append((debut_slot, fin_slot))
-    return indisponibilites_groupes
-
-def get_availabilitySlot_From_Unavailable(df_dispos,creneaux_par_jour):
-    indisponibilites_groupes = {}
-    disponibilites_slot=recuperation_indisponibilites_slot(df_dispos, indisponibilites_groupes)
-    return  disponibilites_slot
-
-def recuperation_disponibilites_slot(creneaux_par_jour, disponibilites_groupes: dict[Any, Any],
-                                      indisponibilites_groupes: dict[Any, Any])-> dict[Any, Any]:
-    liste_jour=['Lundi','Mardi','Mercredi','Jeudi','Vendredi']
-    for i in indisponibilites_groupes:
-        for day in liste_jour:
-            if day in indisponibilites_groupes[i]:
-                h_min = 0
-                h_max = creneaux_par_jour
-                for k in indisponibilites_groupes[i][day]:
-                    if k[0] == '':
-                        continue
-                    else:
-                        if h_min < k[1] < creneaux_par_jour:
-                            h_min = k[1]
-                            disponibilites_groupes.setdefault(i, {}).setdefault(liste_jour.index(day), []).append((h_min + 1, h_max))
-                            continue
-                        if h_max > k[0]:
-                            h_max = k[0]
-                            disponibilites_groupes.setdefault(i, {}).setdefault(liste_jour.index(day), []).append((h_min, h_max - 1))
-            else:
-                disponibilites_groupes.setdefault(i, {}).setdefault(liste_jour.index(day), []).append((0, creneaux_par_jour))
-    return disponibilites_groupes
-
-
-def recuperation_indisponibilites_slot(df_dispos, indisponibilites_groupes: dict[Any, Any])-> dict[Any, Any]:
-    liste_jour=['Lundi','Mardi','Mercredi','Jeudi','Vendredi']
-
-    for _, row in df_dispos.iterrows():
-        slot_id = row['slot_id']
-        day_id = (row['day_of_week'])  # 0 = lundi, 4 = vendredi
-        debut_str = get_start_time(row)
-        fin_str = get_end_time(row)
-        if debut_str != "":
-            debut_slot = _time_to_slot(debut_str)
-            fin_slot = _time_to_slot(fin_str)
-        else:
-            debut_slot = ""
-            fin_slot = ""
-        indisponibilites_groupes.setdefault(slot_id, {}).setdefault(liste_jour.index(day_id), []).append((debut_slot, fin_slot))
-    return indisponibilites_groupes
-
 
 class FunctionTest:
     def __init__(self, db_config: Dict[str, Any]):
         self.db_config = db_config
-        self.engine = create_engine(
-            f"mysql+mysqlconnector://{db_config['user']}:{db_config['password']}@"
-            f"{db_config['host']}:{db_config['port']}/{db_config['database']}"
-        )
+        self.engine = get_engine(db_config)
     def load_and_prepare_data(self):
         week_id=221
         query_dispos = """
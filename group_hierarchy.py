@@ -0,0 +1,73 @@
+# ==============================================================================
+# HIÉRARCHIE DES GROUPES (promotion → groupe → sous-groupe)
+# ==============================================================================
+from typing import Dict, Any, List
+
+# Arbre utilisé quand les données ne fournissent pas 'hierarchie_groupes' (anciennes sources de données)
+HIERARCHIE_PAR_DEFAUT = {
+    "BUT1": {"G1": ["G1A", "G1B"], "G2": ["G2A", "G2B"], "G3": ["G3A", "G3B"]},
+    "BUT2": {"G4": ["G4A", "G4B"], "G5": ["G5A", "G5B"]},
+    "BUT3": {"G7": ["G7A", "G7B"], "G8": ["G8A"]},
+}
+
+
+class GroupHierarchy:
+    """
+    Arbre promotion → groupe → sous-groupe.
+
+    Deux cours sont en conflit pour les étudiants dès qu'ils partagent une feuille de l'arbre
+    (un sous-groupe, ou un groupe/une promotion sans descendant) : une feuille suit tous les cours
+    de ses ancêtres et les siens. On calcule donc une seule fois, par feuille, l'ensemble des cours
+    qui la concernent ; le modèle pose ensuite une contrainte par feuille.
+    """
+
+    def __init__(self, hierarchie: Dict[str, Dict[str, List[str]]]):
+        self.parent = {}
+        self.enfants = {}
+        for promotion, groupes in hierarchie.items():
+            self.enfants.setdefault(promotion, [])
+            for groupe, sous_groupes in groupes.items():
+                self._lier(promotion, groupe)
+                for sous_groupe in sous_groupes:
+                    self._lier(groupe, sous_groupe)
+
+    @classmethod
+    def depuis_donnees(cls, d: Dict[str, Any]) -> "GroupHierarchy":
+        return cls(d.get('hierarchie_groupes') or HIERARCHIE_PAR_DEFAUT)
+
+    def _lier(self, parent: str, enfant: str):
+        self.parent[enfant] = parent
+        self.enfants.setdefault(parent, []).append(enfant)
+        self.enfants.setdefault(enfant, [])
+
+    def ancetres(self, groupe: str) -> List[str]:
+        """Le groupe lui-même puis ses ancêtres jusqu'à la promotion."""
+        chaine = [groupe]
+        while chaine[-1] in self.parent:
+            chaine.append(self.parent[chaine[-1]])
+        return chaine
+
+    def feuilles(self, groupes_connus=()) -> List[str]:
+        """Feuilles de l'arbre ; un groupe inconnu de l'arbre est traité comme une feuille isolée."""
+        feuilles = [g for g, enfants in self.enfants.items() if not enfants]
+        return feuilles + [g for g in groupes_connus if g not in self.enfants]
+
+    def cours_par_feuille(self, map_groupe_cours: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        """
+        Pour chaque feuille, les cours qui occupent ses étudiants. Les ensembles identiques ou
+        inclus dans celui d'une autre feuille sont retirés : leur contrainte serait redondante.
+        """
+        ensembles = {}
+        for feuille in self.feuilles(map_groupe_cours):
+            cours = dict.fromkeys(cid for g in self.ancetres(feuille) for cid in map_groupe_cours.get(g, []))
+            if len(cours) > 1:
+                ensembles[feuille] = list(cours)
+
+        retenus, deja_couverts = {}, []
+        for feuille, cours in sorted(ensembles.items(), key=lambda e: -len(e[1])):
+            cours_set = set(cours)
+            if any(cours_set <= couvert for couvert in deja_couverts):
+                continue
+            deja_couverts.append(cours_set)
+            retenus[feuille] = cours
+        return retenus
@@ -0,0 +1,262 @@
+# ==============================================================================
+# MODÈLE INCRÉMENTAL : appliquer des modifications sans reconstruire le modèle
+# ==============================================================================
+from typing import Dict, Any, Optional
+
+from function import convert_daystring_to_int
+from group_hierarchy import GroupHierarchy
+from solution_visualizer import extraire_affectations
+from time_table_model import TimetableModel, ENCODAGE_ENTIER
+from warm_start import heure_vers_offset
+
+# Famille de ressource → clé des plages de disponibilité dans les données
+CLES_DISPONIBILITES = {
+    'prof': 'disponibilites_profs',  # clé : teacher_id
+    'salle': 'disponibilites_salles',  # clé : id de salle
+    'groupe': 'disponibilites_groupes',  # clé : id du groupe ; les noms (G1, G1A, ...) y sont ramenés par group_to_dispo_key
+}
+
+
+def _retirer_plage(plages: list, debut: int, fin: int) -> list:
+    """Plages [(debut, fin)] privées de l'intervalle [debut, fin[."""
+    resultat = []
+    for a, b in plages:
+        if a < debut:
+            resultat.append((a, min(b, debut)))
+        if b > fin:
+            resultat.append((max(a, fin), b))
+    return [(a, b) for a, b in resultat if a < b]
+
+
+def _ajouter_plage(plages: list, debut: int, fin: int) -> list:
+    """Plages [(debut, fin)] augmentées de [debut, fin[, fusionnées."""
+    resultat = []
+    for a, b in sorted(list(plages) + [(debut, fin)]):
+        if resultat and a <= resultat[-1][1]:
+            resultat[-1] = (resultat[-1][0], max(resultat[-1][1], b))
+        else:
+            resultat.append((a, b))
+    return resultat
+
+
+class IncrementalTimetableModel(TimetableModel):
+    """
+    Modèle construit une fois puis modifié par petites retouches (deltas), sans repasser par
+    DataProviderID.load_and_prepare_data ni build_model :
+    - ajouter_indisponibilite / retirer_indisponibilite / modifier_disponibilites pour un prof,
+      une salle ou un groupe ;
+    - ajouter_cours ;
+    - modifier_capacite.
+
+    Les disponibilités de chaque ressource sont conditionnées par un littéral de version : une
+    modification fixe l'ancien littéral à faux (ses contraintes deviennent inactives) et pose les
+    nouvelles contraintes sous un nouveau littéral fixé à vrai. Un cours ajouté reçoit des
+    NoOverlap/AtMostOne qui remplacent (englobent) ceux déjà posés. La capacité des salles ne sert
+    plus à élaguer les salles candidates : elle n'intervient que dans les coefficients de l'objectif.
+
+    resoudre() relance la résolution en partant de la solution précédente (AddHint).
+    Les disponibilités des groupes ne sont pas intégrées aux départs légaux (groupes_dans_departs) :
+    elles se relâchent comme celles des profs et des salles. Limite : les horaires obligatoires des
+    slots, eux, réduisent le domaine des débuts et ne peuvent pas être relâchés.
+    """
+
+    def __init__(self, data: Dict[str, Any], encodage: str = ENCODAGE_ENTIER):
+        super().__init__(data, encodage)
+        # Les disponibilités peuvent être relâchées plus tard : aucun domaine n'est réduit d'après elles
+        self.presolve_statique = False
+        # Disponibilités des groupes sous littéral de version, comme profs et salles : relâchables
+        self.groupes_dans_departs = False
+        self._litteraux_ressources = {}
+        self._nb_versions = 0
+        self.derniere_solution = None  # table d'affectations de la dernière résolution réussie
+
+    # ------------------------------------------------------------------
+    # Points d'extension de TimetableModel
+    # ------------------------------------------------------------------
+    def _salles_candidates(self, c: dict[str, Any]) -> list:
+        # Pas d'élagage par capacité : une capacité modifiée ne doit pas exiger de nouvelles variables
+        cid = c['id']
+        if cid not in self._candidats_salles:
+            self._candidats_salles[cid] = c.get("allowed_room_indices") or list(range(len(self.data['salles'])))
+        return self._candidats_salles[cid]
+
+    def _litteral_ressource(self, famille: str, ressource_id):
+        cle = (famille, ressource_id)
+        if cle not in self._litteraux_ressources:
+            self._nb_versions += 1
+            litteral = self.model.NewBoolVar(f"actif_{famille}_{ressource_id}_v{self._nb_versions}")
+            self._fixer(litteral, True)
+            self._litteraux_ressources[cle] = litteral
+        return self._litteraux_ressources[cle]
+
+    def _define_objective_function(self):
+        """Capacité portée par les coefficients de y_salle : changer une capacité ne touche que l'objectif."""
+        d = self.data
+        violations = [var for c in d['cours'] for r, var in self._vars['y_salle'][c['id']].items()
+                      if d['taille_groupes'].get(c['groups'][0], 0) > d['capacites'][r]]
+        self._vars['penalites_capacite'] = violations
+        print(f"   -> Objectif : Minimiser {len(violations)} violations de capacité potentielles.")
+        self.model.Minimize(sum(violations) * 1000000 + sum(getattr(self, 'penalites_fin_tardive', [])))
+
+    def _fixer(self, litteral, valeur: bool):
+        # Le domaine d'une variable du proto peut être réécrit entre deux résolutions
+        domaine = self.model.Proto().variables[litteral.Index()].domain
+        domaine[0] = domaine[1] = int(valeur)
+
+    # ------------------------------------------------------------------
+    # Deltas
+    # ------------------------------------------------------------------
+    def modifier_disponibilites(self, famille: str, ressource_id, plages_par_jour: Optional[dict]) -> int:
+        """
+        Remplace les plages de disponibilité d'une ressource ({jour: [(debut, fin)]}, None = aucune
+        restriction), désignée par sa clé dans CLES_DISPONIBILITES (teacher_id, id de salle, id de groupe).
+        Renvoie le nombre de couples (cours, ressource) contraints.
+        """
+        if famille not in CLES_DISPONIBILITES:
+            raise ValueError(f"Famille de ressource inconnue : {famille} (attendu : {', '.join(CLES_DISPONIBILITES)})")
+        ancien = self._litteraux_ressources.pop((famille, ressource_id), None)
+        if ancien is not None:
+            self._fixer(ancien, False)
+        dispos = self.data.setdefault(CLES_DISPONIBILITES[famille], {})
+        if plages_par_jour is None:
+            dispos.pop(ressource_id, None)
+            self._rafraichir_disponibilites(famille, ressource_id, None)
+            print(f"   -> Delta {famille} {ressource_id} : plus aucune restriction")
+            return 0
+        dispos[ressource_id] = plages_par_jour
+        self._rafraichir_disponibilites(famille, ressource_id, plages_par_jour)
+        affectations = self._affectations_ressource(famille, ressource_id)
+        for cid, litteral in affectations:
+            self._disponibilite_ressource_cours(famille, ressource_id, cid, litteral)
+        print(f"   -> Delta {famille} {ressource_id} : {len(affectations)} couple(s) cours/ressource recontraints")
+        return len(affectations)
+
+    def ajouter_indisponibilite(self, famille: str, ressource_id, jour, debut, fin) -> int:
+        """Même format que ConstraintManager.add_*_unavailability : jour 'Lundi' ou 0, heures '10:00' ou offsets."""
+        jour, debut, fin = self._normaliser_creneau(jour, debut, fin)
+        plages = self._plages_courantes(famille, ressource_id)
+        plages[jour] = _retirer_plage(plages.get(jour, []), debut, fin)
+        return self.modifier_disponibilites(famille, ressource_id, plages)
+
+    def retirer_indisponibilite(self, famille: str, ressource_id, jour, debut, fin) -> int:
+        jour, debut, fin = self._normaliser_creneau(jour, debut, fin)
+        plages = self._plages_courantes(famille, ressource_id)
+        plages[jour] = _ajouter_plage(plages.get(jour, []), debut, fin)
+        return self.modifier_disponibilites(famille, ressource_id, plages)
+
+    def ajouter_cours(self, cours: dict[str, Any], duree: int, taille_groupe: Optional[int] = None):
+        """
+        Ajoute un cours ({'id', 'groups', 'allowed_prof_indices'[, 'allowed_room_indices']}) au modèle
+        déjà construit : variables, liaisons, conflits, disponibilités, ordre CM→TD→TP et objectif.
+        """
+        d = self.data
+        cid = cours['id']
+        if cid in self._vars['debut']:
+            raise ValueError(f"Le cours {cid} existe déjà dans le modèle")
+        d['cours'].append(cours)
+        d['duree_cours'][cid] = duree
+        if taille_groupe is not None:
+            d['taille_groupes'][cours['groups'][0]] = taille_groupe
+        for g in cours['groups']:
+            d['map_groupe_cours'].setdefault(g, []).append(cid)
+        self.probleme.ajouter_cours(d, cours)
+
+        self.index_departs.ajouter_cours(cours)
+        self._creer_variables_cours(cours)
+        self._lier_cours(cours)
+
+        # Conflits profs/salles : NoOverlap englobant l'ancien pour chaque ressource touchée
+        self._creer_intervalles_prof(cours)
+        self._creer_intervalles_salle(cours)
+        for p_idx in self._vars['intervalles_prof'][cid]:
+            if len(self._intervalles_par_prof[p_idx]) > 1:
+                self.model.AddNoOverlap(self._intervalles_par_prof[p_idx])
+        for r_idx in self._vars['intervalles_salle'][cid]:
+            if len(self._intervalles_par_salle[r_idx]) > 1:
+                self.model.AddNoOverlap(self._intervalles_par_salle[r_idx])
+
+        # Conflits étudiants : feuilles de la hiérarchie qui suivent ce cours
+        hierarchie = GroupHierarchy.depuis_donnees(d)
+        for feuille, course_list in hierarchie.cours_par_feuille(d['map_groupe_cours']).items():
+            if cid in course_list:
+                self._poser_conflit_etudiants(course_list)
+
+        # Disponibilités des ressources, sous le littéral de leur version courante
+        for famille, cle in CLES_DISPONIBILITES.items():
+            for ressource_id in d.get(cle, {}):
+                for _, litteral in self._affectations_ressource(famille, ressource_id, cours=[cours]):
+                    self._disponibilite_ressource_cours(famille, ressource_id, cid, litteral)
+
+        self._ordonner_nouveau_cours(cid)
+        if hasattr(self, '_parametres_fin_tardive'):
+            self._penaliser_fin_tardive_cours(cours, *self._parametres_fin_tardive)
+        self._define_objective_function()
+        print(f"   -> Delta : cours {cid} ajouté ({len(self._departs_valides[cid])} départs légaux)")
+
+    def modifier_capacite(self, salle_id, capacite: int):
+        d = self.data
+        d['salles'][salle_id] = capacite
+        d['capacites'][list(d['salles']).index(salle_id)] = capacite
+        self.probleme.maj_capacite(salle_id, capacite)
+        self._define_objective_function()
+        print(f"   -> Delta : capacité de la salle {salle_id} → {capacite}")
+
+    def resoudre(self, **kwargs) -> Dict[str, Any]:
+        """solve() en partant de la dernière solution trouvée (les cours ajoutés depuis n'ont pas d'indice)."""
+        self.model.ClearHints()
+        if self.derniere_solution is not None:
+            self.ajouter_indices(self.derniere_solution)
+        solution = self.solve(**kwargs)
+        if solution['vars']:
+            self.derniere_solution = extraire_affectations(solution['solver'], solution['vars'], self.data)
+        return solution
+
+    # ------------------------------------------------------------------
+    # Outils
+    # ------------------------------------------------------------------
+    def _normaliser_creneau(self, jour, debut, fin):
+        if isinstance(jour, str):
+            jour = convert_daystring_to_int(jour)
+        if isinstance(debut, str):
+            debut = heure_vers_offset(debut)
+        if isinstance(fin, str):
+            fin = heure_vers_offset(fin)
+        return jour, debut, fin
+
+    def _rafraichir_disponibilites(self, famille: str, ressource_id, plages_par_jour: Optional[dict]):
+        """Réécrit les seules lignes de bitmap de la ressource et oublie leurs masques de départs."""
+        for ligne in self.probleme.maj_disponibilites(famille, ressource_id, plages_par_jour):
+            self.index_departs.oublier_ressource(famille, ligne)
+
+    def _plages_courantes(self, famille: str, ressource_id) -> dict:
+        """Copie des plages actuelles ; une ressource sans entrée est disponible toute la semaine."""
+        d = self.data
+        plages = d.get(CLES_DISPONIBILITES[famille], {}).get(ressource_id)
+        if plages is None:
+            return {j: [(0, d['creneaux_par_jour'])] for j in range(d['jours'])}
+        return {j: list(p) for j, p in plages.items()}
+
+    def _ordonner_nouveau_cours(self, cid: str):
+        """
+        Relie le nouveau cours aux couches CM/TD/TP non vides adjacentes de sa matière, avec l'ordre de
+        contrainte_ordre_cm_td_tp (débuts strictement ordonnés ; seul le dernier CM précède les TD/TP).
+        Un CM ajouté devient le dernier CM : il précède les TD/TP, l'ancien dernier CM les précède toujours.
+        """
+        nouveau = self.probleme.cours_par_id(cid)
+        typ, matiere = nouveau.type, nouveau.matiere
+        ordre = ("CM", "TD", "TP")
+        if typ not in ordre:
+            return
+        couches = {t: [] for t in ordre}
+        for c in self.probleme.cours:
+            if c.matiere == matiere and c.type in couches and c.id != cid:
+                couches[c.type].append(c.id)
+        couches["CM"] = couches["CM"][-1:]
+        rang = ordre.index(typ)
+        avant = next((couches[t] for t in reversed(ordre[:rang]) if couches[t]), [])
+        apres = next((couches[t] for t in ordre[rang + 1:] if couches[t]), [])
+        debut = self._vars['debut']
+        for autre in avant:
+            self.model.Add(debut[autre] < debut[cid])
+        for autre in apres:
+            self.model.Add(debut[cid] < debut[autre])
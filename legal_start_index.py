@@ -0,0 +1,115 @@
+# ==============================================================================
+# INDEX DES DÉPARTS LÉGAUX (précalcul partagé par les contraintes de disponibilité)
+# ==============================================================================
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+from problem_bundle import ProblemBundle
+
+# Famille de ressource → bitmaps (entité × slot) du ProblemBundle : disponibilités, plages déclarées
+BITMAPS = {
+    'prof': ('dispo_profs', 'dispo_declaree_profs'),
+    'salle': ('dispo_salles', 'dispo_declaree_salles'),
+    'groupe': ('dispo_groupes', 'dispo_declaree_groupes'),
+}
+
+
+class LegalStartIndex:
+    """
+    Précalcule une seule fois, sous forme de masques NumPy de longueur nb_slots :
+    - pour chaque cours, les départs légaux (fin de journée, pause midi, disponibilités
+      des groupes sauf avec_groupes=False, et horaires obligatoires du slot) ;
+    - pour chaque ressource (prof, salle, groupe) du ProblemBundle et chaque durée, les départs
+      dont tout le cours tombe sur des créneaux disponibles de son bitmap.
+
+    Les contraintes du modèle n'ont plus qu'à combiner ces masques pour n'émettre que
+    les couples (cours, départ) interdits.
+    """
+
+    def __init__(self, data: Dict[str, Any], probleme: ProblemBundle, avec_groupes: bool = True):
+        self.data = data
+        self.probleme = probleme
+        # False : les disponibilités des groupes restent hors des départs légaux (posées par le modèle)
+        self.avec_groupes = avec_groupes
+        self.nb_slots = data['nb_slots']
+        self.creneaux_par_jour = data['creneaux_par_jour']
+        self._masques_base = {}
+        self._masques_ressources = {}
+        self.departs_legaux = {}
+        self._construire()
+
+    def _construire(self):
+        for c in self.data['cours']:
+            self.ajouter_cours(c)
+
+    def ajouter_cours(self, c: Dict[str, Any]) -> np.ndarray:
+        """Calcule (ou recalcule) les départs légaux d'un cours et les renvoie."""
+        probleme = self.probleme
+        cours = probleme.cours_par_id(c['id'])
+        duree = cours.duree
+        masque = self.masque_base(duree).copy()
+        for g in probleme.groupes_du_cours(cours.index) if self.avec_groupes else ():
+            masque_groupe = self.masque_ressource('groupe', int(g), duree)
+            if masque_groupe is not None:
+                masque &= masque_groupe
+        if probleme.a_obligation[cours.index]:
+            masque &= self._masque_obligations(self.data['obligations_slots'][cours.slot_id], duree)
+        self.departs_legaux[cours.id] = masque
+        return masque
+
+    def masque_base(self, duree: int) -> np.ndarray:
+        """Départs où le cours tient dans la journée sans chevaucher la pause midi."""
+        if duree not in self._masques_base:
+            offsets = np.arange(self.creneaux_par_jour)
+            jour = offsets + duree <= self.creneaux_par_jour
+            for midi in self.data['fenetre_midi']:
+                jour &= ~((offsets <= midi) & (midi < offsets + duree))
+            self._masques_base[duree] = np.tile(jour, self.nb_slots // self.creneaux_par_jour)
+        return self._masques_base[duree]
+
+    def _masque_bitmap(self, bitmap: np.ndarray, duree: int) -> np.ndarray:
+        """Départs dont les duree créneaux sont tous disponibles dans le bitmap, sans changer de jour."""
+        # indisponibles[s] = nombre de créneaux indisponibles avant s : fenêtre glissante en O(nb_slots)
+        indisponibles = np.concatenate(([0], np.cumsum(~bitmap)))
+        masque = np.zeros(self.nb_slots, dtype=bool)
+        fin = self.nb_slots - duree + 1
+        if fin > 0:
+            masque[:fin] = indisponibles[duree:] == indisponibles[:fin]
+        return masque & self.masque_base(duree)
+
+    def _masque_obligations(self, plages_par_jour: dict, duree: int) -> np.ndarray:
+        """Départs qui correspondent exactement à un horaire obligatoire (même début et même fin)."""
+        masque = np.zeros(self.nb_slots, dtype=bool)
+        for jour, plages in plages_par_jour.items():
+            for debut, fin in plages:
+                if fin == debut + duree:
+                    masque[jour * self.creneaux_par_jour + debut] = True
+        return masque
+
+    def masque_ressource(self, famille: str, index: int, duree: int) -> Optional[np.ndarray]:
+        """
+        Départs permis par la ressource d'indice index dans le ProblemBundle (famille prof, salle
+        ou groupe) ; None si elle n'a déclaré aucune plage (disponible partout).
+        """
+        bitmaps, declarees = BITMAPS[famille]
+        if not getattr(self.probleme, declarees)[index]:
+            return None
+        cle = (famille, index, duree)
+        if cle not in self._masques_ressources:
+            self._masques_ressources[cle] = self._masque_bitmap(getattr(self.probleme, bitmaps)[index], duree)
+        return self._masques_ressources[cle]
+
+    def oublier_ressource(self, famille: str, index: int):
+        """Invalide les masques en cache d'une ressource dont le bitmap a changé."""
+        for cle in [cle for cle in self._masques_ressources if cle[:2] == (famille, index)]:
+            del self._masques_ressources[cle]
+
+    def departs(self, cid: str) -> np.ndarray:
+        return np.flatnonzero(self.departs_legaux[cid])
+
+    def departs_interdits(self, cid: str, masque_ressource: Optional[np.ndarray]) -> np.ndarray:
+        """Départs légaux du cours qui tombent hors des plages de la ressource."""
+        if masque_ressource is None:
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero(self.departs_legaux[cid] & ~masque_ressource)
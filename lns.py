@@ -0,0 +1,133 @@
+# ==============================================================================
+# RECHERCHE À GRAND VOISINAGE (LNS) : amélioration de la solution après le premier solve
+# ==============================================================================
+import random
+import time
+from typing import Dict, Any, List, Optional
+
+import pandas as pd
+from ortools.sat.python import cp_model
+
+from decomposition import partitionner_par_promotion
+from solution_visualizer import extraire_affectations
+from solver_profiles import construire_profil, appliquer_profil
+from time_table_model import TimetableModel
+
+VOISINAGES = ("jour", "promotion", "prof")
+
+
+class LNSDriver:
+    """
+    Améliore la solution d'un TimetableModel déjà construit :
+    à chaque itération, un voisinage (les cours d'un jour, d'une promotion ou d'un prof) est relâché,
+    tous les autres cours sont figés à la solution courante (début, salle, prof) sur une copie du
+    modèle (CpModel.clone), et la copie est résolue avec une courte limite de temps ; on garde
+    toute amélioration de l'objectif.
+
+    Anytime : ameliorer() peut être interrompu (Ctrl+C, arreter() ou limite de temps) et renvoie
+    toujours la meilleure solution connue ; historique trace l'objectif en fonction du temps écoulé.
+    """
+
+    def __init__(self, scheduler: TimetableModel, graine: int = 0, voisinages=VOISINAGES):
+        self.scheduler = scheduler
+        self.data = scheduler.data
+        self.rnd = random.Random(graine)
+        self.voisinages = voisinages
+        self.promotions = partitionner_par_promotion(self.data)
+        self.affectations: Optional[pd.DataFrame] = None
+        self.objectif: Optional[float] = None
+        self.historique: List[tuple] = []  # (secondes, objectif, voisinage)
+        self._arret = False
+        self._debut = None
+
+    def arreter(self):
+        """Demande l'arrêt après l'itération en cours (depuis un autre thread ou un callback)."""
+        self._arret = True
+
+    def partir_de(self, solution: Dict[str, Any]):
+        """Prend comme solution courante le résultat d'un TimetableModel.solve() faisable."""
+        if self._debut is None:
+            self._debut = time.perf_counter()
+        self.affectations = extraire_affectations(solution['solver'], solution['vars'], self.data)
+        self._noter(solution['solver'].ObjectiveValue(), "solution initiale")
+
+    def _noter(self, objectif: float, voisinage: str):
+        self.objectif = objectif
+        secondes = time.perf_counter() - self._debut
+        self.historique.append((secondes, objectif, voisinage))
+        print(f"   -> LNS t={secondes:7.1f} s  objectif={objectif:,.0f}  ({voisinage})")
+
+    def ameliorer(self, duree_totale: float = 300, temps_par_iteration: float = 10,
+                  profil: str = "defaut", **surcharges) -> Dict[str, Any]:
+        """
+        Premier solve (si aucune solution n'est encore connue) puis itérations LNS jusqu'à duree_totale
+        secondes. Les surcharges (num_workers, ...) s'appliquent au premier solve et aux sous-problèmes.
+        """
+        debut = time.perf_counter()
+        if self._debut is None:
+            self._debut = debut  # origine des temps de l'historique
+        self._arret = False
+        if self.affectations is None:
+            premier = min(temps_par_iteration * 3, duree_totale)
+            solution = self.scheduler.solve(profil=profil, **{**surcharges, "max_time_in_seconds": premier})
+            if not solution['vars']:
+                print("   -> LNS : aucune solution initiale, abandon.")
+                return self.resultat()
+            self.partir_de(solution)
+
+        parametres = construire_profil(profil, **{**surcharges, "max_time_in_seconds": temps_par_iteration})
+        iteration = 0
+        try:
+            while not self._arret and time.perf_counter() - debut < duree_totale and self.objectif > 0:
+                iteration += 1
+                voisinage, relaches = self._choisir_voisinage()
+                restant = duree_totale - (time.perf_counter() - debut)
+                parametres["max_time_in_seconds"] = max(1.0, min(temps_par_iteration, restant))
+                solver = appliquer_profil(cp_model.CpSolver(), parametres)
+                status = solver.Solve(self._sous_modele(relaches))
+                if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) and solver.ObjectiveValue() < self.objectif:
+                    # Les copies gardent les indices du modèle : les variables d'origine lisent la réponse
+                    self.affectations = extraire_affectations(solver, self.scheduler._vars, self.data)
+                    self._noter(solver.ObjectiveValue(), f"{voisinage}, {len(relaches)} cours relâchés")
+        except KeyboardInterrupt:
+            print("   -> LNS interrompue : conservation de la meilleure solution.")
+        print(f"   -> LNS terminée : {iteration} itération(s), objectif {self.objectif:,.0f}")
+        return self.resultat()
+
+    def resultat(self) -> Dict[str, Any]:
+        return {"affectations": self.affectations, "objectif": self.objectif, "historique": self.historique}
+
+    def _choisir_voisinage(self):
+        """Tire un voisinage non trivial : les cours d'un jour, d'une promotion ou d'un prof de la solution courante."""
+        a = self.affectations
+        voisinage = self.rnd.choice(self.voisinages)
+        if voisinage == "jour":
+            jour = self.rnd.choice(sorted(a["jour"].unique()))
+            return f"jour {jour}", set(a.loc[a["jour"] == jour, "cours"])
+        if voisinage == "promotion":
+            promotion = self.rnd.choice(sorted(self.promotions))
+            return f"promotion {promotion}", set(self.promotions[promotion])
+        prof = self.rnd.choice(sorted(a["prof"].dropna().unique()))
+        return f"prof {prof}", set(a.loc[a["prof"] == prof, "cours"])
+
+    def _sous_modele(self, relaches: set) -> cp_model.CpModel:
+        """Copie du modèle où tout cours hors du voisinage est figé ; la solution courante sert d'indice."""
+        modele = self.scheduler.model.clone()
+        modele.ClearHints()
+        variables = self.scheduler._vars
+
+        def copie(var):
+            return modele.GetIntVarFromProtoIndex(var.Index())
+
+        for a in self.affectations.itertuples(index=False):
+            cid = a.cours
+            debut, salle = copie(variables['debut'][cid]), copie(variables['y_salle'][cid][a.salle_idx])
+            # Cours sans prof autorisé : prof_idx vaut -1, pas de variable d'affectation
+            fixees = [(debut, a.slot), (salle, 1)] + ([(copie(variables['z_prof'][cid][a.prof_idx]), 1)]
+                                                      if a.prof_idx >= 0 else [])
+            for var, valeur in fixees:
+                if cid in relaches:
+                    modele.AddHint(var, valeur)
+                else:
+                    modele.Add(var == valeur)
+        return modele
@@ -0,0 +1,146 @@
+# ==============================================================================
+# MIGRATIONS DU SCHÉMA : versionnées, appliquées une fois au déploiement
+# ==============================================================================
+"""
+Chaque migration porte un numéro de version ; la table schema_version garde celles déjà appliquées.
+À lancer au déploiement (ou après une mise à jour du code) :
+
+    python migrations.py            # applique les migrations en attente
+    python migrations.py --statut   # version actuelle et migrations en attente
+
+Le code applicatif (ConstraintManager, DataProviderID) suppose le schéma à jour et n'exécute plus que
+des requêtes de données. Les migrations vérifient l'existence de ce qu'elles ajoutent : elles passent
+sans rien changer sur une base déjà créée avec Database/Creation_tables.sql.
+"""
+import argparse
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import inspect, text
+
+TABLES_SEMAINE = ("teacher_constraints", "room_constraints", "group_constraints")
+# Index composites de la lecture des disponibilités (data_provider_id.requete_contraintes)
+INDEX_CONTRAINTES = {"teacher_constraints": "teacher_id", "room_constraints": "room_id",
+                     "group_constraints": "group_id", "slot_constraints": "slot_id"}
+
+
+def _colonnes(conn, table: str) -> set:
+    # Noms seuls : pas de réflexion des types (INT(11) et autres types MySQL sous SQLite)
+    return set(conn.execute(text(f"SELECT * FROM {table} LIMIT 0")).keys())
+
+
+class MigrationImpossible(RuntimeError):
+    """Le schéma ne permet pas d'appliquer la migration (table absente...) : elle n'est pas enregistrée."""
+
+
+def _exiger_table(conn, table: str):
+    if not inspect(conn).has_table(table):
+        raise MigrationImpossible(f"table {table} absente : créer le schéma (Database/Creation_tables.sql, "
+                                  f"create_constraint_tables) puis relancer les migrations")
+
+
+def _ajouter_colonne(conn, table: str, colonne: str, definition: str) -> bool:
+    _exiger_table(conn, table)
+    if colonne in _colonnes(conn, table):
+        return False
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {colonne} {definition}"))
+    return True
+
+
+def _m1_week_id_contraintes(conn):
+    """Colonne week_id (NULL = contrainte permanente), index et clé étrangère sur les tables de contraintes"""
+    for table in TABLES_SEMAINE:
+        if not _ajouter_colonne(conn, table, "week_id", "INT NULL"):
+            continue
+        conn.execute(text(f"CREATE INDEX idx_{table}_week_id ON {table}(week_id)"))
+        if conn.dialect.name == "mysql":
+            conn.execute(text(f"ALTER TABLE {table} ADD CONSTRAINT fk_{table}_week_id "
+                              f"FOREIGN KEY (week_id) REFERENCES weeks(id)"))
+
+
+def _m2_slots_is_exam(conn):
+    """Colonne slots.is_exam (ConstraintManager.set_slot_exam)"""
+    _ajouter_colonne(conn, "slots", "is_exam", "BOOLEAN DEFAULT 0")
+
+
+def _m3_edt_slot_is_draft(conn):
+    """Colonne edt_slot.is_draft (brouillons publiés pendant la résolution)"""
+    _ajouter_colonne(conn, "edt_slot", "is_draft", "BOOLEAN NOT NULL DEFAULT 0")
+
+
+def _m4_index_contraintes(conn):
+    """Index (entité, jour, semaine, actif) des tables de contraintes"""
+    for table, entite in INDEX_CONTRAINTES.items():
+        _exiger_table(conn, table)
+        nom = f"idx_{table}_semaine"
+        if nom not in {i['name'] for i in inspect(conn).get_indexes(table)}:
+            conn.execute(text(f"CREATE INDEX {nom} ON {table} ({entite}, day_of_week, week_id, active)"))
+
+
+# (version, description, fonction) — toujours ajouter à la fin, ne jamais renuméroter
+MIGRATIONS = [
+    (1, "week_id sur les tables de contraintes", _m1_week_id_contraintes),
+    (2, "slots.is_exam", _m2_slots_is_exam),
+    (3, "edt_slot.is_draft", _m3_edt_slot_is_draft),
+    (4, "index composites des tables de contraintes", _m4_index_contraintes),
+]
+
+
+def version_actuelle(engine) -> int:
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE IF NOT EXISTS schema_version ("
+                          "version INT PRIMARY KEY, description VARCHAR(255) NOT NULL, applied_at DATETIME NOT NULL)"))
+        return int(conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_version")).scalar())
+
+
+def appliquer_migrations(engine, cible: Optional[int] = None, silencieux: bool = False) -> List[int]:
+    """
+    Applique dans l'ordre les migrations de version supérieure à celle de la base (jusqu'à cible incluse).
+    Une transaction par migration, enregistrée dans schema_version à la fin ; sous MySQL, un ALTER TABLE
+    valide implicitement la transaction, d'où des migrations qui vérifient ce qui existe déjà.
+    Une migration qui ne peut pas s'appliquer (MigrationImpossible, table manquante) n'est pas enregistrée :
+    l'exception remonte et les suivantes ne sont pas tentées ; relancer une fois le schéma complété.
+    Renvoie les versions appliquées.
+    """
+    actuelle = version_actuelle(engine)
+    appliquees = []
+    for version, description, fonction in MIGRATIONS:
+        if version <= actuelle or (cible is not None and version > cible):
+            continue
+        with engine.begin() as conn:
+            fonction(conn)
+            conn.execute(text("INSERT INTO schema_version (version, description, applied_at) "
+                              "VALUES (:version, :description, :date)"),
+                         {"version": version, "description": description, "date": datetime.now()})
+        appliquees.append(version)
+        if not silencieux:
+            print(f"   -> Migration {version} appliquée : {description}")
+    return appliquees
+
+
+def main():
+    from connect_database import get_db_config, get_engine
+
+    config = get_db_config()
+    parser = argparse.ArgumentParser(description="Migrations du schéma de la base")
+    parser.add_argument("--statut", action="store_true", help="Affiche la version et les migrations en attente")
+    parser.add_argument("--cible", type=int, default=None, help="Dernière version à appliquer (défaut : toutes)")
+    for cle in ("host", "port", "database", "user", "password"):
+        parser.add_argument(f"--{cle}", type=type(config[cle]) if config[cle] is not None else str,
+                            default=config[cle], help="Défaut : variable d'environnement (connect_database)")
+    argvs = parser.parse_args()
+    engine = get_engine({cle: getattr(argvs, cle) for cle in config})
+
+    actuelle = version_actuelle(engine)
+    en_attente = [(v, d) for v, d, _ in MIGRATIONS if v > actuelle]
+    print(f"Schéma en version {actuelle} ; {len(en_attente)} migration(s) en attente")
+    if argvs.statut:
+        for version, description in en_attente:
+            print(f"   -> {version} : {description}")
+        return
+    appliquer_migrations(engine, cible=argvs.cible)
+    print(f"Schéma en version {version_actuelle(engine)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+# ==============================================================================
+# PROBLÈME INDEXÉ : représentation typée et à base de tableaux des données d'une semaine
+# ==============================================================================
+from dataclasses import dataclass, replace
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from function import recup_cours, recup_id_slot_from_str_to_int
+from warm_start import signature_cours
+
+
+@dataclass(slots=True, frozen=True)
+class Cours:
+    index: int
+    id: str
+    type: str  # CM, TD, TP, SAE
+    matiere: str
+    signature: str  # TYPE_matiere_groupe (warm_start.signature_cours)
+    slot_id: int
+    duree: int
+    taille: int
+
+
+@dataclass(slots=True, frozen=True)
+class Salle:
+    index: int
+    id: Any  # rooms.id
+    capacite: int
+
+
+@dataclass(slots=True, frozen=True)
+class Prof:
+    index: int
+    nom: str
+    teacher_id: Optional[int]
+
+
+@dataclass(slots=True, frozen=True)
+class Groupe:
+    index: int
+    nom: str
+    taille: int
+    dispo_key: Optional[int]  # clé de disponibilites_groupes (group_to_dispo_key)
+
+
+# Attributs NumPy du bundle (hors objets typés), dans l'ordre d'écriture des snapshots
+TABLEAUX = (
+    "durees", "tailles", "slot_ids", "capacites",
+    "cours_groupes_indptr", "cours_groupes_indices", "cours_profs_indptr", "cours_profs_indices",
+    "cours_salles_indptr", "cours_salles_indices",
+    "dispo_profs", "dispo_declaree_profs", "dispo_salles", "dispo_declaree_salles",
+    "dispo_groupes", "dispo_declaree_groupes", "a_obligation",
+)
+
+
+def _csr(listes: List[List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Listes d'adjacence → (indptr, indices) : les voisins de i sont indices[indptr[i]:indptr[i + 1]]."""
+    indptr = np.zeros(len(listes) + 1, dtype=np.int32)
+    indptr[1:] = np.cumsum([len(l) for l in listes])
+    indices = np.fromiter((v for l in listes for v in l), dtype=np.int32, count=int(indptr[-1]))
+    return indptr, indices
+
+
+class ProblemBundle:
+    """
+    Les données d'une semaine indexées par entiers, construites une seule fois à partir du dictionnaire
+    de load_and_prepare_data :
+    - cours, salles, profs, groupes : listes d'objets typés (index = position), plus des tableaux NumPy
+      par colonne (durees, tailles, slot_ids, capacites) ;
+    - adjacences cours → groupes, cours → profs autorisés et cours → salles imposées au format CSR
+      (une liste de salles vide = toutes les salles) ;
+    - disponibilités : une matrice booléenne (entité × slot) par famille, vraie quand le créneau est
+      dans une plage de disponibilité ; les entités sans plage déclarée sont disponibles partout
+      (dispo_declaree_* les distingue).
+    Le type, la matière et le slot id de chaque cours sont extraits ici une fois pour toutes :
+    les consommateurs n'ont plus à relire les identifiants de cours.
+    Le modèle incrémental le tient à jour sur place (maj_disponibilites, maj_capacite, ajouter_cours) :
+    seules les lignes touchées sont recalculées.
+    """
+
+    def __init__(self, d: Dict[str, Any], tableaux: Optional[Dict[str, np.ndarray]] = None):
+        self.nb_slots = d['nb_slots']
+        self.creneaux_par_jour = d['creneaux_par_jour']
+
+        self.salles = [Salle(r, salle_id, int(cap)) for r, (salle_id, cap) in enumerate(d['salles'].items())]
+        self.index_salles = {s.id: s.index for s in self.salles}
+        prof_to_teacher_id = d.get('prof_to_teacher_id', {})
+        self.profs = [Prof(p, nom, prof_to_teacher_id.get(nom)) for p, nom in enumerate(d['profs'])]
+
+        noms_groupes = dict.fromkeys(d['map_groupe_cours'])
+        for c in d['cours']:
+            noms_groupes.update(dict.fromkeys(c['groups']))
+        self.groupes = [self._groupe(d, g, nom) for g, nom in enumerate(noms_groupes)]
+        self.index_groupes = {g.nom: g.index for g in self.groupes}
+
+        self.cours = [self._cours(d, i, c) for i, c in enumerate(d['cours'])]
+        self.index_cours = {c.id: c.index for c in self.cours}
+
+        # Tableaux NumPy : recalculés, ou repris tels quels d'un snapshot (week_snapshot.py, mmap possible)
+        tableaux = tableaux if tableaux is not None else self._calculer_tableaux(d)
+        for nom in TABLEAUX:
+            setattr(self, nom, tableaux[nom])
+        self.cours_groupes = (self.cours_groupes_indptr, self.cours_groupes_indices)
+        self.cours_profs = (self.cours_profs_indptr, self.cours_profs_indices)
+        self.cours_salles = (self.cours_salles_indptr, self.cours_salles_indices)
+
+    @staticmethod
+    def _groupe(d: Dict[str, Any], g: int, nom: str) -> Groupe:
+        return Groupe(g, nom, int(d['taille_groupes'].get(nom, 0)), d.get('group_to_dispo_key', {}).get(nom))
+
+    @staticmethod
+    def _cours(d: Dict[str, Any], i: int, c: Dict[str, Any]) -> Cours:
+        cid = c['id']
+        typ, matiere = recup_cours(cid)
+        return Cours(i, cid, typ, matiere, signature_cours(cid), recup_id_slot_from_str_to_int(cid),
+                     d['duree_cours'][cid], int(d['taille_groupes'].get(c['groups'][0], 0)))
+
+    def _calculer_tableaux(self, d: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        tableaux = {
+            "durees": np.array([c.duree for c in self.cours], dtype=np.int16),
+            "tailles": np.array([c.taille for c in self.cours], dtype=np.int32),
+            "slot_ids": np.array([c.slot_id for c in self.cours], dtype=np.int64),
+            "capacites": np.array([s.capacite for s in self.salles], dtype=np.int32),
+        }
+        adjacences = {
+            "cours_groupes": [[self.index_groupes[g] for g in c['groups']] for c in d['cours']],
+            "cours_profs": [c.get('allowed_prof_indices') or [] for c in d['cours']],
+            "cours_salles": [c.get('allowed_room_indices') or [] for c in d['cours']],
+        }
+        for nom, listes in adjacences.items():
+            tableaux[f"{nom}_indptr"], tableaux[f"{nom}_indices"] = _csr(listes)
+
+        tableaux["dispo_profs"], tableaux["dispo_declaree_profs"] = self._bitmaps(
+            [p.teacher_id for p in self.profs], d.get('disponibilites_profs', {}))
+        tableaux["dispo_salles"], tableaux["dispo_declaree_salles"] = self._bitmaps(
+            [s.id for s in self.salles], d.get('disponibilites_salles', {}))
+        tableaux["dispo_groupes"], tableaux["dispo_declaree_groupes"] = self._bitmaps(
+            [g.dispo_key for g in self.groupes], d.get('disponibilites_groupes', {}))
+        obligations = d.get('obligations_slots', {})
+        tableaux["a_obligation"] = np.array([c.slot_id in obligations for c in self.cours], dtype=bool)
+        return tableaux
+
+    def tableaux(self) -> Dict[str, np.ndarray]:
+        """Tous les tableaux NumPy du bundle, par nom (ce qu'un snapshot enregistre)."""
+        return {nom: getattr(self, nom) for nom in TABLEAUX}
+
+    def _bitmaps(self, cles: list, plages: Dict[Any, dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """Matrice (entité × slot) des créneaux couverts par une plage ; une entité sans plage reste disponible partout."""
+        bitmap = np.ones((len(cles), self.nb_slots), dtype=bool)
+        declaree = np.zeros(len(cles), dtype=bool)
+        for i, cle in enumerate(cles):
+            if cle is not None and cle in plages:
+                declaree[i] = self._remplir_ligne(bitmap[i], plages[cle])
+        return bitmap, declaree
+
+    def _remplir_ligne(self, ligne: np.ndarray, plages_par_jour: Optional[dict]) -> bool:
+        """Écrit dans ligne les créneaux couverts par plages_par_jour (None : disponible partout) ; renvoie declaree."""
+        ligne[:] = plages_par_jour is None
+        for jour, intervalles in (plages_par_jour or {}).items():
+            base = jour * self.creneaux_par_jour
+            for debut, fin in intervalles:
+                ligne[base + debut: base + fin] = True
+        return plages_par_jour is not None
+
+    def _modifiable(self, nom: str) -> np.ndarray:
+        """Le tableau nom, copié s'il est en lecture seule (relu en mmap depuis un snapshot)."""
+        tableau = getattr(self, nom)
+        if not tableau.flags.writeable:
+            tableau = np.array(tableau)
+            setattr(self, nom, tableau)
+        return tableau
+
+    # ------------------------------------------------------------------
+    # Mises à jour sur place (IncrementalTimetableModel)
+    # ------------------------------------------------------------------
+    def maj_disponibilites(self, famille: str, cle, plages_par_jour: Optional[dict]) -> List[int]:
+        """Réécrit les lignes de bitmap de la ressource (None : plus aucune restriction) ; renvoie les lignes touchées."""
+        nom = {'prof': 'profs', 'salle': 'salles', 'groupe': 'groupes'}[famille]
+        bitmap, declaree = self._modifiable(f"dispo_{nom}"), self._modifiable(f"dispo_declaree_{nom}")
+        lignes = self.lignes_ressource(famille, cle)
+        for i in lignes:
+            declaree[i] = self._remplir_ligne(bitmap[i], plages_par_jour)
+        return lignes
+
+    def maj_capacite(self, salle_id, capacite: int):
+        r = self.index_salles[salle_id]
+        self.salles[r] = replace(self.salles[r], capacite=int(capacite))
+        self._modifiable("capacites")[r] = capacite
+
+    def ajouter_cours(self, d: Dict[str, Any], c: Dict[str, Any]) -> Cours:
+        """
+        Ajoute un cours déjà inscrit dans d (cours, duree_cours, taille_groupes) : ses groupes inconnus
+        reçoivent une ligne de bitmap, les tailles de ses groupes sont relues dans d['taille_groupes'].
+        """
+        dispos_groupes = d.get('disponibilites_groupes', {})
+        for nom in c['groups']:
+            if nom in self.index_groupes:
+                g = self.index_groupes[nom]
+                self.groupes[g] = replace(self.groupes[g], taille=int(d['taille_groupes'].get(nom, 0)))
+                continue
+            groupe = self._groupe(d, len(self.groupes), nom)
+            self.groupes.append(groupe)
+            self.index_groupes[nom] = groupe.index
+            ligne = np.ones(self.nb_slots, dtype=bool)
+            declaree = groupe.dispo_key is not None and groupe.dispo_key in dispos_groupes
+            if declaree:
+                self._remplir_ligne(ligne, dispos_groupes[groupe.dispo_key])
+            self.dispo_groupes = np.vstack([self.dispo_groupes, ligne])
+            self.dispo_declaree_groupes = np.append(self.dispo_declaree_groupes, declaree)
+
+        cours = self._cours(d, len(self.cours), c)
+        self.cours.append(cours)
+        self.index_cours[cours.id] = cours.index
+        self.durees = np.append(self.durees, np.int16(cours.duree))
+        self.tailles = np.append(self.tailles, np.int32(cours.taille))
+        self.slot_ids = np.append(self.slot_ids, np.int64(cours.slot_id))
+        self.a_obligation = np.append(self.a_obligation, cours.slot_id in d.get('obligations_slots', {}))
+        adjacences = {
+            "cours_groupes": [self.index_groupes[g] for g in c['groups']],
+            "cours_profs": c.get('allowed_prof_indices') or [],
+            "cours_salles": c.get('allowed_room_indices') or [],
+        }
+        for nom, voisins in adjacences.items():
+            indptr, indices = getattr(self, f"{nom}_indptr"), getattr(self, f"{nom}_indices")
+            setattr(self, f"{nom}_indptr", np.append(indptr, np.int32(indptr[-1] + len(voisins))))
+            setattr(self, f"{nom}_indices", np.append(indices, np.asarray(voisins, dtype=np.int32)))
+        self.cours_groupes = (self.cours_groupes_indptr, self.cours_groupes_indices)
+        self.cours_profs = (self.cours_profs_indptr, self.cours_profs_indices)
+        self.cours_salles = (self.cours_salles_indptr, self.cours_salles_indices)
+
+        # Taille d'un cours = taille de son premier groupe, qui a pu changer
+        premiers = self.cours_groupes_indices[self.cours_groupes_indptr[:-1]]
+        tailles = np.array([g.taille for g in self.groupes], dtype=np.int32)[premiers]
+        for i in np.flatnonzero(tailles != self.tailles):
+            self.cours[i] = replace(self.cours[i], taille=int(tailles[i]))
+        self.tailles = tailles
+        return cours
+
+    @staticmethod
+    def voisins(csr: Tuple[np.ndarray, np.ndarray], i: int) -> np.ndarray:
+        indptr, indices = csr
+        return indices[indptr[i]:indptr[i + 1]]
+
+    def groupes_du_cours(self, i: int) -> np.ndarray:
+        return self.voisins(self.cours_groupes, i)
+
+    def profs_du_cours(self, i: int) -> np.ndarray:
+        """Profs autorisés ; vide si le cours n'en restreint aucun."""
+        return self.voisins(self.cours_profs, i)
+
+    def salles_du_cours(self, i: int) -> np.ndarray:
+        """Salles imposées (teachings_rooms) ; vide si toutes les salles sont candidates."""
+        return self.voisins(self.cours_salles, i)
+
+    def cours_par_id(self, cid: str) -> Cours:
+        return self.cours[self.index_cours[cid]]
+
+    def lignes_ressource(self, famille: str, cle) -> List[int]:
+        """
+        Indices des entités (lignes des bitmaps) dont les plages sont rangées sous cle dans les données :
+        teacher_id pour un prof, id de salle, clé de disponibilites_groupes pour un groupe.
+        """
+        if famille == 'prof':
+            return [p.index for p in self.profs if p.teacher_id == cle]
+        if famille == 'salle':
+            return [self.index_salles[cle]] if cle in self.index_salles else []
+        return [g.index for g in self.groupes if g.dispo_key == cle]
+
+
+def probleme_de(d: Dict[str, Any]) -> ProblemBundle:
+    """Le ProblemBundle joint aux données par load_and_prepare_data, construit ici s'il manque."""
+    probleme = d.get('probleme')
+    return probleme if probleme is not None else ProblemBundle(d)
@@ -0,0 +1,167 @@
+# ==============================================================================
+# SOLUTIONS INTERMÉDIAIRES : publication de chaque solution améliorante pendant solve()
+# ==============================================================================
+import json
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+from ortools.sat.python import cp_model
+
+from solution_visualizer import extraire_affectations
+
+
+class _ReponseCourante:
+    """Expose Values / BooleanValues (comme CpSolver) sur la solution courante du callback, pour extraire_affectations."""
+
+    def __init__(self, solution: np.ndarray):
+        self.solution = solution
+
+    def Values(self, variables) -> pd.Series:
+        return pd.Series(self.solution[[v.Index() for v in variables]])
+
+    def BooleanValues(self, variables) -> pd.Series:
+        return self.Values(variables).astype(bool)
+
+
+class SolutionPublisher(cp_model.CpSolverSolutionCallback):
+    """
+    Callback CP-SAT : à chaque solution améliorante, construit un événement
+    {numero, objectif, borne, secondes, affectations} et le transmet aux écouteurs.
+    Un écouteur qui renvoie True arrête la recherche (qualité jugée suffisante).
+    """
+
+    def __init__(self, variables: Dict[str, Any], data: Dict[str, Any], ecouteurs: List["EcouteurSolution"]):
+        super().__init__()
+        self.variables = variables
+        self.data = data
+        self.ecouteurs = ecouteurs
+        self.nb_solutions = 0
+
+    def on_solution_callback(self):
+        self.nb_solutions += 1
+        reponse = _ReponseCourante(np.asarray(self.Response().solution))
+        evenement = {
+            "numero": self.nb_solutions,
+            "objectif": self.ObjectiveValue(),
+            "borne": self.BestObjectiveBound(),
+            "secondes": self.WallTime(),
+            "affectations": extraire_affectations(reponse, self.variables, self.data),
+        }
+        arret = False
+        for ecouteur in self.ecouteurs:
+            arret = bool(ecouteur.publier(evenement)) or arret
+        if arret:
+            print(f"   -> Arrêt demandé après la solution {self.nb_solutions} (objectif {evenement['objectif']:,.0f})")
+            self.StopSearch()
+
+    def terminer(self):
+        """Fin de solve() : prévient chaque écouteur, une fois le solveur rendu."""
+        for ecouteur in self.ecouteurs:
+            ecouteur.terminer()
+
+
+class EcouteurSolution(ABC):
+    """Reçoit chaque solution améliorante ; renvoyer True demande l'arrêt de la recherche."""
+
+    @abstractmethod
+    def publier(self, evenement: Dict[str, Any]) -> Optional[bool]:
+        ...
+
+    def terminer(self):
+        """Appelé une fois la résolution finie (quel que soit le statut) ; rien à faire par défaut."""
+
+
+class EcouteurConsole(EcouteurSolution):
+    def publier(self, evenement):
+        print(f"   -> Solution {evenement['numero']} à {evenement['secondes']:.1f} s : "
+              f"objectif {evenement['objectif']:,.0f} (borne {evenement['borne']:,.0f}), "
+              f"{len(evenement['affectations'])} cours placés")
+
+
+class EcouteurJsonLines(EcouteurSolution):
+    """Ajoute une ligne JSON par solution : objectif, borne, temps et table compacte (cours, slot, salle, prof)."""
+
+    def __init__(self, chemin: str):
+        self.chemin = chemin
+
+    def publier(self, evenement):
+        affectations = evenement['affectations']
+        ligne = {
+            "numero": evenement['numero'],
+            "objectif": evenement['objectif'],
+            "borne": evenement['borne'],
+            "secondes": round(evenement['secondes'], 3),
+            "affectations": [[a.cours, int(a.slot), a.salle, a.prof]
+                             for a in affectations[["cours", "slot", "salle", "prof"]].itertuples(index=False)],
+        }
+        with open(self.chemin, "a", encoding="utf-8") as f:
+            f.write(json.dumps(ligne, ensure_ascii=False, default=str) + "\n")
+
+
+class EcouteurBrouillonBDD(EcouteurSolution):
+    """
+    Enregistre la solution courante dans edt_slot en brouillon (is_draft = 1), au plus une fois toutes
+    les intervalle_min secondes : un emploi du temps utilisable est consultable pendant la résolution.
+    Les écritures sont faites par un thread à part, le callback du solveur ne fait que les mettre en file ;
+    la dernière solution sautée par l'intervalle est écrite à la fin de la résolution (terminer).
+    """
+
+    def __init__(self, fournisseur, intervalle_min: float = 5.0):
+        self.fournisseur = fournisseur  # DataProviderID
+        self.intervalle_min = intervalle_min
+        self._derniere_ecriture = None
+        self._sautee = None  # affectations de la dernière solution non écrite
+        self._file = queue.Queue()
+        self._thread = None
+
+    def publier(self, evenement):
+        maintenant = time.perf_counter()
+        if self._derniere_ecriture is not None and maintenant - self._derniere_ecriture < self.intervalle_min:
+            self._sautee = evenement['affectations']
+            return
+        self._derniere_ecriture = maintenant
+        self._sautee = None
+        self._mettre_en_file(evenement['affectations'])
+
+    def terminer(self):
+        if self._sautee is not None:
+            self._mettre_en_file(self._sautee)
+            self._sautee = None
+        if self._thread is not None:
+            self._file.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _mettre_en_file(self, affectations):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._ecrire, name="brouillon-edt", daemon=True)
+            self._thread.start()
+        self._file.put(affectations)
+
+    def _ecrire(self):
+        while (affectations := self._file.get()) is not None:
+            try:
+                self.fournisseur.upsert_draft_affectations(affectations)
+            except Exception as e:
+                print(f"❌ Erreur lors de l'enregistrement du brouillon : {e}")
+
+
+class ArretSurQualite(EcouteurSolution):
+    """Arrête la recherche dès que l'objectif atteint objectif_cible ou que l'écart relatif à la borne passe sous gap_relatif."""
+
+    def __init__(self, objectif_cible: Optional[float] = None, gap_relatif: Optional[float] = None):
+        self.objectif_cible = objectif_cible
+        self.gap_relatif = gap_relatif
+
+    def publier(self, evenement):
+        objectif, borne = evenement['objectif'], evenement['borne']
+        if self.objectif_cible is not None and objectif <= self.objectif_cible:
+            return True
+        if self.gap_relatif is not None:
+            return abs(objectif - borne) <= self.gap_relatif * max(abs(objectif), 1)
+        return False
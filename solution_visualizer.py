@@ -1,19 +1,90 @@
 from typing import Dict, Any
 
+import numpy as np
+import pandas as pd
+
 from Front import schedule_generator as sg
 
 
+COLONNES_AFFECTATIONS = ["cours", "jour", "offset", "slot", "duree", "heure_debut",
+                         "salle_idx", "salle", "prof_idx", "prof"]
+
+
+def slot_to_time(t: int) -> str:
+    h, m = 8 + (t // 2), 30 * (t % 2)
+    h_end, m_end = 8 + ((t + 1) // 2), 30 * ((t + 1) % 2)
+    return f"{h:02d}:{m:02d}-{h_end:02d}:{m_end:02d}"
+
+
+def extraire_affectations(solver, variables: Dict[str, Any], data: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Lit la solution en quelques appels vectorisés (Values / BooleanValues) sur les index par cours
+    du modèle et renvoie la table des affectations : une ligne par cours placé
+    (cours, jour, offset, slot, duree, heure_debut, salle_idx, salle, prof_idx, prof).
+    """
+    cours_ids = [c['id'] for c in data['cours'] if c['id'] in variables['debut']]
+    if not cours_ids:
+        return pd.DataFrame(columns=COLONNES_AFFECTATIONS)
+    # Le début entier existe dans les deux encodages (booléen et entier) du modèle
+    slots = solver.Values([variables['debut'][cid] for cid in cours_ids]).to_numpy()
+
+    def choix(famille: str) -> np.ndarray:
+        # Toutes les variables d'affectation de la famille en un seul vecteur, puis l'indice retenu par cours
+        proprietaires, indices, bools = [], [], []
+        for i, cid in enumerate(cours_ids):
+            for idx, var in variables[famille].get(cid, {}).items():
+                proprietaires.append(i)
+                indices.append(idx)
+                bools.append(var)
+        retenus = np.full(len(cours_ids), -1, dtype=np.int64)
+        if bools:
+            actifs = solver.BooleanValues(bools).to_numpy(dtype=bool)
+            retenus[np.asarray(proprietaires)[actifs]] = np.asarray(indices)[actifs]
+        return retenus
+
+    salles_idx, profs_idx = choix('y_salle'), choix('z_prof')
+    cpj = data['creneaux_par_jour']
+    salle_ids = list(data['salles'].keys())
+    table = pd.DataFrame({
+        "cours": cours_ids,
+        "jour": slots // cpj,
+        "offset": slots % cpj,
+        "slot": slots,
+        "duree": [data['duree_cours'][cid] for cid in cours_ids],
+        "salle_idx": salles_idx,
+        "prof_idx": profs_idx,
+    })
+    # Un cours sans salle ou sans prof retenu n'est pas placé ; un cours sans prof autorisé n'en a pas (-1)
+    sans_prof = np.array([not variables['z_prof'].get(cid) for cid in cours_ids], dtype=bool)
+    table = table[(table["salle_idx"] >= 0) & ((table["prof_idx"] >= 0) | sans_prof)]
+    table = table.assign(
+        heure_debut=[slot_to_time(o).split('-')[0] for o in table["offset"]],
+        salle=[salle_ids[r] for r in table["salle_idx"]],
+        prof=[data['profs'][p] if p >= 0 else None for p in table["prof_idx"]],
+    )
+    return table[COLONNES_AFFECTATIONS].sort_values(["slot", "cours"]).reset_index(drop=True)
+
+
 # ==============================================================================
 # CLASSE 3: AFFICHAGE DES RÉSULTATS (SolutionVisualizer)
 # ==============================================================================
 class SolutionVisualizer:
     def __init__(self, solution: Dict[str, Any], data: Dict[str, Any]):
-        self.temp = []
         self.solver = solution['solver']
         self._vars = solution['vars']
         self.data = data
+        self.affectations = extraire_affectations(self.solver, self._vars, data)
         self.planning = self._build_planning_from_solution()
 
+    @classmethod
+    def depuis_affectations(cls, affectations: pd.DataFrame, data: Dict[str, Any]) -> "SolutionVisualizer":
+        """Construit l'affichage à partir d'une table d'affectations déjà extraite (sans solveur)."""
+        visualizer = cls.__new__(cls)
+        visualizer.solver, visualizer._vars, visualizer.data = None, {}, data
+        visualizer.affectations = affectations
+        visualizer.planning = visualizer._build_planning_from_solution()
+        return visualizer
+
     def display(self,DataProviderInsert,week_id):
         print("\n4. Affichage de la solution trouvée :")
         self._print_schedule_to_console()
@@ -22,20 +93,11 @@ class SolutionVisualizer:
         self._generate_graphical_schedule(DataProviderInsert,week_id)
 
     def _build_planning_from_solution(self):
-        planning, self.actual_starts = {s: [] for s in range(self.data['nb_slots'])}, {}
-        for c in self.data['cours']:
-            cid = c['id']
-            s_idx = next((s for s, v in self._vars['start'].items() if
-                          v is not None and v.Name().startswith(f"start_{cid}") and self.solver.Value(v)), (None, None))[1]
-            r_idx = next((r for r, v in self._vars['y_salle'].items() if
-                          v.Name().startswith(f"y_salle_{cid}") and self.solver.Value(v)), (None, None))[1]
-            p_idx = next((p for p, v in self._vars['z_prof'].items() if
-                          v.Name().startswith(f"z_prof_{cid}") and self.solver.Value(v)), (None, None))[1]
-            if s_idx is not None and r_idx is not None and p_idx is not None:
-                self.actual_starts[cid] = s_idx
-                salle_str, prof_str = list(self.data['salles'].keys())[r_idx], self.data['profs'][p_idx]
-                for offset in range(self.data['duree_cours'][cid]):
-                    planning[s_idx + offset].append((cid, salle_str, prof_str))
+        planning = {s: [] for s in range(self.data['nb_slots'])}
+        self.actual_starts = dict(zip(self.affectations["cours"], self.affectations["slot"].tolist()))
+        for a in self.affectations.itertuples(index=False):
+            for offset in range(a.duree):
+                planning[a.slot + offset].append((a.cours, a.salle, a.prof))
         return planning
 
     def _check_violations(self):
@@ -49,17 +111,9 @@ class SolutionVisualizer:
         print("---------------------------------")
 
     def _print_schedule_to_console(self):
-        def slot_to_time(t: int):
-            h, m = 8 + (t // 2), 30 * (t % 2)
-            h_end, m_end = 8 + ((t + 1) // 2), 30 * ((t + 1) % 2)
-            return f"{h:02d}:{m:02d}-{h_end:02d}:{m_end:02d}"
-        self.temp = []  # Liste qui contiendra tous les cours avec infos et durée
-
         for d_idx in range(self.data['jours']):
             print(f"\n=== Day {d_idx + 1} ===")
 
-            cours_en_cours = {}
-
             for t_in_day in range(self.data['creneaux_par_jour']):
                 global_t = d_idx * self.data['creneaux_par_jour'] + t_in_day
 
@@ -68,27 +122,8 @@ class SolutionVisualizer:
 
                 if entries:
                     for (cid, room_str, teacher_str) in entries:
-                        if self.actual_starts.get(cid) == global_t:
-                            print(f"  {time_str} : {cid} (Room: {room_str}, Teacher: {teacher_str}) Début")
-
-                            dict_infos_schedule_gen = {
-                                "day": d_idx,
-                                "start_hour": time_str.split('-')[0],
-                                "duration": 1,
-                                "name": cid,
-                                "teacher": teacher_str,
-                                "room": room_str,
-                                "course_type": None,
-                                "course_group": None
-                            }
-                            cours_en_cours[cid] = dict_infos_schedule_gen
-
-                        else:
-                            print(f"  {time_str} : {cid} (Room: {room_str}, Teacher: {teacher_str})")
-                            cours_en_cours[cid]["duration"] += 1
-                    for cours_dict in cours_en_cours.values():
-                        if cours_dict not in self.temp:
-                            self.temp.append(cours_dict)
+                        debut = " Début" if self.actual_starts.get(cid) == global_t else ""
+                        print(f"  {time_str} : {cid} (Room: {room_str}, Teacher: {teacher_str}){debut}")
                 else:
                     if not self.data['fenetre_midi'] or t_in_day not in self.data['fenetre_midi']:
                         print(f"  {time_str} : --")
@@ -102,8 +137,8 @@ class SolutionVisualizer:
         try:
             t: Dict[str, Dict[str, list]] = {"A1": {"groupes": ["G1", "G2", "G3","G1A", "G2A", "G3A","G1B", "G2B", "G3B"]}}
             list_room=DataProviderInsert.get_list_room()
-            DataProviderInsert.convert_courses_dict_to_list_insert(self.temp)
-            courses_list_B1,courses_list_B2,courses_list_B3 = convert_courses_dict_to_list_room_name(self.temp,list_room)
+            DataProviderInsert.convert_affectations_to_insert(self.affectations)
+            courses_list_B1,courses_list_B2,courses_list_B3 = convert_affectations_to_list_room_name(self.affectations,list_room)
             sg.generate_schedule("A1", week_id, t["A1"]["groupes"],courses_list_B1 )
             t = {"A2": {"groupes": ["G4", "G5","G4A", "G5A","G4B", "G5B"]}}
             sg.generate_schedule("A2", week_id, t["A2"]["groupes"], courses_list_B2)
@@ -128,23 +163,23 @@ GROUPE_TO_LIST = {
     # BUT3 → tout le reste
 }
 
-def convert_courses_dict_to_list_room_name(courses_dict_list,list_room):
+def convert_affectations_to_list_room_name(affectations,list_room):
     jours = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi", "Dimanche"]
     B1, B2, B3 = [], [], []
 
-    for c in courses_dict_list:
-        name = c['name']
-        day_name = jours[c['day']]
+    for c in affectations.itertuples(index=False):
+        name = c.cours
+        day_name = jours[c.jour]
         groupe = name.split('_')[-2] if '_' in name else "UNKNOWN"
         target = GROUPE_TO_LIST.get(groupe, "B3")  # défaut = BUT3
 
         tuple_cours = (
             day_name,
-            c['start_hour'],
-            c['duration'],
+            c.heure_debut,
+            c.duree,
             name.split('_')[1],
-            c['teacher'],
-            list_room[c['room']-1],
+            c.prof,
+            list_room[c.salle-1],
             name.split('_')[0],  # type
             groupe_to_indices(groupe)
         )
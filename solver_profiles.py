@@ -0,0 +1,60 @@
+# ==============================================================================
+# PROFILS DE RÉSOLUTION (paramètres CP-SAT nommés + surcharges)
+# ==============================================================================
+import os
+from typing import Dict, Any
+
+from ortools.sat.python import cp_model
+
+# Paramètres CP-SAT qu'un profil peut fixer (noms identiques à ceux de solver.parameters)
+PARAMETRES_PROFIL = (
+    "num_workers",  # None → os.cpu_count()
+    "max_time_in_seconds",
+    "max_deterministic_time",  # limite reproductible, indépendante de la charge de la machine
+    "relative_gap_limit",  # arrêt dès que |objectif - borne| / |objectif| <= gap
+    "absolute_gap_limit",
+    "random_seed",
+    "log_search_progress",
+    "linearization_level",  # 0, 1 ou 2
+    "symmetry_level",  # 0 à 4
+    "cp_model_presolve",
+    "optimize_with_core",
+    "repair_hint",  # démarrage à chaud : cherche à réparer une solution indiquée incomplète ou infaisable
+    "fix_variables_to_their_hinted_value",  # démarrage à chaud : fige toutes les variables indiquées
+)
+
+PROFILS_SOLVEUR = {
+    # Comportement historique de solve() : 10 minutes, tous les cœurs
+    "defaut": {"max_time_in_seconds": 600},
+    # Première solution correcte rapidement, quitte à sacrifier l'optimalité
+    "rapide": {"max_time_in_seconds": 60, "relative_gap_limit": 0.05, "linearization_level": 0},
+    # Machines de résolution dédiées : plus de temps et de raisonnement
+    "qualite": {"max_time_in_seconds": 1800, "linearization_level": 2, "symmetry_level": 4},
+    # Runner partagé : peu de cœurs, limite déterministe et graine fixe → résultat reproductible
+    "ci": {"num_workers": 2, "max_time_in_seconds": None, "max_deterministic_time": 60, "random_seed": 0},
+}
+
+
+def construire_profil(nom: str = "defaut", **surcharges) -> Dict[str, Any]:
+    """Renvoie les paramètres du profil nommé, complétés/écrasés par les surcharges (None = ignoré)."""
+    if nom not in PROFILS_SOLVEUR:
+        raise ValueError(f"Profil de résolution inconnu : {nom} (attendu : {', '.join(PROFILS_SOLVEUR)})")
+    inconnus = set(surcharges) - set(PARAMETRES_PROFIL)
+    if inconnus:
+        raise ValueError(f"Paramètre(s) de résolution inconnu(s) : {', '.join(sorted(inconnus))}")
+    profil = {"num_workers": None, **PROFILS_SOLVEUR[nom]}
+    profil.update({cle: valeur for cle, valeur in surcharges.items() if valeur is not None})
+    if profil["num_workers"] is None:
+        profil["num_workers"] = os.cpu_count() or 1
+    return profil
+
+
+def appliquer_profil(solver: cp_model.CpSolver, profil: Dict[str, Any]) -> cp_model.CpSolver:
+    for cle, valeur in profil.items():
+        if valeur is not None:
+            setattr(solver.parameters, cle, valeur)
+    return solver
+
+
+def decrire_profil(profil: Dict[str, Any]) -> str:
+    return ", ".join(f"{cle}={valeur}" for cle, valeur in profil.items() if valeur is not None)
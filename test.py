@@ -26,10 +26,17 @@ import sys
 from ortools.sat.python import cp_model
 
 import diagnose
-from data_provider import DataProvider
+from decomposition import resoudre_par_promotion
+from lns import LNSDriver
+from connect_database import get_db_config
 from data_provider_id import DataProviderID
+from data_sources import source_depuis_argument
+from solution_listeners import EcouteurConsole, EcouteurJsonLines, EcouteurBrouillonBDD, ArretSurQualite
 from solution_visualizer import SolutionVisualizer
-from time_table_model import TimetableModel
+from solver_profiles import PROFILS_SOLVEUR, construire_profil, appliquer_profil
+from time_table_model import TimetableModel, ENCODAGES, ENCODAGE_BOOLEEN
+from warm_start import associer_affectations_precedentes
+from week_snapshot import exporter_npz
 
 
 
@@ -45,10 +52,8 @@ def test_combination(model_class, data, disabled_blocks, timeout=60):
     scheduler = model_class(data)
     scheduler.build_model(disable_blocks=disabled_blocks)
 
-    solver = cp_model.CpSolver()
-    solver.parameters.max_time_in_seconds = timeout
-    solver.parameters.num_search_workers = 8
-    solver.parameters.log_search_progress = False
+    solver = appliquer_profil(cp_model.CpSolver(), construire_profil(
+        "defaut", max_time_in_seconds=timeout, log_search_progress=False))
 
     status = solver.Solve(scheduler.model)
 
@@ -116,34 +121,118 @@ def diagnostic_automatique(model_class, data, timeout_per_test=60):
 # ==============================================================================
 if __name__ == "__main__":
     start_time = time.perf_counter()
-    #DB_CONFIG = {
-    #    'host': '127.0.0.1', 'database': 'edt_app',
-    #    'user': 'edt_user', 'password': 'userpassword', 'port': 33066
-    #}
     parser = argparse.ArgumentParser(description="Exemple d'entrée en ligne de commande")
     parser.add_argument("--id_semaine", type=int, required=True, help="Un entier en entrée correspondant à la semaine à générer")
+    parser.add_argument("--encodage", choices=ENCODAGES, default=ENCODAGE_BOOLEEN,
+                        help="Encodage des débuts de cours : un booléen par créneau ou un entier par cours")
+    # Profil de résolution : compromis qualité / latence, chaque option surcharge le profil choisi
+    parser.add_argument("--profil", choices=list(PROFILS_SOLVEUR), default="defaut",
+                        help="Profil de résolution nommé (voir solver_profiles.py)")
+    parser.add_argument("--workers", type=int, help="Nombre de workers CP-SAT (défaut : nombre de cœurs)")
+    parser.add_argument("--temps-max", type=float, help="Limite de temps en secondes (défaut : 300, ou celle du profil)")
+    parser.add_argument("--temps-deterministe", type=float, help="Limite de temps déterministe (reproductible)")
+    parser.add_argument("--gap-relatif", type=float, help="Arrêt dès que l'écart relatif à la borne est atteint")
+    parser.add_argument("--gap-absolu", type=float, help="Arrêt dès que l'écart absolu à la borne est atteint")
+    parser.add_argument("--graine", type=int, help="Graine aléatoire du solveur")
+    parser.add_argument("--log", action="store_true", default=None, help="Affiche la progression de la recherche")
+    parser.add_argument("--linearisation", type=int, choices=[0, 1, 2], help="linearization_level CP-SAT")
+    parser.add_argument("--symetrie", type=int, choices=[0, 1, 2, 3, 4], help="symmetry_level CP-SAT")
+    # Démarrage à chaud depuis edt_slot (exécution précédente de la même semaine ou d'une autre semaine)
+    parser.add_argument("--warm-start", action="store_true",
+                        help="Part de l'emploi du temps déjà enregistré dans edt_slot (AddHint)")
+    parser.add_argument("--semaine-source", type=int,
+                        help="Semaine dont l'emploi du temps sert de point de départ (défaut : --id_semaine)")
+    parser.add_argument("--fixer-inchanges", action="store_true",
+                        help="Avec --warm-start : fige les cours inchangés à leur début et salle précédents")
+    parser.add_argument("--fixer-indices", action="store_true", default=None,
+                        help="Avec --warm-start : fige toutes les variables indiquées (fix_variables_to_their_hinted_value)")
+    # Décomposition : une partie par promotion, résolues en parallèle puis réparées sur les profs/salles partagés
+    parser.add_argument("--decomposition", action="store_true",
+                        help="Résout chaque promotion dans un processus séparé puis fusionne les solutions")
+    parser.add_argument("--processus", type=int, help="Avec --decomposition : nombre maximal de processus")
+    # Amélioration LNS après la première solution (interruptible par Ctrl+C)
+    parser.add_argument("--lns", type=float, metavar="SECONDES",
+                        help="Améliore la solution par recherche à grand voisinage pendant SECONDES")
+    parser.add_argument("--lns-iteration", type=float, default=10,
+                        help="Avec --lns : limite de temps de chaque sous-problème (secondes)")
+    # Solutions intermédiaires publiées pendant la résolution
+    parser.add_argument("--suivi", action="store_true", help="Affiche chaque solution améliorante")
+    parser.add_argument("--suivi-jsonl", metavar="FICHIER", help="Ajoute chaque solution améliorante au fichier JSON lines")
+    parser.add_argument("--brouillon", action="store_true",
+                        help="Enregistre chaque solution améliorante dans edt_slot en brouillon (is_draft)")
+    parser.add_argument("--objectif-cible", type=float, help="Arrête la recherche dès que l'objectif est atteint")
+    parser.add_argument("--cache", metavar="DOSSIER",
+                        help="Relit la semaine depuis son snapshot tant que les tables sources n'ont pas changé")
+    parser.add_argument("--source", default="mysql",
+                        help="mysql (défaut), sqlite (base en mémoire créée depuis Database/*.sql), "
+                             "ou un fichier .npz / dossier de snapshots pour travailler sans serveur")
+    parser.add_argument("--exporter", metavar="FICHIER.npz",
+                        help="Enregistre la semaine préparée dans un snapshot portable (relu avec --source)")
     argvs = parser.parse_args()
-
-    print("Vous avez fourni :", argvs.id_semaine)
-    DB_CONFIG = {
-        'host': '127.0.0.1', 'database': 'provisional_calendar',
-        'user': 'root', 'password': 'secret', 'port': 3306
+    temps_max = argvs.temps_max
+    if temps_max is None and argvs.profil == "defaut":
+        temps_max = 300
+    surcharges_solveur = {
+        "num_workers": argvs.workers,
+        "max_time_in_seconds": temps_max,
+        "max_deterministic_time": argvs.temps_deterministe,
+        "relative_gap_limit": argvs.gap_relatif,
+        "absolute_gap_limit": argvs.gap_absolu,
+        "random_seed": argvs.graine,
+        "log_search_progress": argvs.log,
+        "linearization_level": argvs.linearisation,
+        "symmetry_level": argvs.symetrie,
+        "fix_variables_to_their_hinted_value": argvs.fixer_indices,
     }
 
-    data_provider = DataProvider(DB_CONFIG)
-    #model_data = data_provider.load_and_prepare_data()
+    print("Vous avez fourni :", argvs.id_semaine)
+    # Connexion MySQL lue dans l'environnement / .env (connect_database) ; inutile hors ligne
+    DB_CONFIG = get_db_config() if argvs.source == "mysql" else None
 
-    DataProviderInsert = DataProviderID(DB_CONFIG)
+    DataProviderInsert = DataProviderID(DB_CONFIG, dossier_cache=argvs.cache,
+                                        source=source_depuis_argument(argvs.source, DB_CONFIG))
     model_data = DataProviderInsert.load_and_prepare_data(argvs.id_semaine)
-    scheduler = TimetableModel(model_data)
+    if argvs.exporter:
+        print(f"   -> Snapshot portable écrit : {exporter_npz(argvs.exporter, argvs.id_semaine, model_data)}")
+    if argvs.decomposition:
+        resultat = resoudre_par_promotion(model_data, encodage=argvs.encodage, profil=argvs.profil,
+                                          max_processus=argvs.processus, **surcharges_solveur)
+        if resultat['statut'] in ("OPTIMAL", "FEASIBLE"):
+            SolutionVisualizer.depuis_affectations(resultat['affectations'], model_data).display(
+                DataProviderInsert, argvs.id_semaine)
+        else:
+            print(f"\nÉchec de la décomposition ({resultat['statut']}) : {len(resultat['conflits'])} conflit(s) restant(s).")
+        print(f"Programme exécuté en : {time.perf_counter() - start_time: .5f} secondes")
+        sys.exit(0)
+    scheduler = TimetableModel(model_data, encodage=argvs.encodage)
     scheduler.build_model()
+    if argvs.suivi:
+        scheduler.ajouter_ecouteur(EcouteurConsole())
+    if argvs.suivi_jsonl:
+        scheduler.ajouter_ecouteur(EcouteurJsonLines(argvs.suivi_jsonl))
+    if argvs.brouillon:
+        scheduler.ajouter_ecouteur(EcouteurBrouillonBDD(DataProviderInsert))
+    if argvs.objectif_cible is not None:
+        scheduler.ajouter_ecouteur(ArretSurQualite(objectif_cible=argvs.objectif_cible))
+    if argvs.warm_start:
+        semaine_source = argvs.semaine_source if argvs.semaine_source is not None else argvs.id_semaine
+        affectations_precedentes = associer_affectations_precedentes(
+            DataProviderInsert.load_previous_assignment(semaine_source), model_data)
+        scheduler.ajouter_indices(affectations_precedentes, fixer_inchanges=argvs.fixer_inchanges)
 
     # Exemple d'appel:
     probs = diagnose.diagnose_feasibility(model_data)
-    solution = scheduler.solve(max_time_seconds=300)
+    solution = scheduler.solve(profil=argvs.profil, **surcharges_solveur)
     #print("solution",solution)
 
-    if solution and solution['vars']:
+    if solution and solution['vars'] and argvs.lns:
+        lns = LNSDriver(scheduler, graine=argvs.graine or 0)
+        lns.partir_de(solution)
+        lns.ameliorer(duree_totale=argvs.lns, temps_par_iteration=argvs.lns_iteration, profil=argvs.profil,
+                      **{k: v for k, v in surcharges_solveur.items() if k != "max_time_in_seconds"})
+        SolutionVisualizer.depuis_affectations(lns.affectations, model_data).display(DataProviderInsert, argvs.id_semaine)
+        print(f"Programme exécuté en : {time.perf_counter() - start_time: .5f} secondes")
+    elif solution and solution['vars']:
         visualizer = SolutionVisualizer(solution, model_data)
         visualizer.display(DataProviderInsert,argvs.id_semaine)
         end_time = time.perf_counter()
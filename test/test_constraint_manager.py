@@ -0,0 +1,90 @@
+import sqlite3
+
+import pytest
+
+from bouton.constraint_manager import ConstraintManager
+from data_sources import SourceSQLite
+
+SEMAINE = 140
+
+
+class CurseurMySQL:
+    """Curseur sqlite3 qui accepte les paramètres %s de mysql.connector."""
+
+    def __init__(self, curseur):
+        self.curseur = curseur
+
+    def execute(self, requete, params=()):
+        return self.curseur.execute(requete.replace("%s", "?"), params)
+
+    def executemany(self, requete, lignes):
+        return self.curseur.executemany(requete.replace("%s", "?"), lignes)
+
+    def fetchall(self):
+        return self.curseur.fetchall()
+
+    def close(self):
+        self.curseur.close()
+
+
+class ConnexionMySQL:
+    """La connexion de la base SQLite en mémoire, vue comme une connexion du pool (close() la garde ouverte)."""
+
+    def __init__(self, connexion):
+        self.connexion = connexion
+
+    def cursor(self):
+        return CurseurMySQL(self.connexion.cursor())
+
+    def commit(self):
+        self.connexion.commit()
+
+    def rollback(self):
+        self.connexion.rollback()
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def base():
+    source = SourceSQLite()
+    connexion = source.engine.raw_connection().driver_connection
+    connexion.create_function("NOW", 0, lambda: "2025-01-06 08:00:00")
+    return connexion
+
+
+@pytest.fixture
+def gestionnaire(base, monkeypatch):
+    manager = ConstraintManager()
+    manager.set_default_week(SEMAINE)
+    monkeypatch.setattr(manager, "_get_connection", lambda: ConnexionMySQL(base))
+    return manager
+
+
+def contraintes_profs(base):
+    return base.execute("SELECT teacher_id, day_of_week, week_id FROM teacher_constraints ORDER BY id").fetchall()
+
+
+@pytest.mark.integration
+def test_insertion_groupee(gestionnaire, base):
+    indisponibilites = [(1, "Lundi", "08:00", "10:00"), (2, "Mardi", "14:00", "16:00")]
+    assert gestionnaire.add_teacher_unavailabilities_bulk(indisponibilites) == 2
+    assert contraintes_profs(base) == [(1, "Lundi", SEMAINE), (2, "Mardi", SEMAINE)]
+
+
+@pytest.mark.integration
+def test_entite_inconnue_annule_tout(gestionnaire, base):
+    indisponibilites = [(1, "Lundi", "08:00", "10:00"), (99999, "Mardi", "14:00", "16:00")]
+    with pytest.raises(ValueError, match="99999"):
+        gestionnaire.add_teacher_unavailabilities_bulk(indisponibilites)
+    assert contraintes_profs(base) == []
+
+
+@pytest.mark.integration
+def test_erreur_en_cours_d_insertion_annule_tout(gestionnaire, base):
+    # La seconde ligne échoue dans l'executemany, après l'insertion de la première
+    indisponibilites = [(1, "Lundi", "08:00", "10:00"), (2, {"jour": "Mardi"}, "14:00", "16:00")]
+    with pytest.raises(sqlite3.Error):
+        gestionnaire.add_teacher_unavailabilities_bulk(indisponibilites)
+    assert contraintes_profs(base) == []
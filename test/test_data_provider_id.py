@@ -0,0 +1,22 @@
+import pytest
+
+from data_provider_id import DataProviderID
+from data_sources import SourceSQLite
+
+SEMAINE = 140
+
+
+@pytest.fixture(scope="module")
+def fournisseur():
+    return DataProviderID(source=SourceSQLite())
+
+
+@pytest.mark.integration
+def test_semaines_successives_ne_partagent_pas_les_profs_fictifs(fournisseur):
+    statique = fournisseur.load_static_data()
+    profs_statiques = list(statique['profs'])
+    premiere = fournisseur.load_and_prepare_data(SEMAINE, statique)
+    seconde = fournisseur.load_and_prepare_data(SEMAINE, statique)
+    # Les profs fictifs None_k d'une semaine ne fuient ni dans les données statiques ni dans la semaine suivante
+    assert statique['profs'] == profs_statiques
+    assert seconde['profs'] == premiere['profs']
@@ -0,0 +1,51 @@
+import pytest
+
+from data_provider_id import DataProviderID
+from data_sources import SourceSnapshot, SourceSQLite, source_depuis_argument
+from week_snapshot import exporter_npz
+
+SEMAINE = 140
+
+
+@pytest.fixture(scope="module")
+def semaine_sqlite():
+    return DataProviderID(source=SourceSQLite()).load_and_prepare_data(SEMAINE)
+
+
+def sans_probleme(d):
+    return {cle: v for cle, v in d.items() if cle != 'probleme'}
+
+
+@pytest.mark.integration
+def test_semaine_hors_ligne_depuis_un_npz(tmp_path, semaine_sqlite):
+    chemin = exporter_npz(str(tmp_path / "semaine.npz"), SEMAINE, semaine_sqlite)
+    fournisseur = DataProviderID(source=source_depuis_argument(chemin))
+
+    assert isinstance(fournisseur.source, SourceSnapshot)
+    assert sans_probleme(fournisseur.load_and_prepare_data(SEMAINE)) == sans_probleme(semaine_sqlite)
+
+
+@pytest.mark.integration
+def test_snapshot_d_une_autre_semaine_refuse(tmp_path, semaine_sqlite):
+    chemin = exporter_npz(str(tmp_path / "semaine.npz"), SEMAINE, semaine_sqlite)
+    source = SourceSnapshot(chemin)
+    with pytest.raises(ValueError):
+        source.semaine_preparee(SEMAINE + 1)
+    with pytest.raises(RuntimeError):
+        source.lire("SELECT 1")
+
+
+@pytest.mark.unit
+def test_snapshot_introuvable(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        source_depuis_argument(str(tmp_path / "absent.npz"))
+
+
+@pytest.mark.integration
+def test_cache_relu_a_l_identique(tmp_path, semaine_sqlite):
+    fournisseur = DataProviderID(source=SourceSQLite(), dossier_cache=str(tmp_path))
+    premiere = fournisseur.load_and_prepare_data(SEMAINE)  # écrit le snapshot
+    relue = fournisseur.load_and_prepare_data(SEMAINE)  # le relit : les tables n'ont pas changé
+
+    assert not relue['probleme'].dispo_profs.flags.writeable  # tableaux en mmap : venus du snapshot
+    assert sans_probleme(relue) == sans_probleme(premiere) == sans_probleme(semaine_sqlite)
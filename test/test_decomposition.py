@@ -0,0 +1,42 @@
+import pytest
+
+from benchmark_model import generer_semaine_synthetique
+from decomposition import partitionner_par_promotion, resoudre_par_promotion, verifier_fusion
+from time_table_model import ENCODAGE_ENTIER
+
+
+@pytest.fixture(scope="module")
+def semaine():
+    return generer_semaine_synthetique(60, graine=3)
+
+
+@pytest.fixture(scope="module")
+def resultat(semaine):
+    return resoudre_par_promotion(semaine, encodage=ENCODAGE_ENTIER, profil='rapide',
+                                  max_processus=1, num_workers=1, max_time_in_seconds=30)
+
+
+@pytest.mark.unit
+def test_parties_couvrent_chaque_cours_une_fois(semaine):
+    parties = partitionner_par_promotion(semaine)
+    ids = [cid for cours_ids in parties.values() for cid in cours_ids]
+    assert sorted(ids) == sorted(c['id'] for c in semaine['cours'])
+    assert len(parties) > 1
+
+
+@pytest.mark.unit
+def test_fusion_sans_conflit(semaine, resultat):
+    assert resultat['statut'] in ("OPTIMAL", "FEASIBLE")
+    assert resultat['conflits'] == []
+    assert set(resultat['affectations']['cours']) == {c['id'] for c in semaine['cours']}
+
+
+@pytest.mark.unit
+def test_verifier_fusion_detecte_un_prof_en_double(semaine, resultat):
+    affectations = resultat['affectations'].copy()
+    a, b = affectations[affectations['prof_idx'] >= 0].index[:2]
+    # Le second cours est déplacé sur le créneau et le prof du premier
+    affectations.loc[b, ['slot', 'prof_idx']] = affectations.loc[a, ['slot', 'prof_idx']].values
+    conflits = verifier_fusion(affectations, semaine)
+    assert any(nature == "prof" and {x, y} == set(affectations.loc[[a, b], 'cours'])
+               for nature, _, x, y in conflits)
@@ -0,0 +1,54 @@
+import pytest
+
+from benchmark_model import generer_semaine_synthetique
+from diagnose import presolve
+from legal_start_index import LegalStartIndex
+from problem_bundle import ProblemBundle
+
+
+def semaine_sans_disponibilites(nb_cours=10):
+    d = generer_semaine_synthetique(nb_cours, graine=0)
+    d['disponibilites_profs'], d['disponibilites_salles'] = {}, {}
+    return d
+
+
+def lancer_presolve(d):
+    index = LegalStartIndex(d, ProblemBundle(d))
+    salles = {c['id']: list(range(len(d['salles']))) for c in d['cours']}
+    profs = {c['id']: list(c['allowed_prof_indices']) for c in d['cours']}
+    return presolve(d, index, salles, profs), index
+
+
+@pytest.mark.unit
+def test_salle_jamais_disponible_retiree_de_chaque_cours():
+    d = semaine_sans_disponibilites()
+    d['disponibilites_salles'] = {16: {}}  # plages déclarées, aucune ouverte
+    resultat, index = lancer_presolve(d)
+
+    nb_cours = len(d['cours'])
+    salles, departs, profs = (resultat['familles'][f] for f in ('salles', 'departs', 'profs'))
+    assert salles['initial'] == salles['avant'] == nb_cours * len(d['salles'])
+    assert salles['apres'] == salles['avant'] - nb_cours
+    assert departs['initial'] == nb_cours * d['nb_slots']
+    assert departs['apres'] == departs['avant'] == sum(int(m.sum()) for m in index.departs_legaux.values())
+    assert profs['apres'] == profs['avant']
+    assert resultat['sans_domaine'] == []
+    assert all(len(restantes) == len(d['salles']) - 1 for restantes in resultat['salles'].values())
+
+
+@pytest.mark.unit
+def test_prof_unique_disponible_une_fois_force_le_depart():
+    d = semaine_sans_disponibilites()
+    cours = d['cours'][0]
+    duree = d['duree_cours'][cours['id']]
+    utilises = {p for c in d['cours'] for p in c['allowed_prof_indices']}
+    prof = next(p for p in range(len(d['profs'])) if p not in utilises)
+    cours['allowed_prof_indices'] = [prof]
+    # Le prof n'est là que le lundi, le temps d'un seul cours
+    d['disponibilites_profs'] = {d['prof_to_teacher_id'][d['profs'][prof]]: {0: [(0, duree)]}}
+    resultat, index = lancer_presolve(d)
+
+    assert index.departs_legaux[cours['id']].nonzero()[0].tolist() == [0]
+    assert cours['id'] in resultat['forces']['departs']
+    assert cours['id'] in resultat['forces']['profs']
+    assert resultat['profs'][cours['id']] == [prof]
@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+
+from function import indisponibilites_en_bitmaps, plages_disponibles
+
+CRENEAUX_PAR_JOUR = 23
+JOURNEE = [(0, CRENEAUX_PAR_JOUR)]
+COLONNES = ['teacher_id', 'day_of_week', 'start_time', 'end_time']
+
+
+def disponibilites(lignes, heures_en_timedelta=False):
+    df = pd.DataFrame(lignes, columns=COLONNES)
+    if heures_en_timedelta:
+        # TIME MySQL relu par pandas : timedelta, NaT pour un horaire NULL
+        for colonne in ('start_time', 'end_time'):
+            df[colonne] = pd.to_timedelta(df[colonne])
+    return plages_disponibles(*indisponibilites_en_bitmaps(df, 'teacher_id', CRENEAUX_PAR_JOUR))
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("heures_en_timedelta", [False, True])
+def test_journee_coupee_en_plusieurs_plages(heures_en_timedelta):
+    lignes = [(7, 'Lundi', '10:00:00', '11:00:00'), (7, 'Lundi', '14:00:00', '16:00:00')]
+    dispos = disponibilites(lignes, heures_en_timedelta)
+    assert dispos[7][0] == [(0, 4), (6, 12), (16, CRENEAUX_PAR_JOUR)]
+    assert all(dispos[7][jour] == JOURNEE for jour in range(1, 5))
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("heures_en_timedelta", [False, True])
+def test_ligne_sans_horaire_bloque_la_journee(heures_en_timedelta):
+    dispos = disponibilites([(3, 'Mardi', None, None)], heures_en_timedelta)
+    assert 1 not in dispos[3]
+    assert sorted(dispos[3]) == [0, 2, 3, 4]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("heures_en_timedelta", [False, True])
+def test_heure_avant_8h_ramenee_au_debut_de_journee(heures_en_timedelta):
+    # 07:30 est hors de la grille mais n'est pas un horaire vide : seuls 8h-9h sont bloqués
+    dispos = disponibilites([(4, 'Mercredi', '07:30:00', '09:00:00'), (4, 'Mercredi', '19:00:00', '21:00:00')],
+                            heures_en_timedelta)
+    assert dispos[4][2] == [(2, 22)]
+
+
+@pytest.mark.unit
+def test_entite_bloquee_toute_la_semaine_reste_presente():
+    lignes = [(5, jour, None, None) for jour in ('Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi')]
+    lignes.append((9, 'Vendredi', '08:00:00', '09:00:00'))
+    dispos = disponibilites(lignes)
+    # Présente sans aucun jour : indisponible partout, et non « sans contrainte »
+    assert dispos[5] == {}
+    assert dispos[9][4] == [(2, CRENEAUX_PAR_JOUR)]
+
+
+@pytest.mark.unit
+def test_aucune_indisponibilite():
+    assert disponibilites([]) == {}
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from benchmark_model import generer_semaine_synthetique
+from incremental_model import IncrementalTimetableModel
+from problem_bundle import ProblemBundle, TABLEAUX
+
+MARDI = 1
+GROUPE_ID = 1
+
+
+def semaine_avec_groupe_bloque_le_mardi():
+    """Semaine synthétique où le groupe d'un TD (clé GROUPE_ID) n'est pas disponible le mardi."""
+    d = generer_semaine_synthetique(30, graine=1)
+    cours = next(c for c in d['cours'] if c['id'].startswith("TD_"))
+    d['group_to_dispo_key'] = {cours['groups'][0]: GROUPE_ID}
+    d['disponibilites_groupes'] = {GROUPE_ID: {j: [(0, d['creneaux_par_jour'])] for j in range(d['jours']) if j != MARDI}}
+    return d, cours['id']
+
+
+@pytest.mark.unit
+def test_relacher_un_groupe_libere_le_creneau():
+    d, cid = semaine_avec_groupe_bloque_le_mardi()
+    m = IncrementalTimetableModel(d)
+    m.build_model()
+    # Le cours du groupe est forcé au mardi : impossible tant que le groupe y est indisponible
+    cpj = d['creneaux_par_jour']
+    m.model.AddLinearConstraint(m._vars['debut'][cid], MARDI * cpj, (MARDI + 1) * cpj - 1)
+    assert not m.resoudre(profil='rapide')['vars']
+
+    assert m.retirer_indisponibilite('groupe', GROUPE_ID, 'Mardi', 0, cpj) > 0
+    solution = m.resoudre(profil='rapide')
+    assert solution['vars']
+    ligne = m.derniere_solution.set_index('cours').loc[cid]
+    assert ligne['jour'] == MARDI
+
+
+def appliquer_deltas(m, d):
+    """Une indisponibilité de prof et de salle, un cours ajouté et une capacité modifiée."""
+    prof = d['profs'][0]
+    m.ajouter_indisponibilite('prof', d['prof_to_teacher_id'][prof], 'Lundi', '08:00', '12:00')
+    salle = next(iter(d['salles']))
+    m.ajouter_indisponibilite('salle', salle, 'Mardi', '08:00', '19:30')
+    modele = d['cours'][0]
+    m.ajouter_cours({'id': modele['id'].rsplit('_s', 1)[0] + '_s9999', 'groups': list(modele['groups']),
+                     'allowed_prof_indices': list(modele['allowed_prof_indices'])}, 3)
+    m.modifier_capacite(salle, 5)
+
+
+@pytest.mark.unit
+def test_deltas_identiques_a_une_reconstruction():
+    d = generer_semaine_synthetique(40, graine=1)
+    m = IncrementalTimetableModel(d)
+    m.build_model()
+    appliquer_deltas(m, m.data)
+
+    reconstruit = ProblemBundle(m.data)
+    for nom in TABLEAUX:
+        assert np.array_equal(getattr(m.probleme, nom), getattr(reconstruit, nom)), nom
+    assert m.probleme.cours == reconstruit.cours
+    assert m.probleme.salles == reconstruit.salles
+    assert m.probleme.groupes == reconstruit.groupes
+
+
+@pytest.mark.unit
+def test_indisponibilite_ajoutee_respectee():
+    d = generer_semaine_synthetique(40, graine=1)
+    m = IncrementalTimetableModel(d)
+    m.build_model()
+    assert m.resoudre(profil='rapide')['vars']
+    ligne = m.derniere_solution.dropna(subset=['prof']).iloc[0]
+
+    m.ajouter_indisponibilite('prof', d['prof_to_teacher_id'][ligne['prof']], int(ligne['jour']), 0,
+                              d['creneaux_par_jour'])
+    assert m.resoudre(profil='rapide')['vars']
+    solution = m.derniere_solution
+    assert solution[(solution['prof'] == ligne['prof']) & (solution['jour'] == ligne['jour'])].empty
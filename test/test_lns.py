@@ -0,0 +1,52 @@
+import pytest
+from ortools.sat.python import cp_model
+
+from benchmark_model import generer_semaine_synthetique
+from decomposition import verifier_fusion
+from lns import LNSDriver
+from solution_visualizer import extraire_affectations
+from time_table_model import TimetableModel, ENCODAGE_ENTIER
+
+COLONNES = ["cours", "slot", "salle_idx", "prof_idx"]
+
+
+@pytest.fixture
+def pilote():
+    d = generer_semaine_synthetique(40, graine=1)
+    scheduler = TimetableModel(d, encodage=ENCODAGE_ENTIER)
+    scheduler.build_model()
+    lns = LNSDriver(scheduler, graine=0)
+    solution = scheduler.solve(profil='rapide', max_time_in_seconds=5, num_workers=1)
+    assert solution['vars']
+    lns.partir_de(solution)
+    return lns
+
+
+def figes(affectations, relaches):
+    """Début, salle et prof des cours hors du voisinage relâché."""
+    hors = affectations[~affectations["cours"].isin(relaches)]
+    return hors[COLONNES].sort_values("cours").reset_index(drop=True)
+
+
+@pytest.mark.unit
+def test_sous_modele_fige_les_cours_hors_voisinage(pilote):
+    a = pilote.affectations
+    relaches = set(a.loc[a["jour"] == 0, "cours"])
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = 5
+    assert solver.Solve(pilote._sous_modele(relaches)) in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+
+    nouvelles = extraire_affectations(solver, pilote.scheduler._vars, pilote.data)
+    assert figes(nouvelles, relaches).equals(figes(a, relaches))
+
+
+@pytest.mark.unit
+def test_ameliorer_ne_degrade_pas_l_objectif(pilote):
+    depart = pilote.objectif
+    resultat = pilote.ameliorer(duree_totale=4, temps_par_iteration=1, profil='rapide', num_workers=1)
+
+    objectifs = [objectif for _, objectif, _ in resultat['historique']]
+    assert objectifs[0] == depart
+    assert all(suivant < precedent for precedent, suivant in zip(objectifs, objectifs[1:]))
+    assert resultat['objectif'] == objectifs[-1]
+    assert verifier_fusion(resultat['affectations'], pilote.data) == []
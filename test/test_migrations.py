@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import inspect, text
+
+from data_sources import SourceSQLite
+from migrations import MIGRATIONS, MigrationImpossible, appliquer_migrations, version_actuelle
+
+DERNIERE = MIGRATIONS[-1][0]
+
+
+@pytest.fixture
+def engine():
+    # Base SQLite en mémoire : schéma de Database/*.sql, migrations déjà appliquées par la source
+    return SourceSQLite().engine
+
+
+def colonnes(engine, table):
+    # Noms seuls, comme migrations._colonnes : pas de réflexion des types MySQL sous SQLite
+    with engine.connect() as conn:
+        return set(conn.execute(text(f"SELECT * FROM {table} LIMIT 0")).keys())
+
+
+@pytest.mark.integration
+def test_schema_migre_par_la_source(engine):
+    assert version_actuelle(engine) == DERNIERE
+    assert "is_exam" in colonnes(engine, "slots")
+    assert "is_draft" in colonnes(engine, "edt_slot")
+    assert "week_id" in colonnes(engine, "teacher_constraints")
+    assert "idx_teacher_constraints_semaine" in {i['name'] for i in inspect(engine).get_indexes("teacher_constraints")}
+
+
+@pytest.mark.integration
+def test_migrations_idempotentes(engine):
+    assert appliquer_migrations(engine, silencieux=True) == []
+    # Registre perdu : les migrations repassent sans erreur sur un schéma déjà à jour
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM schema_version"))
+    assert appliquer_migrations(engine, silencieux=True) == [v for v, _, _ in MIGRATIONS]
+    assert version_actuelle(engine) == DERNIERE
+
+
+@pytest.mark.integration
+def test_table_absente_migration_non_enregistree(engine):
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM schema_version WHERE version >= 3"))
+        conn.execute(text("DROP TABLE edt_slot"))
+    with pytest.raises(MigrationImpossible):
+        appliquer_migrations(engine, silencieux=True)
+    # La migration 3 (edt_slot.is_draft) n'est pas enregistrée, la 4 n'est pas tentée
+    assert version_actuelle(engine) == 2
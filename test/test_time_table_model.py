@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+
+from benchmark_model import generer_semaine_synthetique
+from time_table_model import TimetableModel, ENCODAGES
+
+MATIERE = "R1.01 Matiere BUT1"
+
+
+def semaine(cours_par_type):
+    """Semaine synthétique réduite aux cours donnés [(type, groupes, duree)], tous de la même matière."""
+    d = generer_semaine_synthetique(1, graine=0)
+    d['cours'], d['duree_cours'], d['map_groupe_cours'] = [], {}, {}
+    for slot_id, (typ, groupes, duree) in enumerate(cours_par_type, start=100):
+        cid = f"{typ}_{MATIERE}_{groupes[0]}_s{slot_id}"
+        d['cours'].append({"id": cid, "groups": groupes, "allowed_prof_indices": [slot_id % len(d['profs'])]})
+        d['duree_cours'][cid] = duree
+        for g in groupes:
+            d['map_groupe_cours'].setdefault(g, []).append(cid)
+    d['all_groups'] = list(d['map_groupe_cours'])
+    return d
+
+
+def resoudre(d, encodage, *contraintes):
+    """Statut trouvé (True/False) une fois posées les contraintes f(model, debut) supplémentaires."""
+    m = TimetableModel(d, encodage=encodage)
+    m.build_model()
+    ids = [c['id'] for c in d['cours']]
+    for contrainte in contraintes:
+        m.model.Add(contrainte([m._vars['debut'][cid] for cid in ids]))
+    return bool(m.solve(profil='rapide')['vars'])
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("encodage", ENCODAGES)
+def test_seul_le_dernier_cm_precede_les_td(encodage):
+    d = semaine([("CM", ["BUT1"], 2), ("CM", ["BUT1"], 2), ("TD", ["G1"], 2)])
+    # Le premier CM peut démarrer après le TD ; le dernier non
+    assert resoudre(d, encodage, lambda debut: debut[0] > debut[2])
+    assert not resoudre(d, encodage, lambda debut: debut[1] > debut[2])
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("encodage", ENCODAGES)
+def test_ordre_porte_sur_les_debuts(encodage):
+    # Groupes sans lien dans la hiérarchie : rien n'empêche un TP de démarrer pendant le TD
+    d = semaine([("TD", ["G4"], 4), ("TP", ["G7A"], 2)])
+    assert resoudre(d, encodage, lambda debut: debut[1] == debut[0] + 1)
+    assert not resoudre(d, encodage, lambda debut: debut[1] == debut[0])
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("encodage", ENCODAGES)
+def test_liste_de_profs_vide_sans_prof_affecte(encodage):
+    from solution_visualizer import extraire_affectations
+
+    d = semaine([("TD", ["G1"], 2), ("TD", ["G2"], 2)])
+    sans_prof, sans_cle = d['cours']
+    sans_prof['allowed_prof_indices'] = []
+    del sans_cle['allowed_prof_indices']
+    m = TimetableModel(d, encodage=encodage)
+    m.build_model()
+    solution = m.solve(profil='rapide')
+    assert m._vars['z_prof'][sans_prof['id']] == {}
+    assert len(m._vars['z_prof'][sans_cle['id']]) == len(d['profs'])
+    affectations = extraire_affectations(solution['solver'], solution['vars'], d).set_index('cours')
+    # Le cours reste placé, sans prof ; sans clé, un prof parmi tous est retenu
+    assert affectations.loc[sans_prof['id'], 'prof_idx'] == -1
+    assert pd.isna(affectations.loc[sans_prof['id'], 'prof'])
+    assert affectations.loc[sans_cle['id'], 'prof_idx'] >= 0
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from benchmark_model import generer_semaine_synthetique
+from problem_bundle import ProblemBundle, TABLEAUX
+from week_snapshot import ecrire_snapshot, exporter_npz, lire_npz, lire_snapshot
+
+SEMAINE = 140
+
+
+@pytest.fixture
+def donnees():
+    d = generer_semaine_synthetique(20, graine=2)
+    d['probleme'] = ProblemBundle(d)
+    return d
+
+
+def sans_probleme(d):
+    return {cle: v for cle, v in d.items() if cle != 'probleme'}
+
+
+def memes_tableaux(a, b):
+    return all(np.array_equal(getattr(a, nom), getattr(b, nom)) for nom in TABLEAUX)
+
+
+@pytest.mark.unit
+def test_snapshot_relu_a_l_identique(tmp_path, donnees):
+    ecrire_snapshot(str(tmp_path), SEMAINE, donnees, "empreinte")
+    relu = lire_snapshot(str(tmp_path), SEMAINE, "empreinte")
+
+    # Clés entières, tuples de slots et listes reviennent avec leur type
+    assert sans_probleme(relu) == sans_probleme(donnees)
+    assert memes_tableaux(relu['probleme'], donnees['probleme'])
+    assert relu['probleme'].cours == donnees['probleme'].cours
+    assert not relu['probleme'].dispo_profs.flags.writeable  # relu en mmap
+
+
+@pytest.mark.unit
+def test_snapshot_perime_ou_absent_ignore(tmp_path, donnees):
+    assert lire_snapshot(str(tmp_path), SEMAINE) is None
+    ecrire_snapshot(str(tmp_path), SEMAINE, donnees, "empreinte")
+    assert lire_snapshot(str(tmp_path), SEMAINE, "autre empreinte") is None
+    assert lire_snapshot(str(tmp_path), SEMAINE) is not None
+
+
+@pytest.mark.unit
+def test_npz_relu_a_l_identique(tmp_path, donnees):
+    chemin = exporter_npz(str(tmp_path / "semaine.npz"), SEMAINE, donnees)
+    relu, manifeste = lire_npz(chemin)
+
+    assert manifeste['week_id'] == SEMAINE
+    assert sans_probleme(relu) == sans_probleme(donnees)
+    assert memes_tableaux(relu['probleme'], donnees['probleme'])
@@ -1,77 +1,242 @@
 # ==============================================================================
 # CLASSE 2: LE MODÈLE D'OPTIMISATION (TimetableModel)
 # ==============================================================================
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from ortools.sat.python import cp_model
 
-from function import recup_cours, recup_id_slot_from_str_to_int
+import diagnose
+from problem_bundle import probleme_de
+from group_hierarchy import GroupHierarchy
+from legal_start_index import LegalStartIndex
+from solution_listeners import SolutionPublisher
+from solver_profiles import construire_profil, appliquer_profil, decrire_profil
+
+
+ENCODAGE_BOOLEEN = "booleen"  # un BoolVar start/occupe par cours et par créneau
+ENCODAGE_ENTIER = "entier"  # un IntVar de début par cours, domaine réduit aux départs légaux
+ENCODAGES = (ENCODAGE_BOOLEEN, ENCODAGE_ENTIER)
 
 
 class TimetableModel:
-    def __init__(self, data: Dict[str, Any]):
+    def __init__(self, data: Dict[str, Any], encodage: str = ENCODAGE_BOOLEEN):
+        if encodage not in ENCODAGES:
+            raise ValueError(f"Encodage inconnu : {encodage} (attendu : {', '.join(ENCODAGES)})")
         self.data = data
+        self.probleme = probleme_de(data)  # vue indexée et typée des mêmes données (problem_bundle.py)
+        self.encodage = encodage
         self.model = cp_model.CpModel()
         self._vars = {}
         self.temp = []
         self._ordres_a_forcer=[]
+        self._candidats_salles = {}
+        self._candidats_profs = {}
+        self.presolve_statique = True  # réduit les domaines avant de créer les variables (diagnose.presolve)
+        self.groupes_dans_departs = True  # disponibilités des groupes retirées des départs légaux (LegalStartIndex)
+        self.ecouteurs = []  # reçoivent chaque solution améliorante (solution_listeners.py)
+        self.casser_symetries = True  # ordonne les cours interchangeables (voir classes_equivalentes)
 
     def build_model(self):
-        print("2. Construction du modèle d'optimisation...")
+        print(f"2. Construction du modèle d'optimisation (encodage {self.encodage})...")
         self._create_decision_variables()
         self._add_linking_constraints()
         self._add_structural_constraints()
-        self.appliquer_ordre_cm_td_tp()  # ← ICI on les APPLIQUE (variables existent !)
         self._define_objective_function()  # Déplacé avant la résolution
         print("   -> Modèle construit.")
 
-    def solve(self, max_time_seconds: int = 600) -> Dict[str, Any]:
+    def solve(self, max_time_seconds: Optional[int] = None, profil: str = "defaut", **surcharges) -> Dict[str, Any]:
+        """
+        Résout le modèle avec un profil nommé de solver_profiles.PROFILS_SOLVEUR, dont chaque
+        paramètre peut être surchargé (num_workers, max_deterministic_time, relative_gap_limit, ...).
+        max_time_seconds reste accepté et surcharge max_time_in_seconds.
+        """
         print("\n3. Lancement de la résolution...")
-        solver = cp_model.CpSolver()
-        solver.parameters.max_time_in_seconds = max_time_seconds
-        solver.parameters.num_search_workers = 8
-        status = solver.Solve(self.model)
+        if max_time_seconds is not None:
+            surcharges["max_time_in_seconds"] = max_time_seconds
+        parametres = construire_profil(profil, **surcharges)
+        print(f"   -> Profil '{profil}' : {decrire_profil(parametres)}")
+        solver = appliquer_profil(cp_model.CpSolver(), parametres)
+        if self.ecouteurs:
+            publication = SolutionPublisher(self._vars, self.data, self.ecouteurs)
+            try:
+                status = solver.Solve(self.model, publication)
+            finally:
+                publication.terminer()  # ex. brouillon : dernière solution et écritures en attente
+            print(f"   -> {publication.nb_solutions} solution(s) intermédiaire(s) publiée(s)")
+        else:
+            status = solver.Solve(self.model)
         print(f"   -> Résolution terminée avec le statut : {solver.StatusName(status)}")
         return {"status": status, "solver": solver,
                 "vars": self._vars if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else None}
 
+    def ajouter_ecouteur(self, ecouteur):
+        """Abonne un écouteur (console, JSON lines, brouillon en base...) aux solutions intermédiaires de solve()."""
+        self.ecouteurs.append(ecouteur)
+        return ecouteur
+
+    def ajouter_indices(self, affectations, fixer_inchanges: bool = False) -> int:
+        """
+        Démarrage à chaud : donne au solveur une solution de départ (AddHint) à partir d'une table
+        d'affectations (colonnes cours, slot, salle_idx, prof_idx, identique ; -1 = inconnu),
+        typiquement warm_start.associer_affectations_precedentes sur edt_slot.
+        Avec fixer_inchanges, les cours identiques (même slot) sont figés à leur début et leur salle
+        précédents ; à réserver aux petites retouches, sinon le modèle peut devenir infaisable.
+        Renvoie le nombre de cours indiqués. À appeler après build_model().
+        """
+        affectations = self._ordonner_indices_equivalents(affectations)
+        nb_indiques, nb_fixes = 0, 0
+        for a in affectations.itertuples(index=False):
+            cid, slot = a.cours, int(a.slot)
+            if cid not in self._vars['debut'] or slot not in self._departs_valides[cid]:
+                continue  # départ devenu illégal (nouvelle contrainte) : le solveur repart de zéro pour ce cours
+            self.model.AddHint(self._vars['debut'][cid], slot)
+            for s, start_var in self._vars['start'].get(cid, {}).items():
+                self.model.AddHint(start_var, s == slot)
+            for famille, choisi in (('y_salle', a.salle_idx), ('z_prof', a.prof_idx)):
+                if choisi in self._vars[famille][cid]:
+                    for idx, var in self._vars[famille][cid].items():
+                        self.model.AddHint(var, idx == choisi)
+            nb_indiques += 1
+            if fixer_inchanges and a.identique:
+                self.model.Add(self._vars['debut'][cid] == slot)
+                if a.salle_idx in self._vars['y_salle'][cid]:
+                    self.model.Add(self._vars['y_salle'][cid][a.salle_idx] == 1)
+                nb_fixes += 1
+        print(f"   -> Démarrage à chaud : {nb_indiques}/{len(self.data['cours'])} cours indiqués, {nb_fixes} figés")
+        return nb_indiques
+
+    def _ordonner_indices_equivalents(self, affectations):
+        """
+        Les cours interchangeables sont ordonnés par slot id (contrainte_symetries_cours_equivalents) :
+        on redistribue leurs indices dans cet ordre pour qu'une solution précédente reste compatible.
+        """
+        classes = getattr(self, '_classes_equivalentes', [])
+        if not classes or affectations.empty:
+            return affectations
+        affectations = affectations.reset_index(drop=True)
+        position = {cid: i for i, cid in enumerate(affectations['cours'])}
+        colonnes = [col for col in affectations.columns if col != 'cours']
+        for cours in classes:
+            lignes = [position[cid] for cid in cours if cid in position]
+            if len(lignes) < 2:
+                continue
+            # Les cours indiqués de la classe reçoivent, dans l'ordre des slot ids, les indices triés par début
+            valeurs = affectations.loc[lignes, colonnes].sort_values('slot')
+            affectations.loc[lignes, colonnes] = valeurs.to_numpy()
+        return affectations
+
     def _create_decision_variables(self):
         d = self.data
-        self._vars.update({'start': {}, 'occupe': {}, 'y_salle': {}, 'z_prof': {}})
+        # Index structurés par cours : start[cid][s], occupe[cid][t], y_salle[cid][r], z_prof[cid][p]
+        # (jamais de recherche par préfixe de nom de variable)
+        self._vars.update({'start': {}, 'occupe': {}, 'y_salle': {}, 'z_prof': {}, 'debut': {}, 'intervalle': {}})
+        # Précalcul unique des départs légaux (journée, midi, groupes, horaires obligatoires)
+        self.index_departs = LegalStartIndex(d, self.probleme, self.groupes_dans_departs)
+        if self.presolve_statique:
+            # Départs, salles et profs retirés d'après les disponibilités avant toute création de variable
+            self.reductions = diagnose.presolve(d, self.index_departs,
+                                                {c['id']: self._salles_candidates(c) for c in d['cours']},
+                                                {c['id']: self._profs_autorises(c) for c in d['cours']})
+            self._candidats_salles.update(self.reductions['salles'])
+            self._candidats_profs.update(self.reductions['profs'])
+        self._departs_valides = {}
         for c in d['cours']:
-            cid, duration = c['id'], d['duree_cours'][c['id']]#[cid]
-            for s, (day, offset) in enumerate(d['slots']):
-                chevauche_midi = any(offset + i in d['fenetre_midi'] for i in range(duration))
-                if offset + duration <= d['creneaux_par_jour'] and not chevauche_midi:
-                    self._vars['start'][cid, s] = self.model.NewBoolVar(f"start_{cid}_{s}")
-                else:
-                    self._vars['start'][cid, s] = None
-            for t in range(d['nb_slots']): self._vars['occupe'][cid, t] = self.model.NewBoolVar(f"occupe_{cid}_{t}")
-            for r in range(len(d['salles'])): self._vars['y_salle'][cid, r] = self.model.NewBoolVar(f"y_salle_{cid}_{r}")
-            for p in range(len(d['profs'])): self._vars['z_prof'][cid, p] = self.model.NewBoolVar(f"z_prof_{cid}_{p}")
+            self._creer_variables_cours(c)
 
-    def _add_linking_constraints(self):
+    def _creer_variables_cours(self, c: dict[str, Any]):
         d = self.data
-        for c in d['cours']:
-            cid = c['id']
-            valid_starts = [v for v in self._vars['start'].values() if v is not None and v.Name().startswith(f"start_{cid}")]
-            self.model.Add(sum(valid_starts) == 1)
-            self.model.Add(sum(self._vars['y_salle'][cid, r] for r in range(len(d['salles']))) == 1)
-            #self.model.Add(sum(self._vars['z_prof'][cid, p] for p in range(len(d['profs']))) == 1)
-            allowed = c.get("allowed_prof_indices", list(range(len(d['profs']))))
-            if allowed:
-                self.model.Add(sum(self._vars['z_prof'][cid, p] for p in allowed) == 1)
-                for p in range(len(d['profs'])):
-                    if p not in allowed:
-                        self.model.Add(self._vars['z_prof'][cid, p] == 0)
-            for t, (day_t, offset_t) in enumerate(d['slots']):
-                covering_starts = [self._vars['start'][cid, s] for s, (day_s, offset_s) in enumerate(d['slots']) if
-                                   self._vars['start'][cid, s] is not None and day_s == day_t and offset_s <= offset_t < offset_s +
-                                   d['duree_cours'][cid]]
-                if covering_starts:
-                    self.model.Add(sum(covering_starts) == self._vars['occupe'][cid, t])
-                else:
-                    self.model.Add(self._vars['occupe'][cid, t] == 0)
+        cid, duration = c['id'], d['duree_cours'][c['id']]#[cid]
+        departs_valides = self.index_departs.departs(cid).tolist()
+        if self.encodage == ENCODAGE_BOOLEEN:
+            # Seuls les départs légaux reçoivent une variable start
+            self._vars['start'][cid] = {s: self.model.NewBoolVar(f"start_{cid}_{s}") for s in departs_valides}
+        self._departs_valides[cid] = departs_valides
+        # Indice global du créneau de début (jour * creneaux_par_jour + offset), sert aux intervalles
+        self._vars['debut'][cid] = self.model.NewIntVarFromDomain(
+            cp_model.Domain.FromValues(departs_valides), f"debut_{cid}")
+        self._vars['intervalle'][cid] = self.model.NewFixedSizeIntervalVar(
+            self._vars['debut'][cid], duration, f"intervalle_{cid}")
+        if self.encodage == ENCODAGE_BOOLEEN:
+            # occupe n'existe que sur les créneaux qu'un départ légal peut couvrir
+            couverts = sorted({s + k for s in departs_valides for k in range(duration)})
+            self._vars['occupe'][cid] = {t: self.model.NewBoolVar(f"occupe_{cid}_{t}") for t in couverts}
+        self._vars['y_salle'][cid] = {r: self.model.NewBoolVar(f"y_salle_{cid}_{r}") for r in self._salles_candidates(c)}
+        # Seuls les profs autorisés pour ce cours reçoivent une variable d'affectation
+        self._vars['z_prof'][cid] = {p: self.model.NewBoolVar(f"z_prof_{cid}_{p}") for p in self._profs_autorises(c)}
+
+    def _profs_autorises(self, c: dict[str, Any]) -> list:
+        """
+        Profs pouvant assurer le cours : allowed_prof_indices, tous les profs si la clé est absente.
+        Une liste vide (comme dans le code d'origine) : aucun prof n'est affecté au cours.
+        """
+        if c['id'] in self._candidats_profs:
+            return self._candidats_profs[c['id']]
+        return c.get("allowed_prof_indices", list(range(len(self.data['profs']))))
+
+    def _salles_candidates(self, c: dict[str, Any]) -> list:
+        """
+        Salles pouvant accueillir le cours, filtrées avant toute création de variable :
+        celles exclues par teachings_rooms (allowed_room_indices) et celles trop petites pour le groupe.
+        Si aucune salle n'a la capacité suffisante, on garde les salles autorisées et la
+        pénalité de capacité de _define_objective_function s'applique.
+        """
+        cid = c['id']
+        if cid not in self._candidats_salles:
+            autorisees = c.get("allowed_room_indices") or list(range(len(self.data['salles'])))
+            taille_groupe = self.data['taille_groupes'].get(c['groups'][0], 0)
+            assez_grandes = [r for r in autorisees if self.data['capacites'][r] >= taille_groupe]
+            self._candidats_salles[cid] = assez_grandes or autorisees
+        return self._candidats_salles[cid]
+
+    def _interdire_departs(self, cid: str, departs_interdits: list, litteral=None):
+        """
+        Interdit au cours cid de démarrer sur les créneaux donnés, éventuellement seulement si
+        litteral est vrai (prof ou salle affecté au cours ; une liste de littéraux = tous vrais).
+        - encodage booléen : une clause (¬start ∨ ¬litteral) par créneau interdit ;
+        - encodage entier : une seule contrainte de domaine sur le début, conditionnée par litteral.
+        """
+        if len(departs_interdits) == 0:
+            return
+        litteraux = [l for l in (litteral if isinstance(litteral, list) else [litteral]) if l is not None]
+        if self.encodage == ENCODAGE_ENTIER:
+            interdits = set(int(s) for s in departs_interdits)
+            autorises = [s for s in self._departs_valides[cid] if s not in interdits]
+            contrainte = self.model.AddLinearExpressionInDomain(
+                self._vars['debut'][cid], cp_model.Domain.FromValues(autorises))
+            if litteraux:
+                contrainte.OnlyEnforceIf(litteraux)
+            return
+        starts = self._vars['start'][cid]
+        for s in departs_interdits:
+            start_var = starts.get(int(s))
+            if start_var is None:
+                continue
+            if not litteraux:
+                self.model.Add(start_var == False)
+            else:
+                self.model.AddBoolOr([start_var.Not()] + [l.Not() for l in litteraux])
+
+    def _add_linking_constraints(self):
+        for c in self.data['cours']:
+            self._lier_cours(c)
+
+    def _lier_cours(self, c: dict[str, Any]):
+        cid = c['id']
+        self.model.AddExactlyOne(self._vars['y_salle'][cid].values())
+        if self._vars['z_prof'][cid]:
+            self.model.AddExactlyOne(self._vars['z_prof'][cid].values())
+        if self.encodage == ENCODAGE_ENTIER:
+            # Le début entier porte seul la position du cours : pas de start/occupe à relier
+            return
+        starts = self._vars['start'][cid]
+        self.model.AddExactlyOne(starts.values())
+        self.model.Add(self._vars['debut'][cid] == sum(s * v for s, v in starts.items()))
+        # Un départ légal ne traverse jamais la fin de journée : le créneau t est couvert
+        # exactement par les départs s de [t - durée + 1, t]
+        duration = self.data['duree_cours'][cid]
+        for t, occupe in self._vars['occupe'][cid].items():
+            covering_starts = [starts[s] for s in range(t - duration + 1, t + 1) if s in starts]
+            self.model.Add(sum(covering_starts) == occupe)
 
     def _add_structural_constraints(self):
         d = self.data
@@ -80,188 +245,150 @@ class TimetableModel:
         # 2. Contraintes professeurs
         self.contrainte_professeurs(d)
 
-        # 3. CONTRAINTE ÉTUDIANT
+        # 3. CONTRAINTE ÉTUDIANT (une contrainte par feuille de la hiérarchie des groupes :
+        #    les sous-groupes bloquent leur groupe parent et leur promotion)
         self.contrainte_etudiant(d)
-        # =================================================================
-        # 4. CONTRAINTE HIÉRARCHIQUE : les sous-groupes bloquent leur groupe parent
-        # =================================================================
-        self.contrainte_hierarchique(d)
         self.contrainte_disponibilites_professeurs(d)
         self.contrainte_disponibilites_groupes(d)
         self.contrainte_disponibilites_salles_generalisee(d)
-        #self.contrainte_disponibilites_amphi_c(d)
         #test
         self.contrainte_ordre_cm_td_tp(d)
-        self.appliquer_ordre_cm_td_tp()
+        self.appliquer_ordre_cm_td_tp()  # ← ICI on les APPLIQUE (variables existent !)
+        if self.casser_symetries:
+            self.contrainte_symetries_cours_equivalents()
         self.penaliser_fin_tardive(d, cout_penalite=500, limite_offset_fin=20)
-        self.contrainte_disponibilites_cour_heure(d)
-
-
-    def contrainte_hierarchique(self, d: dict[str, Any]):
-        print("   -> Ajout des contraintes hiérarchiques (sous-groupes ↔ groupe parent)")
-
-        # Définit la relation : sous-groupe → groupe parent
-        hierarchie = {
-            "G1A": "G1",
-            "G1B": "G1",
-            "G2A": "G2",
-            "G2B": "G2",
-            "G3A": "G3",
-            "G3B": "G3",
-            "G4A": "G4",
-            "G4B": "G4",
-            "G5A": "G5",
-            "G5B": "G5",
-            "G7A": "G7",
-            "G7B": "G7",
-            "G8A": "G8",
-        }
-
-        for sous_groupe, groupe_parent in hierarchie.items():
-            if sous_groupe not in d['map_groupe_cours'] or groupe_parent not in d['map_groupe_cours']:
-                continue
 
-            print(f"      → {sous_groupe} bloque {groupe_parent} (et vice versa)")
 
-            for t in range(d['nb_slots']):
-                # Tous les cours du sous-groupe
-                cours_sous = [self._vars['occupe'][cid, t]
-                              for cid in d['map_groupe_cours'][sous_groupe]
-                              if (cid, t) in self._vars['occupe']]
-                # Tous les cours du groupe parent
-                cours_parent = [self._vars['occupe'][cid, t]
-                                for cid in d['map_groupe_cours'][groupe_parent]
-                                if (cid, t) in self._vars['occupe']]
+    def contrainte_etudiant(self, d: dict[str, Any]):
+        """
+        Un étudiant ne peut suivre qu'un cours à la fois.
 
-                # On retire les cours du sous-groupe pour éviter double comptage
-                cours_parent_clean = [v for v in cours_parent
-                                      if not any(
-                        v.Name().startswith(f"occupe_{cid}") for cid in d['map_groupe_cours'][sous_groupe])]
+        La hiérarchie promotion → groupe → sous-groupe (GroupHierarchy) donne, pour chaque feuille,
+        tous les cours qui occupent ses étudiants (ceux de la feuille et de ses ancêtres) ;
+        on pose une seule contrainte par feuille : AddNoOverlap en encodage entier,
+        un AddAtMostOne par créneau en encodage booléen.
+        """
+        hierarchie = GroupHierarchy.depuis_donnees(d)
+        cours_par_feuille = hierarchie.cours_par_feuille(d['map_groupe_cours'])
+        print(f"   -> Ajout des contraintes étudiants : {len(cours_par_feuille)} feuilles de la hiérarchie des groupes")
 
-                all_concerned = cours_sous + cours_parent_clean
-                if all_concerned:
-                    self.model.Add(sum(all_concerned) <= 1)
+        for feuille, course_list in cours_par_feuille.items():
+            self._poser_conflit_etudiants(course_list)
 
-    def contrainte_etudiant(self, d: dict[str, Any]):
-        for group_name, course_list in d['map_groupe_cours'].items():
-            if len(course_list) > 1:  # seulement si risque de chevauchement
-                for t in range(d['nb_slots']):
-                    active = [self._vars['occupe'][cid, t]
-                              for cid in course_list
-                              if (cid, t) in self._vars['occupe']]
-                    if active:
-                        self.model.Add(sum(active) <= 1)
+    def _poser_conflit_etudiants(self, course_list: list):
+        if self.encodage == ENCODAGE_ENTIER:
+            self.model.AddNoOverlap([self._vars['intervalle'][cid] for cid in course_list])
+            return
+        for t in range(self.data['nb_slots']):
+            active = [self._vars['occupe'][cid][t]
+                      for cid in course_list
+                      if t in self._vars['occupe'][cid]]
+            if len(active) > 1:
+                self.model.AddAtMostOne(active)
 
     def contrainte_professeurs(self, d: dict[str, Any]):
-        for t in range(d['nb_slots']):
-            for p_idx in range(len(d['profs'])):
-                p_vars = []
-                for c in d['cours']:
-                    cid = c['id']
-                    z = self.model.NewBoolVar(f"zact_c{cid}_t{t}_p{p_idx}")
-                    self.model.AddMultiplicationEquality(z, [
-                        self._vars['occupe'][cid, t],
-                        self._vars['z_prof'][cid, p_idx]
-                    ])
-                    p_vars.append(z)
-                self.model.Add(sum(p_vars) <= 1)
-
-    def contrainte_salle(self, d: dict[str, Any]):
-        for t in range(d['nb_slots']):
-            for r_idx in range(len(d['salles'])):
-                q_vars = []
-                for c in d['cours']:
-                    cid = c['id']
-                    q = self.model.NewBoolVar(f"q_c{cid}_t{t}_r{r_idx}")
-                    self.model.AddMultiplicationEquality(q, [
-                        self._vars['occupe'][cid, t],
-                        self._vars['y_salle'][cid, r_idx]
-                    ])
-                    q_vars.append(q)
-                self.model.Add(sum(q_vars) <= 1)
-
-    def contrainte_disponibilites_professeurs(self, d):
-        print("   -> Application des disponibilités horaires des professeurs")
-        dispos = d.get('disponibilites_profs', {})
-        prof_to_teacher_id = d.get("prof_to_teacher_id", {})
+        """
+        Un professeur ne peut pas assurer deux cours en même temps.
 
+        Chaque couple (cours, prof autorisé) porte un intervalle optionnel [debut, debut + durée[
+        présent seulement si le prof est affecté au cours (z_prof), puis un AddNoOverlap par prof.
+        La taille du modèle dépend donc des affectations possibles et non de cours × créneaux × profs.
+        """
+        self._vars['intervalles_prof'] = {}
+        self._intervalles_par_prof = intervalles_par_prof = self._intervalles_reserves('prof')
         for c in d['cours']:
-            cid = c['id']
-            duration = d['duree_cours'][cid]
-            allowed_indices = c.get('allowed_prof_indices', [])
-            if not allowed_indices:
-                continue
+            self._creer_intervalles_prof(c)
 
-            for s, (day_idx, offset) in enumerate(d['slots']):
-                start_var = self._vars['start'].get((cid, s))
-                if start_var is None or offset + duration > d['creneaux_par_jour']:
-                    continue
-
-                for p_idx in allowed_indices:
-                    prof_name = d['profs'][p_idx]
-                    teacher_id = prof_to_teacher_id.get(prof_name)
-                    if not teacher_id or teacher_id not in dispos:
-                        continue
-
-                    plages = dispos[teacher_id].get(day_idx, [])
-                    if not plages:
-                        z = self._vars['z_prof'].get((cid, p_idx))
-                        if z is not None:
-                            self.model.AddBoolOr([start_var.Not(), z.Not()])
-                        continue
-
-                    if not any(debut <= offset and offset + duration <= fin for debut, fin in plages):
-                        z = self._vars['z_prof'].get((cid, p_idx))
-                        if z is not None:
-                            self.model.AddBoolOr([start_var.Not(), z.Not()])
-
-    def contrainte_disponibilites_salles(self, d):
-        print("   -> Application des disponibilités horaires des salles")
-        dispos = d.get('disponibilites_salles', {})
-
-        # 🚨 CORRECTION : On itère sur l'indice physique (0, 1, 2, ...) pour correspondre à y_salle
-        nb_salles = len(d['salles'])
-        salle_id_map = list(d['salles'].keys())  # Liste ordonnée des IDs de salle (ex: [1, 2, 3, ...])
-        nb_salles=len(dispos)
-        salle_id_map=list(dispos.keys())
+        for p_idx, intervalles in intervalles_par_prof.items():
+            if len(intervalles) > 1:
+                self.model.AddNoOverlap(intervalles)
+        print(f"   -> {sum(map(len, intervalles_par_prof.values()))} intervalles professeurs, "
+              f"{sum(len(i) > 1 for i in intervalles_par_prof.values())} contraintes NoOverlap")
 
+    def contrainte_salle(self, d: dict[str, Any]):
+        """
+        Une salle ne peut accueillir qu'un cours à la fois : un intervalle optionnel par
+        couple (cours, salle candidate), présent si y_salle vaut 1, et un AddNoOverlap par salle.
+        """
+        self._vars['intervalles_salle'] = {}
+        self._intervalles_par_salle = intervalles_par_salle = self._intervalles_reserves('salle')
         for c in d['cours']:
-            cid = c['id']
-            duration = d['duree_cours'][cid]
-
-            for s, (day_idx, offset) in enumerate(d['slots']):
-                start_var = self._vars['start'].get((cid, s))
-                if start_var is None or offset + duration > d['creneaux_par_jour']:
-                    continue
+            self._creer_intervalles_salle(c)
+
+        for r_idx, intervalles in intervalles_par_salle.items():
+            if len(intervalles) > 1:
+                self.model.AddNoOverlap(intervalles)
+        print(f"   -> {sum(map(len, intervalles_par_salle.values()))} intervalles salles "
+              f"(sur {len(d['cours']) * len(d['salles'])} couples cours × salle)")
+
+    def _intervalles_reserves(self, famille: str) -> dict:
+        """Intervalles fixes déjà occupés par ressource ({idx: [intervalles]}) ; aucun ici (voir decomposition.py)."""
+        return {}
+
+    def _creer_intervalles_prof(self, c: dict[str, Any]):
+        cid = c['id']
+        for p_idx in self._profs_autorises(c):
+            intervalle = self.model.NewOptionalFixedSizeIntervalVar(
+                self._vars['debut'][cid], self.data['duree_cours'][cid], self._vars['z_prof'][cid][p_idx],
+                f"intervalle_prof_{cid}_{p_idx}")
+            self._vars['intervalles_prof'].setdefault(cid, {})[p_idx] = intervalle
+            self._intervalles_par_prof.setdefault(p_idx, []).append(intervalle)
+
+    def _creer_intervalles_salle(self, c: dict[str, Any]):
+        cid = c['id']
+        for r_idx in self._salles_candidates(c):
+            intervalle = self.model.NewOptionalFixedSizeIntervalVar(
+                self._vars['debut'][cid], self.data['duree_cours'][cid], self._vars['y_salle'][cid][r_idx],
+                f"intervalle_salle_{cid}_{r_idx}")
+            self._vars['intervalles_salle'].setdefault(cid, {})[r_idx] = intervalle
+            self._intervalles_par_salle.setdefault(r_idx, []).append(intervalle)
 
-                # p_idx est maintenant l'indice physique (0, 1, 2, ...)
-                for p_idx in range(nb_salles):
-
-                    # Le nom de la salle à chercher dans 'dispos' est l'ID réel
-                    salle_name = salle_id_map[p_idx]  # Récupère l'ID réel (ex: 1, 2, 3...)
-
-                    # Assurez-vous que salle_name est du bon type (entier ou chaîne) pour 'dispos'
-                    # Si dispos utilise des chaînes : salle_name = str(salle_name)
-
-                    if not salle_name or salle_name not in dispos:
-                        continue
-
-                    plages = dispos[salle_name].get(day_idx, [])
-
-                    # p_idx est l'indice physique (0, 1, 2...) et correspond à l'indexation de y_salle
-                    z = self._vars['y_salle'].get((cid, p_idx))
-
-                    # Si la salle est indisponible (plages vide ou plage non couverte)
-                    indisponible = (not plages) or \
-                                   (not any(debut <= offset and offset + duration <= fin for debut, fin in plages))
+    def contrainte_disponibilites_professeurs(self, d):
+        print("   -> Application des disponibilités horaires des professeurs")
+        dispos = d.get('disponibilites_profs', {})
 
-                    if indisponible:
-                        if z is not None:
-                            self.model.AddBoolOr([start_var.Not(), z.Not()])
-                            # Le print est maintenant plus clair :
-                            # print(f"BLOQUÉ: Cours {cid} ne peut pas démarrer à {s} ET utiliser salle ID {salle_name} (Indice {p_idx}) Jour {day_idx}")
+        for teacher_id, plages in dispos.items():
+            # Départs où le prof n'a aucune plage couvrant toute la durée du cours (ou aucune plage ce jour-là)
+            for cid, z in self._affectations_ressource('prof', teacher_id):
+                self._disponibilite_ressource_cours('prof', teacher_id, cid, z)
 
-    from typing import Any
+    def _affectations_ressource(self, famille: str, ressource_id, cours=None) -> list:
+        """
+        Couples (cid, littéral d'affectation) des cours qui peuvent utiliser la ressource :
+        z_prof pour un prof (teacher_id), y_salle pour une salle (id de salle), aucun littéral
+        (None) pour un groupe (clé de disponibilites_groupes), qui suit tous ses cours.
+        """
+        d = self.data
+        cours = d['cours'] if cours is None else cours
+        if famille == 'prof':
+            prof_to_teacher_id = d.get("prof_to_teacher_id", {})
+            indices = [p for p, nom in enumerate(d['profs']) if prof_to_teacher_id.get(nom) == ressource_id]
+            return [(c['id'], self._vars['z_prof'][c['id']][p]) for c in cours
+                    for p in indices if p in self._vars['z_prof'][c['id']]]
+        if famille == 'salle':
+            salle_ids = list(d['salles'].keys())
+            if ressource_id not in salle_ids:
+                return []
+            r = salle_ids.index(ressource_id)
+            return [(c['id'], self._vars['y_salle'][c['id']][r]) for c in cours if r in self._vars['y_salle'][c['id']]]
+        # Groupe : clé de disponibilites_groupes, portée par les groupes du bundle (group_to_dispo_key)
+        index_groupes = self.probleme.index_groupes
+        lignes = set(self.probleme.lignes_ressource('groupe', ressource_id))
+        return [(c['id'], None) for c in cours if any(index_groupes.get(g) in lignes for g in c['groups'])]
+
+    def _litteral_ressource(self, famille: str, ressource_id):
+        """Littéral qui active les disponibilités d'une ressource ; None = toujours actives (voir IncrementalTimetableModel)."""
+        return None
+
+    def _disponibilite_ressource_cours(self, famille: str, ressource_id, cid: str, litteral_affectation):
+        """Si la ressource est affectée au cours, celui-ci ne peut démarrer hors de ses plages (masque précalculé)."""
+        lignes = self.probleme.lignes_ressource(famille, ressource_id)
+        if not lignes:
+            return
+        # Toutes les lignes d'une même clé partagent les mêmes plages, donc le même bitmap
+        masque = self.index_departs.masque_ressource(famille, lignes[0], self.data['duree_cours'][cid])
+        self._interdire_departs(cid, self.index_departs.departs_interdits(cid, masque),
+                                [litteral_affectation, self._litteral_ressource(famille, ressource_id)])
 
     def contrainte_disponibilites_groupes(self, d: dict[str, Any]):
         """
@@ -272,212 +399,43 @@ class TimetableModel:
         """
         print("   -> Application des disponibilités horaires des groupes")
         # Structure de 'disponibilites_groupes' :
-        # { 'GROUPE_ID': { jour_idx: [(debut_creneau, fin_creneau), ...] } }
-        dispos = d.get('disponibilites_groupes', {})
-
-        for c in d['cours']:
-            cid = c['id']
-            duration = d['duree_cours'][cid]
-            # map_cours_groupes: { cid: [GROUPE_ID_1, GROUPE_ID_2, ...] }
-            groupes_cours = d.get('map_cours_groupes', {}).get(cid, [])
-
-            if not groupes_cours:
-                # Si le cours n'a pas de groupe associé, on ne peut pas appliquer cette contrainte
-                continue
-
-            for s, (day_idx, offset) in enumerate(d['slots']):
-                start_var = self._vars['start'].get((cid, s))
-                if start_var is None or offset + duration > d['creneaux_par_jour']:
-                    continue
-
-                # Vérifier l'indisponibilité pour CHAQUE groupe associé au cours
-                for groupe_id in groupes_cours:
-
-                    # On ne peut imposer de contrainte que si la disponibilité est définie
-                    if groupe_id not in dispos:
-                        continue
-
-                    # Récupérer les plages horaires disponibles pour ce groupe ce jour-là
-                    plages = dispos[groupe_id].get(day_idx, [])
-
-                    # Conditions d'indisponibilité :
-                    # 1. Aucune plage n'est définie pour ce jour (plages est vide)
-                    # 2. OU aucune des plages définies ne couvre entièrement le cours
-                    is_indisponible = (not plages) or \
-                                      (not any(debut <= offset and offset + duration <= fin
-                                               for debut, fin in plages))
-
-                    if is_indisponible:
-                        # Si le groupe est indisponible à ce créneau, le cours NE PEUT PAS y démarrer.
-                        # On désactive la variable start(c, s).
-                        # 'start' est une variable booléenne qui vaut 1 si le cours c démarre au slot s.
-                        self.model.Add(start_var == False)
-                        # Note : Add(start_var.Not()) est équivalent à Add(start_var == False)
-                        # print(f"BLOQUÉ: Cours {cid} ne peut pas démarrer à {s} (Jour {day_idx}, Offset {offset}) car Groupe {groupe_id} est indisponible.")
-                        break  # Un seul groupe indisponible suffit pour bloquer le cours au slot s
+        # { GROUPE_ID: { jour_idx: [(debut_creneau, fin_creneau), ...] } }
+        # Les groupes des cours (G1, G1A, ...) sont traduits en GROUPE_ID par group_to_dispo_key dans le
+        # ProblemBundle (dispo_groupes). Si un groupe est indisponible à un créneau, le cours NE PEUT PAS
+        # y démarrer : ces départs sont déjà retirés par LegalStartIndex, sauf si groupes_dans_departs est
+        # faux (modèle incrémental) : ils sont alors interdits sous le littéral de version du groupe.
+        probleme = self.probleme
+        if self.groupes_dans_departs:
+            concernes = [c.id for c in probleme.cours
+                         if probleme.dispo_declaree_groupes[probleme.groupes_du_cours(c.index)].any()]
+            print(f"      → {len(concernes)} cours restreints dans l'index des départs légaux.")
+            return
+        for groupe_id in d.get('disponibilites_groupes', {}):
+            for cid, litteral in self._affectations_ressource('groupe', groupe_id):
+                self._disponibilite_ressource_cours('groupe', groupe_id, cid, litteral)
 
     def contrainte_disponibilites_salles_generalisee(self, d):
         print("   -> Application générale des disponibilités horaires des salles (Robuste)")
         dispos = d.get('disponibilites_salles', {})
-        print("dispos salles :",dispos)
         if not dispos:
             # Aucune contrainte de disponibilité spécifique à appliquer
             print("      → Aucune disponibilité spécifique trouvée, skipping.")
             return
 
-        # 1. Créer le MAPPING ID_SALLE -> INDICE_PHYSIQUE
-        # Ceci est la clé pour lier l'ID de 'dispos' à l'indexation de 'y_salle'
-        salle_id_to_idx = {name: i for i, name in enumerate(d['salles'].keys())}
-        # Note : Si d['salles'] est une simple liste [ID1, ID2, ...], utilisez:
-        # salle_id_to_idx = {name: i for i, name in enumerate(d['salles'])}
-
-        # 2. Itérer sur TOUTES les salles qui ont des contraintes spécifiques
         # On boucle sur l'ID de la salle (la clé du dictionnaire 'dispos')
         for salle_id, contraintes_par_jour in dispos.items():
 
-            # 3. Récupérer l'indice physique (p_idx) pour cette salle
-            salle_idx = salle_id_to_idx.get(salle_id)
-
-            if salle_idx is None:
+            if salle_id not in d['salles']:
                 # La salle dans 'dispos' n'existe pas dans la liste globale des salles du modèle.
                 print(f"      → Avertissement : Salle ID {salle_id} dans 'dispos' non trouvée. Ignorée.")
                 continue
 
-            # 4. Itérer sur tous les cours et créneaux (S, jour, offset)
-            for c in d['cours']:
-                cid = c['id']
-                duration = d['duree_cours'][cid]
-
-                for s, (day_idx, offset) in enumerate(d['slots']):
-                    start_var = self._vars['start'].get((cid, s))
-                    if start_var is None or offset + duration > d['creneaux_par_jour']:
-                        continue
-
-                    # y_salle[cid, salle_idx] est la variable booléenne qui nous intéresse
-                    z_salle = self._vars['y_salle'].get((cid, salle_idx))
-                    if z_salle is None:
-                        continue
-
-                        # 5. Appliquer la logique de contrainte
-                    plages_jour = contraintes_par_jour.get(day_idx, [])
-                    if not plages_jour:
-                        self.model.AddBoolOr([start_var.Not(), z_salle.Not()])
-                        continue
-                    # Vérifier si le cours rentre dans l'une des plages disponibles
-                    rentre_dans_plage = False
-                    for debut, fin in plages_jour:
-                        if debut <= offset and offset + duration <= fin:
-                            rentre_dans_plage = True
-                            break
-
-                    # La salle est indisponible si :
-                    # a) il n'y a pas de plages pour ce jour (plages_jour est vide)
-                    # b) ou si aucune plage existante ne couvre l'intégralité du cours
-                    if not rentre_dans_plage:
-                        # Contrainte d'élimination : (start(C, S) est faux) OU (y_salle(C, R) est faux)
-                        self.model.AddBoolOr([start_var.Not(), z_salle.Not()])
-                        # print(f"BLOQUÉ: Cours {cid} ne peut pas démarrer à {s} ET utiliser salle ID {salle_id}")
-
-    def contrainte_disponibilites_cour_heure(self, d):
-        print("   -> Application des horaires obligatoires pour les slots/salles")
-        # On utilise 'obligations_slots' pour clarifier l'intention
-        obligations = d.get('obligations_slots', {})
-
-        if not obligations:
-            print("      → Aucune contrainte d'horaire obligatoire spécifique trouvée, skipping.")
-            return
-
-        # 1. Itérer sur TOUS les SLOTS/SALLES qui ont des contraintes d'horaire obligatoires
-        for slot_id, contraintes_par_jour in obligations.items():  # Le slot_id est la clé du dictionnaire (e.g., 23000000)
-            # 2. Itérer sur tous les cours
-            for c in d['cours']:
-                cid = c['id']
-                id_slot_cour = recup_id_slot_from_str_to_int(cid)  # La fonction qui associe le cours à son slot/salle
-                # --- MODIFICATION CLÉ 1 : Cibler UNIQUEMENT les cours associés à ce slot ---
-                # Si le cours n'est pas censé utiliser ce slot/salle, on passe au suivant.
-                if id_slot_cour != slot_id:
-                    continue
-
-                duration = d['duree_cours'][cid]
-
-                # 3. Itérer sur tous les créneaux de temps (S, jour, offset)
-                for s, (day_idx, offset) in enumerate(d['slots']):
-                    start_var = self._vars['start'].get((cid, s))
-                    if start_var is None or offset + duration > d['creneaux_par_jour']:
-                        continue
-                    # 4. Déterminer si cet horaire (jour, offset) est OBLIGATOIRE
-                    creneaux_obligatoires_jour = contraintes_par_jour.get(day_idx, [])
-                    # Le cours DOIT commencer à cette heure s'il est affecté à ce slot.
-                    # Dans le cas où un jour n'a aucune obligation, le cours n'est PAS autorisé ce jour-là.
-                    # C'est une interprétation stricte de "obligatoire".
-
-                    est_horaire_obligatoire = False
-                    for debut, fin in creneaux_obligatoires_jour:
-                        # Vérifier si le cours (offset, offset + duration) est PARFAITEMENT ÉGAL
-                        # à l'un des créneaux obligatoires (debut, fin).
-                        # Pour être "obligatoire", on peut exiger une correspondance exacte.
-                        # Si c'est juste "doit commencer dans la plage", utiliser :
-                        # if debut <= offset and offset + duration <= fin:
-
-                        # Pour l'horaire OBLIGATOIRE, je recommande une correspondance stricte:
-                        if debut == offset and fin == offset + duration:
-                            est_horaire_obligatoire = True
-                            break
-
-                    # --- MODIFICATION CLÉ 2 : Logique Inversée ---
-                    # Si le cours est affecté à ce slot (déjà vérifié par 'id_slot_cour == slot_id')
-                    # MAIS que l'horaire (s) N'EST PAS l'un des horaires obligatoires
-                    if not est_horaire_obligatoire:
-                        # Nous BLOQUONS le démarrage du cours à ce slot/créneau.
-                        # Contrainte : start(C, S) est faux
-                        self.model.AddBoolOr([start_var.Not()])
-                        # print(f"BLOQUÉ: Cours {cid} DOIT utiliser slot {slot_id} mais l'horaire {s} n'est pas obligatoire.")
-
-    def contrainte_disponibilites_amphi_c(self, d):
-        print("   -> Application des disponibilités de l'Amphi C (version ROBUSTE)")
-
-        liste_amphi_c = d.get("liste_amphi_c")
-        if not liste_amphi_c:
-            return
-
-        # Trouver l'indice de l'Amphi C
-        try:
-            amphi_c_idx = next(i for i, name in enumerate(d['salles']) if name == "AmphiC" or name == 16)
-            print(f"      → Amphi C trouvé → indice {amphi_c_idx}")
-        except StopIteration:
-            print("      → Amphi C non trouvé dans les salles")
-            return
-
-        for c in d['cours']:
-            cid = c['id']
-            duration = d['duree_cours'][cid]
-
-            for s, (day_idx, offset) in enumerate(d['slots']):
-                start_var = self._vars['start'].get((cid, s))
-                if start_var is None:
-                    continue
-                if offset + duration > d['creneaux_par_jour']:
-                    continue
-
-                y_amphi = self._vars['y_salle'][(cid, amphi_c_idx)]
-
-                # Récupérer les plages autorisées ce jour
-                plages_jour = liste_amphi_c[day_idx].get(day_idx, [])
-
-                # CAS 1 : pas dispo du tout ce jour → interdit si on veut l'Amphi C
-                if not plages_jour:
-                    self.model.AddBoolOr([start_var.Not(), y_amphi.Not()])
-                    continue
-
-                # CAS 2 : vérifier que le cours rentre dans une plage
-                rentre_dans_plage = False
-                for debut, fin in plages_jour:
-                    if debut <= offset and offset + duration <= fin:
-                        rentre_dans_plage = True
-                        break
-
-                if not rentre_dans_plage:
-                    self.model.AddBoolOr([start_var.Not(), y_amphi.Not()])
+            # La salle est indisponible si :
+            # a) il n'y a pas de plages pour ce jour (plages_jour est vide)
+            # b) ou si aucune plage existante ne couvre l'intégralité du cours
+            # Contrainte d'élimination : (start(C, S) est faux) OU (y_salle(C, R) est faux)
+            for cid, z_salle in self._affectations_ressource('salle', salle_id):
+                self._disponibilite_ressource_cours('salle', salle_id, cid, z_salle)
 
     def contrainte_ordre_cm_td_tp(self, d):
         print("   → FORÇAGE ORDRE CM → TD → TP : VERSION QUI MARCHE VRAIMENT")
@@ -485,58 +443,84 @@ class TimetableModel:
         # On va extraire proprement le nom de la matière (tout entre le type et le _sXXXXX final)
         cours_par_matiere = {}
 
-        for c in d['cours']:
-            cid = c['id']
-
-            # On enlève le dernier élément (_s12345) et on reconstruit la clé matière + groupe
+        for cours in self.probleme.cours:
+            # Type et matière extraits une fois par le ProblemBundle
             # Ex: "Sensibilisation à la programmation multimédia BUT3"
-            typ,matiere = recup_cours(cid)
-            if matiere not in cours_par_matiere:
-                cours_par_matiere[matiere] = {"CM": [], "TD": [], "TP": []}
-            if typ == "CM":
-                cours_par_matiere[matiere]["CM"] = cid
-            elif typ == "TD":
-                cours_par_matiere[matiere]["TD"].append(cid)
-            elif typ == "TP":
-                cours_par_matiere[matiere]["TP"].append(cid)
-
-        # Stocke pour application plus tard
+            if cours.type not in ("CM", "TD", "TP"):
+                continue
+            if cours.matiere not in cours_par_matiere:
+                cours_par_matiere[cours.matiere] = {"CM": [], "TD": [], "TP": []}
+            cours_par_matiere[cours.matiere][cours.type].append(cours.id)
+
+        # Ordre du code d'origine : le dernier CM de la matière démarre avant chaque TD et chaque TP,
+        # chaque TD démarre avant chaque TP (débuts strictement ordonnés, les fins ne comptent pas).
+        # Réduction transitive : seules les couches non vides consécutives sont reliées
+        # (CM → TD et TD → TP ; CM → TP seulement s'il n'y a pas de TD)
         ordres = []
         for key, cours in cours_par_matiere.items():
-            cm = cours["CM"]
-            for td in cours["TD"]:
-                if cm:
-                    ordres.append((cm, td))
-            for tp in cours["TP"]:
-                if cm:
-                    ordres.append((cm, tp))
-                for td in cours["TD"]:
-                    ordres.append((td, tp))
+            couches = [couche for couche in (cours["CM"][-1:], cours["TD"], cours["TP"]) if couche]
+            ordres.extend(zip(couches, couches[1:]))
         self._ordres_a_forcer = ordres
-        print(f"      → {len(ordres)} relations d'ordre détectées et prêtes (CM→TD→TP)")
+        print(f"      → {len(ordres)} relations d'ordre entre couches détectées et prêtes (CM→TD→TP)")
 
     def appliquer_ordre_cm_td_tp(self):
-        print("ordre : ",self._ordres_a_forcer)
         if not hasattr(self, '_ordres_a_forcer') or not self._ordres_a_forcer:
             print("      → Aucune contrainte d'ordre à appliquer")
             return
         print(f"   → APPLICATION DES {len(self._ordres_a_forcer)} CONTRAINTES D'ORDRE (CM avant TD avant TP)")
         total_ajoutees = 0
-
-        for cid_avant, cid_apres in self._ordres_a_forcer:
-            # Récupère tous les starts valides pour chaque cours
-            starts_avant = [(s, var) for (c, s), var in self._vars['start'].items() if
-                            c == cid_avant and var is not None]
-            starts_apres = [(s, var) for (c, s), var in self._vars['start'].items() if
-                            c == cid_apres and var is not None]
-
-            for s1, v1 in starts_avant:
-                for s2, v2 in starts_apres:
-                    if s1 >= s2:
-                        self.model.AddBoolOr([v1.Not(), v2.Not()])
+        debut = self._vars['debut']
+
+        # debut(avant) < debut(apres) sur les débuts entiers, qui existent dans les deux encodages
+        for i, (couche_avant, couche_apres) in enumerate(self._ordres_a_forcer):
+            if len(couche_avant) == 1 or len(couche_apres) == 1:
+                for cid_avant in couche_avant:
+                    for cid_apres in couche_apres:
+                        self.model.Add(debut[cid_avant] < debut[cid_apres])
                         total_ajoutees += 1
+                continue
+            # Plusieurs cours de chaque côté : une barrière entière entre les deux couches
+            # (max des débuts < barrière <= min des débuts), taille linéaire au lieu de |avant| × |apres|
+            barriere = self.model.NewIntVar(0, self.data['nb_slots'], f"barriere_ordre_{i}")
+            for cid_avant in couche_avant:
+                self.model.Add(debut[cid_avant] < barriere)
+            for cid_apres in couche_apres:
+                self.model.Add(barriere <= debut[cid_apres])
+            total_ajoutees += len(couche_avant) + len(couche_apres)
+
+        print(f"      → {total_ajoutees} contraintes de précédence ajoutées → ORDRE FORCÉ À 100%")
+
+    def classes_equivalentes(self) -> list:
+        """
+        Groupes de cours interchangeables : même enseignement, type et groupe (signature_cours), même
+        durée, mêmes groupes, mêmes profs autorisés et mêmes salles candidates ; ils ne diffèrent que
+        par leur slot id. Les cours à horaire obligatoire (obligations_slots) restent à part.
+        Chaque classe (au moins deux cours) est triée par slot id.
+        """
+        probleme = self.probleme
+        classes = {}
+        for c, cours in zip(self.data['cours'], probleme.cours):
+            if probleme.a_obligation[cours.index]:
+                continue
+            cle = (cours.signature, cours.duree, tuple(sorted(c['groups'])),
+                   tuple(sorted(self._profs_autorises(c))), tuple(sorted(self._salles_candidates(c))))
+            classes.setdefault(cle, []).append(cours)
+        return [[cours.id for cours in sorted(membres, key=lambda cours: cours.slot_id)]
+                for membres in classes.values() if len(membres) > 1]
 
-        print(f"      → {total_ajoutees} contraintes d'interdiction ajoutées → ORDRE FORCÉ À 100%")
+    def contrainte_symetries_cours_equivalents(self):
+        """
+        Les cours d'une même classe ne se chevauchent jamais (mêmes groupes) : on impose leur ordre
+        fin(c_i) <= debut(c_i+1), ce qui retire les permutations équivalentes de l'espace de recherche.
+        """
+        classes = self.classes_equivalentes()
+        d = self.data
+        for cours in classes:
+            for cid_avant, cid_apres in zip(cours, cours[1:]):
+                self.model.Add(self._vars['debut'][cid_avant] + d['duree_cours'][cid_avant] <= self._vars['debut'][cid_apres])
+        self._classes_equivalentes = classes
+        print(f"   -> Symétries : {len(classes)} classes de cours interchangeables "
+              f"({sum(len(c) for c in classes)} cours ordonnés)")
 
     def penaliser_fin_tardive(self, d, cout_penalite: int = 500, limite_offset_fin: int = 20):
         """
@@ -548,34 +532,48 @@ class TimetableModel:
             f"   -> Application de la préférence : Pénaliser les fins après le slot {limite_offset_fin} (Coût: {cout_penalite})")
 
         self.penalites_fin_tardive = []  # Liste pour stocker les variables de pénalité
+        self._parametres_fin_tardive = (cout_penalite, limite_offset_fin)
 
         for c in d['cours']:
-            cid = c['id']
-            duration = d['duree_cours'][cid]
+            self._penaliser_fin_tardive_cours(c, cout_penalite, limite_offset_fin)
 
-            for s, (day_idx, offset) in enumerate(d['slots']):
+        print(f"      → {len(self.penalites_fin_tardive)} départs de cours tardifs potentiels détectés.")
+    def _penaliser_fin_tardive_cours(self, c: dict[str, Any], cout_penalite: int, limite_offset_fin: int):
+        d = self.data
+        cid = c['id']
+        duration = d['duree_cours'][cid]
+
+        if self.encodage == ENCODAGE_ENTIER:
+            # Un seul booléen par cours : s'il est faux, le début doit rester hors des départs tardifs
+            departs_a_l_heure = [s for s in self._departs_valides[cid]
+                                 if d['slots'][s][1] + duration <= limite_offset_fin]
+            if len(departs_a_l_heure) == len(self._departs_valides[cid]):
+                return
+            b_late_end = self.model.NewBoolVar(f'penalty_late_end_{cid}')
+            self.model.AddLinearExpressionInDomain(
+                self._vars['debut'][cid], cp_model.Domain.FromValues(departs_a_l_heure)).OnlyEnforceIf(b_late_end.Not())
+            self.penalites_fin_tardive.append(b_late_end * cout_penalite)
+            return
 
-                start_var = self._vars['start'].get((cid, s))
-                if start_var is None:
-                    continue
+        for s, start_var in self._vars['start'][cid].items():
+            day_idx, offset = d['slots'][s]
 
-                end_offset = offset + duration
+            end_offset = offset + duration
 
-                # Si l'heure de fin dépasse la limite (i.e., finit au slot 21 ou après)
-                if end_offset > limite_offset_fin:
-                    # Créer une variable booléenne qui est VRAIE si la pénalité est appliquée
-                    b_late_end = self.model.NewBoolVar(f'penalty_late_end_{cid}_{s}')
+            # Si l'heure de fin dépasse la limite (i.e., finit au slot 21 ou après)
+            if end_offset > limite_offset_fin:
+                # Créer une variable booléenne qui est VRAIE si la pénalité est appliquée
+                b_late_end = self.model.NewBoolVar(f'penalty_late_end_{cid}_{s}')
 
-                    # Contrainte d'implication :
-                    # Si start(C, S) est VRAI, alors b_late_end DOIT être VRAI
-                    # start(C, S) => b_late_end
-                    # L'écriture AddBoolOr([start_var.Not(), b_late_end]) est équivalente à l'implication.
-                    self.model.AddImplication(start_var, b_late_end)
+                # Contrainte d'implication :
+                # Si start(C, S) est VRAI, alors b_late_end DOIT être VRAI
+                # start(C, S) => b_late_end
+                # L'écriture AddBoolOr([start_var.Not(), b_late_end]) est équivalente à l'implication.
+                self.model.AddImplication(start_var, b_late_end)
 
-                    # Stocker la pénalité. On stocke le terme (variable * poids)
-                    self.penalites_fin_tardive.append(b_late_end * cout_penalite)
+                # Stocker la pénalité. On stocke le terme (variable * poids)
+                self.penalites_fin_tardive.append(b_late_end * cout_penalite)
 
-        print(f"      → {len(self.penalites_fin_tardive)} départs de cours tardifs potentiels détectés.")
     def _define_objective_function(self):
         """Définit les contraintes souples et l'objectif de minimisation."""
         d = self.data
@@ -587,15 +585,15 @@ class TimetableModel:
             cid, group_name = c['id'], c['groups'][0]
             taille_groupe = d['taille_groupes'].get(group_name, 0)
 
-            for r_idx, capacite_salle in enumerate(d['capacites']):
-                if taille_groupe > capacite_salle:
+            for r_idx in self._salles_candidates(c):
+                if taille_groupe > d['capacites'][r_idx]:
                     # Ce cours ne devrait pas être dans cette salle.
                     # On crée une variable de pénalité.
                     penalite = self.model.NewBoolVar(f"penalite_capacite_{cid}_salle_{r_idx}")
 
                     # Si le cours est assigné à cette salle (y_salle == 1), la pénalité doit être de 1.
-                    self.model.Add(self._vars['y_salle'][cid, r_idx] == 1).OnlyEnforceIf(penalite)
-                    self.model.Add(self._vars['y_salle'][cid, r_idx] == 0).OnlyEnforceIf(penalite.Not())
+                    self.model.Add(self._vars['y_salle'][cid][r_idx] == 1).OnlyEnforceIf(penalite)
+                    self.model.Add(self._vars['y_salle'][cid][r_idx] == 0).OnlyEnforceIf(penalite.Not())
 
                     penalites_capacite.append(penalite)
 
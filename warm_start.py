@@ -0,0 +1,81 @@
+# ==============================================================================
+# DÉMARRAGE À CHAUD : réutiliser un emploi du temps déjà enregistré dans edt_slot
+# ==============================================================================
+from typing import Dict, Any
+
+import pandas as pd
+
+
+COLONNES_INDICES = ["cours", "slot", "salle_idx", "prof_idx", "identique"]
+
+
+def signature_cours(cid: str) -> str:
+    """TYPE_matiere_groupe : l'identifiant du cours sans le _sXXXX du slot."""
+    return cid.rsplit('_', 1)[0]
+
+
+def signature_slot(type_acronym, teaching_title, promotion_name, group_name, subgroup_name) -> str:
+    """Même signature que signature_cours, recalculée depuis une ligne slots (nommage de _build_course_structures)."""
+    if type_acronym == "CM":
+        groupe = promotion_name
+    elif type_acronym == "TP":
+        groupe = f"{group_name}{subgroup_name}"
+    elif type_acronym == "SAE" and not group_name:
+        groupe = promotion_name
+    else:
+        groupe = group_name
+    return f"{type_acronym}_{teaching_title}_{groupe}"
+
+
+def heure_vers_offset(heure) -> int:
+    """'13:30:00', '13:30' ou Timedelta (colonne TIME) → 11 (8h=0, 8h30=1, ...)."""
+    if isinstance(heure, pd.Timedelta):
+        minutes = int(heure.total_seconds()) // 60
+    else:
+        h, m = map(int, str(heure).split(':')[:2])
+        minutes = h * 60 + m
+    return (minutes - 8 * 60) // 30
+
+
+def associer_affectations_precedentes(df_precedent: pd.DataFrame, data: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Associe chaque ligne d'edt_slot (DataProviderID.load_previous_assignment) à un cours du modèle.
+
+    - même slot_id : le cours est inchangé (identique = True) ;
+    - sinon (autre semaine, slot recréé) : on apparie par signature TYPE_matiere_groupe puis par rang
+      d'occurrence dans la semaine (1er TD de R1.01 G1 ↔ 1er TD de R1.01 G1, ...).
+    Le prof n'est pas enregistré dans edt_slot : prof_idx vaut -1 (pas d'indice).
+    """
+    if df_precedent.empty:
+        return pd.DataFrame(columns=COLONNES_INDICES)
+    cpj = data['creneaux_par_jour']
+    salle_idx = {room_id: i for i, room_id in enumerate(data['salles'])}
+    cours_par_slot_id = {int(c['id'].rsplit('_s', 1)[1]): c['id'] for c in data['cours']}
+
+    lignes, deja_associes = [], set()
+    restants = []
+    for row in df_precedent.itertuples(index=False):
+        cid = cours_par_slot_id.get(int(row.slot_id))
+        if cid is None:
+            restants.append(row)
+            continue
+        deja_associes.add(cid)
+        lignes.append((cid, row, True))
+
+    # Appariement par signature et rang d'occurrence pour les slots qui n'existent plus
+    libres = {}
+    for slot_id, cid in sorted(cours_par_slot_id.items()):
+        if cid not in deja_associes:
+            libres.setdefault(signature_cours(cid), []).append(cid)
+    rangs = {}
+    for row in sorted(restants, key=lambda r: r.slot_id):
+        candidats = libres.get(row.signature, [])
+        rang = rangs.get(row.signature, 0)
+        if rang < len(candidats):
+            lignes.append((candidats[rang], row, False))
+            rangs[row.signature] = rang + 1
+
+    return pd.DataFrame(
+        [(cid, row.jour * cpj + row.offset, salle_idx.get(row.room_id, -1), -1, identique)
+         for cid, row, identique in lignes],
+        columns=COLONNES_INDICES)
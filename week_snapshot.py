@@ -0,0 +1,149 @@
+# ==============================================================================
+# SNAPSHOTS DE SEMAINE : cache disque des données préparées par load_and_prepare_data
+# ==============================================================================
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+from problem_bundle import ProblemBundle, TABLEAUX
+
+# À incrémenter dès que le contenu du dictionnaire ou du ProblemBundle change de forme
+VERSION_FORMAT = 3
+MANIFESTE = "manifest.json"
+DONNEES = "donnees.json"
+
+
+def _en_json(valeur):
+    """
+    Dictionnaire de semaine → valeurs JSON, sans perte de type : les dictionnaires à clés non textuelles
+    (ids de salles, jours...) deviennent {"__dict__": [[clé, valeur], ...]}, les tuples {"__tuple__": [...]}.
+    Pas de pickle : un snapshot reçu d'une autre machine ne peut pas exécuter de code à la lecture.
+    """
+    if isinstance(valeur, dict):
+        if all(isinstance(cle, str) for cle in valeur):
+            return {cle: _en_json(v) for cle, v in valeur.items()}
+        return {"__dict__": [[_en_json(cle), _en_json(v)] for cle, v in valeur.items()]}
+    if isinstance(valeur, tuple):
+        return {"__tuple__": [_en_json(v) for v in valeur]}
+    if isinstance(valeur, list):
+        return [_en_json(v) for v in valeur]
+    if isinstance(valeur, np.generic):
+        return valeur.item()
+    if valeur is None or isinstance(valeur, (str, int, float, bool)):
+        return valeur
+    raise TypeError(f"Valeur non enregistrable dans un snapshot : {type(valeur).__name__}")
+
+
+def _depuis_json(objet):
+    if set(objet) == {"__tuple__"}:
+        return tuple(objet["__tuple__"])
+    if set(objet) == {"__dict__"}:
+        return {cle: v for cle, v in objet["__dict__"]}
+    return objet
+
+
+def donnees_en_octets(donnees: Dict[str, Any]) -> bytes:
+    """Le dictionnaire de semaine, sans le ProblemBundle, en JSON (UTF-8)."""
+    return json.dumps(_en_json({cle: v for cle, v in donnees.items() if cle != 'probleme'}),
+                      ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def donnees_depuis_octets(octets: bytes) -> Dict[str, Any]:
+    return json.loads(octets.decode("utf-8"), object_hook=_depuis_json)
+
+
+def dossier_semaine(racine: str, week_id: int) -> str:
+    return os.path.join(racine, f"semaine_{week_id}")
+
+
+def empreinte(week_id: int, lignes) -> str:
+    """Hachage (sha256) de la semaine, de la version du format et des lignes d'empreinte des tables sources."""
+    contenu = json.dumps([VERSION_FORMAT, week_id, [list(map(str, l)) for l in lignes]])
+    return hashlib.sha256(contenu.encode("utf-8")).hexdigest()
+
+
+def ecrire_snapshot(racine: str, week_id: int, donnees: Dict[str, Any], hachage: str) -> str:
+    """
+    Écrit un snapshot : un .npy par tableau du ProblemBundle (relu en mmap), le reste du dictionnaire
+    en JSON (donnees_en_octets) et un manifest.json (version, semaine, empreinte, fichiers). Le dossier
+    est écrit à côté puis renommé, pour qu'un lecteur ne voie jamais un snapshot partiel.
+    """
+    dossier = dossier_semaine(racine, week_id)
+    os.makedirs(racine, exist_ok=True)
+    temporaire = tempfile.mkdtemp(prefix=f".semaine_{week_id}_", dir=racine)
+    probleme = donnees.get('probleme') or ProblemBundle(donnees)
+    for nom, tableau in probleme.tableaux().items():
+        np.save(os.path.join(temporaire, f"{nom}.npy"), np.ascontiguousarray(tableau))
+    with open(os.path.join(temporaire, DONNEES), "wb") as f:
+        f.write(donnees_en_octets(donnees))
+    manifeste = {
+        "version": VERSION_FORMAT, "week_id": week_id, "empreinte": hachage,
+        "cree_le": time.strftime("%Y-%m-%d %H:%M:%S"), "nb_cours": len(donnees['cours']),
+        "tableaux": list(TABLEAUX),
+    }
+    with open(os.path.join(temporaire, MANIFESTE), "w", encoding="utf-8") as f:
+        json.dump(manifeste, f, indent=2)
+    shutil.rmtree(dossier, ignore_errors=True)
+    os.replace(temporaire, dossier)
+    return dossier
+
+
+def lire_manifeste(racine: str, week_id: int) -> Optional[Dict[str, Any]]:
+    chemin = os.path.join(dossier_semaine(racine, week_id), MANIFESTE)
+    if not os.path.exists(chemin):
+        return None
+    with open(chemin, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def lire_snapshot(racine: str, week_id: int, hachage: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Données d'une semaine depuis son snapshot, ou None s'il n'existe pas, vient d'une autre version du
+    format ou ne correspond plus à l'empreinte des tables sources (hachage=None : pas de vérification).
+    Les tableaux du ProblemBundle sont projetés en mémoire (mmap, lecture seule) ; le dictionnaire, lui,
+    est relu en entier depuis donnees.json (structures Python imbriquées, voir donnees_en_octets).
+    """
+    manifeste = lire_manifeste(racine, week_id)
+    if manifeste is None or manifeste.get("version") != VERSION_FORMAT:
+        return None
+    if hachage is not None and manifeste.get("empreinte") != hachage:
+        return None
+    dossier = dossier_semaine(racine, week_id)
+    with open(os.path.join(dossier, DONNEES), "rb") as f:
+        donnees = donnees_depuis_octets(f.read())
+    tableaux = {nom: np.load(os.path.join(dossier, f"{nom}.npy"), mmap_mode="r") for nom in manifeste["tableaux"]}
+    donnees['probleme'] = ProblemBundle(donnees, tableaux=tableaux)
+    return donnees
+
+
+def exporter_npz(chemin: str, week_id: int, donnees: Dict[str, Any]) -> str:
+    """
+    Snapshot portable en un seul fichier .npz (mode hors ligne : data_sources.SourceSnapshot) :
+    les tableaux du ProblemBundle, plus le dictionnaire et le manifeste en JSON stockés comme octets ;
+    rien n'y est dépicklé à la lecture (allow_pickle=False), le fichier peut venir d'une autre machine.
+    """
+    probleme = donnees.get('probleme') or ProblemBundle(donnees)
+    manifeste = {"version": VERSION_FORMAT, "week_id": week_id, "cree_le": time.strftime("%Y-%m-%d %H:%M:%S"),
+                 "nb_cours": len(donnees['cours']), "tableaux": list(TABLEAUX)}
+    np.savez(chemin, **probleme.tableaux(),
+             _donnees=np.frombuffer(donnees_en_octets(donnees), dtype=np.uint8),
+             _manifeste=np.frombuffer(json.dumps(manifeste).encode("utf-8"), dtype=np.uint8))
+    return chemin
+
+
+def lire_npz(chemin: str):
+    """(données, manifeste) d'un fichier écrit par exporter_npz."""
+    with np.load(chemin, allow_pickle=False) as npz:
+        manifeste = json.loads(npz["_manifeste"].tobytes().decode("utf-8"))
+        if manifeste.get("version") != VERSION_FORMAT:
+            raise ValueError(f"{chemin} : format de snapshot {manifeste.get('version')}, attendu {VERSION_FORMAT}")
+        donnees = donnees_depuis_octets(npz["_donnees"].tobytes())
+        tableaux = {nom: npz[nom] for nom in manifeste["tableaux"]}
+    donnees['probleme'] = ProblemBundle(donnees, tableaux=tableaux)
+    return donnees, manifeste